@@ -1,22 +1,22 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from .config import Config
+from .logging_config import configure_logging
+import atexit
 import logging
-from mongoengine import connect
 import os
 from dotenv import load_dotenv
-from pymongo import MongoClient
 from datetime import datetime, timedelta
 from flask_jwt_extended import JWTManager
-from .services.mongo_client import get_mongo_client, close_mongo_client
-from app.routes.auth import auth_bp
-from app.routes.chat import chat_bp
-from app.routes.ai_config import ai_config_bp
-from app.routes.scrum_master import scrum_master_bp
-from app.routes.sprint_details import sprint_details_bp
-
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+from .services.mongo_client import get_db, close_mongo_client
+from .services.indexes import ensure_indexes, find_collscans
+from .services.mongo_monitoring import command_monitor
+from .services import metrics, profiling, responses, tracing
+from .services.health import health_monitor
+from .services.archival import archive_idle_conversations
+import click
+from .utils.auth import token_required
+
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -24,8 +24,12 @@ load_dotenv()
 
 def create_app(config_class=Config):
     """Create and configure the Flask application."""
+    configure_logging(config_class)
     app = Flask(__name__)
     app.config.from_object(config_class)
+
+    # Registered first so compression runs after every other after_request hook
+    responses.init_app(app)
     
     # Initialize CORS with proper configuration
     CORS(app, resources={
@@ -43,18 +47,50 @@ def create_app(config_class=Config):
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key')
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
     
-    # Initialize MongoDB with MongoEngine
-    mongo_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/scrum_master_db')
-    connect(host=mongo_uri)
-    
-    # Initialize PyMongo client for direct database access
+    # Initialize MongoDB; MongoEngine documents and direct PyMongo access share one client
     try:
-        client = get_mongo_client()
-        app.db = client.scrum_master_db
+        app.db = get_db()
         logger.info("MongoDB connection initialized")
     except Exception as e:
         logger.error(f"Failed to initialize MongoDB connection: {str(e)}")
         raise
+
+    if app.config.get('MONGODB_ENSURE_INDEXES'):
+        try:
+            ensure_indexes(app.db)
+        except Exception as e:
+            logger.error(f"Failed to ensure MongoDB indexes: {str(e)}")
+
+    if app.config.get('MONGODB_COMMAND_MONITORING'):
+        command_monitor.init_app(app)
+    metrics.init_app(app)
+    if app.config.get('TRACING_ENABLED'):
+        tracing.init_app(app)
+    profiling.init_app(app)
+
+    @app.cli.command('ensure-indexes')
+    def ensure_indexes_command():
+        """Create the registered MongoDB indexes."""
+        for collection, names in ensure_indexes(app.db).items():
+            print(f"{collection}: {', '.join(names)}")
+
+    @app.cli.command('check-indexes')
+    def check_indexes_command():
+        """Report registered queries whose plan is a collection scan."""
+        collscans = find_collscans(app.db)
+        for query in collscans:
+            print(f"COLLSCAN {query['collection']}: filter={query['filter']} sort={query['sort']}")
+        if not collscans:
+            print("No collection scans found")
+    
+    @app.cli.command('archive-conversations')
+    @click.option('--idle-days', type=int, default=None, help='Archive conversations idle this many days')
+    @click.option('--backend', type=click.Choice(['mongo', 'file']), default=None)
+    def archive_conversations_command(idle_days, backend):
+        """Move idle conversations to compressed cold storage."""
+        totals = archive_idle_conversations(app.db, idle_days=idle_days, backend=backend)
+        print(f"Archived {totals['conversations']} conversations in {totals['batches']} batches "
+              f"({totals['bytes']} bytes)")
     
     # Import blueprints
     from .routes.auth import auth_bp
@@ -89,6 +125,90 @@ def create_app(config_class=Config):
             'timestamp': datetime.utcnow().isoformat()
         })
 
+    # Liveness: the process is serving requests; never touches a dependency
+    @app.route('/api/health/live', methods=['GET'])
+    def liveness():
+        return jsonify({'status': 'alive'})
+
+    # Readiness: cached results of the background dependency probes
+    @app.route('/api/health/ready', methods=['GET'])
+    def readiness():
+        report = health_monitor.readiness(wait=config_class.HEALTH_PROBE_TIMEOUT)
+        report['timestamp'] = datetime.utcnow().isoformat()
+        return jsonify(report), 200 if report['ready'] else 503
+
+    # Prometheus scrape endpoint
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return jsonify({
+                'error': 'Unauthorized',
+                'message': 'A valid metrics token is required'
+            }), 401
+        return metrics.registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+    # MongoDB commands per route, for spotting N+1 patterns and slow queries
+    @app.route('/api/metrics/mongo', methods=['GET', 'OPTIONS'])
+    @token_required
+    def mongo_metrics(current_user):
+        if request.method == 'OPTIONS':
+            return '', 200
+        if current_user.role != 'admin':
+            return jsonify({
+                'error': 'Forbidden',
+                'message': 'Admin access required'
+            }), 403
+        if request.args.get('reset') == 'true':
+            command_monitor.reset()
+            return jsonify({'status': 'reset'})
+        return jsonify({
+            'enabled': command_monitor.enabled,
+            'slowCommandMs': command_monitor.slow_ms,
+            'routes': command_monitor.snapshot()
+        })
+
+    # Recent request profiles of this worker, as folded stacks for flamegraph.pl or speedscope
+    @app.route('/api/profiles', methods=['GET', 'OPTIONS'])
+    @token_required
+    def list_profiles(current_user):
+        if request.method == 'OPTIONS':
+            return '', 200
+        if current_user.role != 'admin':
+            return jsonify({
+                'error': 'Forbidden',
+                'message': 'Admin access required'
+            }), 403
+        return jsonify({
+            'enabled': config_class.PROFILING_ENABLED,
+            'sampleRate': config_class.PROFILE_SAMPLE_RATE,
+            'worker': os.getpid(),
+            'profiles': [p.summary() for p in profiling.profile_store.list()]
+        })
+
+    @app.route('/api/profiles/<profile_id>', methods=['GET', 'OPTIONS'])
+    @token_required
+    def download_profile(current_user, profile_id):
+        if request.method == 'OPTIONS':
+            return '', 200
+        if current_user.role != 'admin':
+            return jsonify({
+                'error': 'Forbidden',
+                'message': 'Admin access required'
+            }), 403
+        profile = profiling.profile_store.get(profile_id)
+        if profile is None:
+            return jsonify({
+                'error': 'Not found',
+                'message': f'No profile {profile_id} on this worker'
+            }), 404
+        if request.args.get('format') == 'json':
+            return jsonify(dict(profile.summary(), stacks=profile.stacks))
+        return profile.folded(), 200, {
+            'Content-Type': 'text/plain; charset=utf-8',
+            'Content-Disposition': f'attachment; filename="profile-{profile.id}.folded"'
+        }
+
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -122,17 +242,12 @@ def create_app(config_class=Config):
             'message': str(e)
         }), 500
 
-    # Log all requests
+    # Log all requests; headers and bodies are left out, they carry credentials
     @app.before_request
     def log_request_info():
-        logger.debug('Headers: %s', request.headers)
-        logger.debug('Body: %s', request.get_data())
-        logger.debug('Method: %s', request.method)
-        logger.debug('Path: %s', request.path)
-
-    # Cleanup MongoDB connection on app shutdown
-    @app.teardown_appcontext
-    def cleanup_mongodb(exception=None):
-        close_mongo_client()
+        logger.debug('%s %s', request.method, request.path)
+
+    # Cleanup MongoDB connection on shutdown; the pool is shared across requests
+    atexit.register(close_mongo_client)
 
     return app 
\ No newline at end of file
@@ -1,72 +1,104 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Type
+import importlib
 import os
-from ..services.mongo_client import get_mongo_client
-from openai import OpenAI
-import google.generativeai as genai
+import threading
+import time
+from .usage import UsageRecord, usage_tracker
+from ..services.metrics import observe_ai_call
+from ..services.tracing import span
 
 class BaseAIClient:
+    engine: Optional[str] = None
+
     def __init__(self):
-        pass
+        self.user_id: Optional[str] = None
+
+    @contextmanager
+    def track_usage(self, model: Optional[str] = None):
+        """Time one provider call; the client fills token counts into the yielded record."""
+        record = UsageRecord(model)
+        error = None
+        engine = self.engine or type(self).__name__
+        try:
+            with span(f"ai {engine}", category="ai", kind="client", engine=engine, model=model) as current:
+                yield record
+                if current is not None:
+                    current.attributes.update(model=record.model, prompt_tokens=record.prompt_tokens,
+                                              completion_tokens=record.completion_tokens)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            latency = time.perf_counter() - record.started
+            usage_tracker.record(
+                engine=engine,
+                model=record.model,
+                user_id=self.user_id,
+                prompt_tokens=record.prompt_tokens,
+                completion_tokens=record.completion_tokens,
+                latency=latency,
+                ttft=record.ttft,
+                error=error
+            )
+            observe_ai_call(engine, record.model, latency, record.prompt_tokens,
+                            record.completion_tokens, error is not None)
 
     def chat(self, messages):
         """Base chat method to be implemented by specific clients."""
         raise NotImplementedError("Subclasses must implement chat method")
 
-class AIClientFactory:
-    @staticmethod
-    def create_client(ai_engine: str, api_key: str) -> BaseAIClient:
-        """Create an AI client based on the engine type."""
-        ai_engine = ai_engine.lower()
-        
-        if ai_engine == "openai":
-            from .openai_client import OpenAIClient
-            return OpenAIClient(api_key)
-        elif ai_engine == "anthropic":
-            from .anthropic_client import AnthropicClient
-            return AnthropicClient(api_key)
-        elif ai_engine == "ollama":
-            from .ollama_client import OllamaClient
-            return OllamaClient(api_key)
-        else:
-            raise ValueError(f"Unsupported AI engine: {ai_engine}")
+# Engine name -> "module:Class". A provider's module, and the SDK it wraps, is
+# only imported the first time that engine is requested, so workers that only
+# talk to Ollama never load the OpenAI or Gemini SDKs.
+_providers: Dict[str, str] = {
+    "openai": ".openai_client:OpenAIClient",
+    "anthropic": ".anthropic_client:AnthropicClient",
+    "ollama": ".ollama_client:OllamaClient",
+    "chatgpt": ".chatgpt_client:ChatGPTClient",
+    "gemini": ".gemini_client:GeminiClient",
+}
+_loaded: Dict[str, Type[BaseAIClient]] = {}
+_registry_lock = threading.Lock()
 
-class ChatGPTClient(BaseAIClient):
-    def __init__(self, credentials):
-        super().__init__()
-        self.client = OpenAI(api_key=credentials)
+def register_provider(engine: str, target: str) -> None:
+    """Register (or replace) the client class for an engine as "module:Class".
 
-    def chat(self, messages):
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            raise Exception(f"Error in ChatGPT client: {str(e)}")
+    Relative module names resolve against this package.
+    """
+    with _registry_lock:
+        _providers[engine.lower()] = target
+        _loaded.pop(engine.lower(), None)
 
-class GeminiClient(BaseAIClient):
-    def __init__(self, credentials):
-        super().__init__()
-        self.client = genai.GenerativeModel('gemini-pro')
-        genai.configure(api_key=credentials)
+def available_providers() -> List[str]:
+    return sorted(_providers)
 
-    def chat(self, messages):
-        try:
-            # Convert messages to Gemini format
-            gemini_messages = []
-            for msg in messages:
-                if msg["role"] == "user":
-                    gemini_messages.append({"role": "user", "parts": [msg["content"]]})
-                elif msg["role"] == "assistant":
-                    gemini_messages.append({"role": "model", "parts": [msg["content"]]})
-                elif msg["role"] == "system":
-                    # Add system message as user message
-                    gemini_messages.append({"role": "user", "parts": [msg["content"]]})
+def load_provider(engine: str) -> Type[BaseAIClient]:
+    """Import and return the client class for an engine."""
+    engine = engine.lower()
+    cls = _loaded.get(engine)
+    if cls is not None:
+        return cls
+    with _registry_lock:
+        target = _providers.get(engine)
+        if target is None:
+            raise ValueError(f"Unsupported AI engine: {engine}")
+        module_name, _, class_name = target.partition(":")
+        cls = getattr(importlib.import_module(module_name, __package__), class_name)
+        _loaded[engine] = cls
+    return cls
 
-            chat = self.client.start_chat(history=gemini_messages)
-            response = chat.send_message(messages[-1]["content"])
-            return response.text
-        except Exception as e:
-            raise Exception(f"Error in Gemini client: {str(e)}") 
\ No newline at end of file
+class AIClientFactory:
+    @staticmethod
+    def create_client(ai_engine: str, api_key: str, user_id: Optional[str] = None) -> BaseAIClient:
+        """Create an AI client based on the engine type.
+
+        The user id is used to attribute token usage and latency.
+        """
+        ai_engine = ai_engine.lower()
+        client = load_provider(ai_engine)(api_key)
+
+        client.engine = ai_engine
+        client.user_id = user_id
+        return client
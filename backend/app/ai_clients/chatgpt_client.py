@@ -0,0 +1,23 @@
+from openai import OpenAI
+from .base import BaseAIClient
+
+class ChatGPTClient(BaseAIClient):
+    engine = "chatgpt"
+
+    def __init__(self, credentials):
+        super().__init__()
+        self.client = OpenAI(api_key=credentials)
+
+    def chat(self, messages):
+        try:
+            with self.track_usage("gpt-3.5-turbo") as usage:
+                response = self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=messages
+                )
+                if response.usage:
+                    usage.prompt_tokens = response.usage.prompt_tokens
+                    usage.completion_tokens = response.usage.completion_tokens
+            return response.choices[0].message.content
+        except Exception as e:
+            raise Exception(f"Error in ChatGPT client: {str(e)}")
@@ -0,0 +1,30 @@
+import google.generativeai as genai
+from .base import BaseAIClient
+
+class GeminiClient(BaseAIClient):
+    engine = "gemini"
+
+    def __init__(self, credentials):
+        super().__init__()
+        self.client = genai.GenerativeModel('gemini-pro')
+        genai.configure(api_key=credentials)
+
+    def chat(self, messages):
+        try:
+            # Convert messages to Gemini format
+            gemini_messages = []
+            for msg in messages:
+                if msg["role"] == "user":
+                    gemini_messages.append({"role": "user", "parts": [msg["content"]]})
+                elif msg["role"] == "assistant":
+                    gemini_messages.append({"role": "model", "parts": [msg["content"]]})
+                elif msg["role"] == "system":
+                    # Add system message as user message
+                    gemini_messages.append({"role": "user", "parts": [msg["content"]]})
+
+            with self.track_usage("gemini-pro"):
+                chat = self.client.start_chat(history=gemini_messages)
+                response = chat.send_message(messages[-1]["content"])
+            return response.text
+        except Exception as e:
+            raise Exception(f"Error in Gemini client: {str(e)}")
@@ -20,8 +20,7 @@ class OllamaClient(BaseAIClient):
     def chat(self, messages: List[Dict[str, str]]) -> str:
         """Send a chat request to Ollama API."""
         try:
-            logger.debug(f"Sending chat request to Ollama with {len(messages)} messages")
-            logger.debug(f"Messages: {messages}")
+            logger.debug("Sending chat request to Ollama with %d messages", len(messages))
 
             # Convert messages to Ollama format
             ollama_messages = []
@@ -39,24 +38,32 @@ class OllamaClient(BaseAIClient):
             if not ollama_messages:
                 raise ValueError("No valid messages to send to Ollama")
 
-            # Make request to Ollama API
-            response = requests.post(
-                f"{self.host_url}/api/chat",
-                json={
-                    "model": self.model,
-                    "messages": ollama_messages,
-                    "stream": False
-                }
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"Error code: {response.status_code} - {response.text}"
-                logger.error(error_msg)
-                raise Exception(error_msg)
+            with self.track_usage(self.model) as usage:
+                # Make request to Ollama API
+                response = requests.post(
+                    f"{self.host_url}/api/chat",
+                    json={
+                        "model": self.model,
+                        "messages": ollama_messages,
+                        "stream": False
+                    }
+                )
+
+                if response.status_code != 200:
+                    error_msg = f"Error code: {response.status_code} - {response.text}"
+                    logger.error(error_msg)
+                    raise Exception(error_msg)
+
+                response_data = response.json()
+                if not response_data or "message" not in response_data:
+                    raise ValueError(f"Invalid response from Ollama: {response_data}")
 
-            response_data = response.json()
-            if not response_data or "message" not in response_data:
-                raise ValueError(f"Invalid response from Ollama: {response_data}")
+                # Ollama reports counts and nanosecond durations; the first token
+                # arrives once the model is loaded and the prompt is evaluated
+                usage.prompt_tokens = response_data.get("prompt_eval_count", 0)
+                usage.completion_tokens = response_data.get("eval_count", 0)
+                if "prompt_eval_duration" in response_data:
+                    usage.ttft = (response_data.get("load_duration", 0) + response_data["prompt_eval_duration"]) / 1e9
 
             return response_data["message"]["content"]
             
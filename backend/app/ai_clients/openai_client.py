@@ -1,77 +1,189 @@
 import aiohttp
-from typing import List, Dict, Any
+import asyncio
+import atexit
+import json
+import threading
+from typing import List, Dict, Any, Awaitable, Callable, Optional
 from .base import BaseAIClient
 import os
-import requests
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Every OpenAIClient shares one aiohttp session. aiohttp sessions are bound to
+# the event loop they were created on, so the session lives on a dedicated
+# background loop and synchronous callers submit coroutines to it.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+_session: Optional[aiohttp.ClientSession] = None
+
+REQUEST_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "120"))
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "50"))
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Start the background event loop on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="openai-client-loop", daemon=True)
+            thread.start()
+        return _loop
+
+def _run(coro):
+    """Run a coroutine on the shared loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+async def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+        )
+    return _session
+
+async def _close_session():
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+def after_fork():
+    """Forget the parent's loop and session; the loop thread does not survive a fork."""
+    global _loop, _loop_lock, _session
+    _loop = None
+    _loop_lock = threading.Lock()
+    _session = None
+
+@atexit.register
+def _shutdown():
+    if _loop is not None and _loop.is_running():
+        try:
+            asyncio.run_coroutine_threadsafe(_close_session(), _loop).result(timeout=5)
+        except Exception as e:
+            logger.error(f"Error closing OpenAI session: {str(e)}")
+        _loop.call_soon_threadsafe(_loop.stop)
+
 class OpenAIClient(BaseAIClient):
     def __init__(self, api_key: str):
         super().__init__()
         self.api_key = api_key
         self.model = os.getenv("DEFAULT_AI_MODEL", "gpt-3.5-turbo")
-        self.base_url = "https://api.openai.com/v1"
+        self.base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+    async def _post_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a chat completion request over the shared session."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        session = await _get_session()
+        with self.track_usage(payload.get("model")) as usage:
+            async with session.post(
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=payload
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise Exception(f"Error code: {response.status} - {error_text}")
+
+                data = await response.json()
+
+            usage.model = data.get("model") or usage.model
+            tokens = data.get("usage") or {}
+            usage.prompt_tokens = tokens.get("prompt_tokens", 0)
+            usage.completion_tokens = tokens.get("completion_tokens", 0)
+            return data
 
     def chat(self, messages: List[Dict[str, str]]) -> str:
         """Send a chat request to OpenAI API."""
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
             data = {
                 "model": self.model,
                 "messages": messages,
                 "temperature": 0.7
             }
-            
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=data
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"Error code: {response.status_code} - {response.text}"
-                logger.error(error_msg)
-                raise Exception(error_msg)
-                
-            return response.json()["choices"][0]["message"]["content"]
-            
+
+            response = _run(self._post_completion(data))
+            return response["choices"][0]["message"]["content"]
+
         except Exception as e:
             logger.error(f"Error in OpenAI chat: {str(e)}")
             raise
 
     async def chat_completion(
         self,
-        messages: List[Dict[str, str]],
+        messages: List[Dict[str, Any]],
         functions: List[Dict[str, Any]],
         function_call: str = "auto"
     ) -> Dict[str, Any]:
-        """Get chat completion from OpenAI."""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        """Get chat completion from OpenAI.
 
+        The functions are offered as tools, so the model may request several
+        calls in a single turn.
+        """
         payload = {
             "model": self.model,
             "messages": messages,
-            "functions": functions,
-            "function_call": function_call
+            "tools": [{"type": "function", "function": schema} for schema in functions],
+            "tool_choice": function_call
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"OpenAI API error: {error_text}")
-                
-                return await response.json() 
\ No newline at end of file
+        try:
+            return await self._post_completion(payload)
+        except Exception as e:
+            raise Exception(f"OpenAI API error: {str(e)}")
+
+    def chat_with_functions(
+        self,
+        messages: List[Dict[str, Any]],
+        functions: List[Dict[str, Any]],
+        invoke: Callable[[str, Dict[str, Any]], Awaitable[str]]
+    ) -> str:
+        """Answer a chat turn, running any requested functions.
+
+        All tool calls the model asks for are run concurrently and their
+        results are sent back in one follow-up completion, so a multi-action
+        request costs two provider round-trips.
+        """
+        try:
+            return _run(self._chat_with_functions(messages, functions, invoke))
+        except Exception as e:
+            logger.error(f"Error in OpenAI function chat: {str(e)}")
+            raise
+
+    async def _chat_with_functions(self, messages, functions, invoke) -> str:
+        response = await self.chat_completion(messages, functions)
+        message = response["choices"][0]["message"]
+        tool_calls = message.get("tool_calls") or []
+        if not tool_calls:
+            return message.get("content") or ""
+
+        logger.debug(f"Running {len(tool_calls)} tool calls")
+        results = await asyncio.gather(*(self._run_tool_call(call, invoke) for call in tool_calls))
+
+        follow_up = list(messages)
+        follow_up.append({
+            "role": "assistant",
+            "content": message.get("content"),
+            "tool_calls": tool_calls
+        })
+        for call, result in zip(tool_calls, results):
+            follow_up.append({
+                "role": "tool",
+                "tool_call_id": call["id"],
+                "content": result
+            })
+
+        response = await self.chat_completion(follow_up, functions, function_call="none")
+        return response["choices"][0]["message"].get("content") or ""
+
+    async def _run_tool_call(self, call: Dict[str, Any], invoke) -> str:
+        """Run one tool call, reporting failures back to the model as text."""
+        name = call["function"]["name"]
+        try:
+            args = json.loads(call["function"].get("arguments") or "{}")
+            return await invoke(name, args)
+        except Exception as e:
+            logger.error(f"Error running function {name}: {str(e)}")
+            return f"Error running {name}: {str(e)}"
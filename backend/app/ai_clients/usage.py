@@ -0,0 +1,197 @@
+"""
+Token, latency and cost accounting for AI provider calls.
+
+Clients report each provider round-trip through BaseAIClient.track_usage().
+Aggregates are kept in process per (engine, model, user) for the metrics
+endpoint, and hourly deltas are flushed as rollups into the
+ai_usage_rollups collection by a background thread.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# USD per 1K (prompt, completion) tokens; engines not listed (Ollama) cost nothing
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+}
+
+FLUSH_INTERVAL = float(os.getenv("AI_USAGE_FLUSH_INTERVAL", "60"))
+LATENCY_SAMPLES = 512
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated cost in USD of one call."""
+    prompt_price, completion_price = MODEL_PRICES.get(model or "", (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000.0
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))], 4)
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "errors": 0,
+        "promptTokens": 0,
+        "completionTokens": 0,
+        "cost": 0.0,
+        "latencySum": 0.0,
+        "latencyMax": 0.0,
+        "ttftSum": 0.0,
+        "ttftCount": 0,
+    }
+
+class UsageTracker:
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._totals: Dict[tuple, Dict[str, Any]] = {}
+        self._latencies: Dict[tuple, deque] = {}
+        self._pending: Dict[tuple, Dict[str, Any]] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def record(self, engine: str, model: Optional[str], user_id: Optional[str],
+               prompt_tokens: int = 0, completion_tokens: int = 0,
+               latency: float = 0.0, ttft: Optional[float] = None,
+               error: Optional[str] = None) -> None:
+        """Record one provider round-trip."""
+        key = (engine, model or "unknown", user_id or "anonymous")
+        hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            for totals in (self._totals.setdefault(key, _empty_totals()),
+                           self._pending.setdefault((hour,) + key, _empty_totals())):
+                totals["calls"] += 1
+                totals["errors"] += 1 if error else 0
+                totals["promptTokens"] += prompt_tokens
+                totals["completionTokens"] += completion_tokens
+                totals["cost"] += cost
+                totals["latencySum"] += latency
+                totals["latencyMax"] = max(totals["latencyMax"], latency)
+                if ttft is not None:
+                    totals["ttftSum"] += ttft
+                    totals["ttftCount"] += 1
+            self._latencies.setdefault(key, deque(maxlen=LATENCY_SAMPLES)).append(latency)
+        self._ensure_flusher()
+
+    def snapshot(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Aggregates since process start, optionally for one user."""
+        rows = []
+        with self._lock:
+            for (engine, model, user), totals in self._totals.items():
+                if user_id is not None and user != user_id:
+                    continue
+                latencies = list(self._latencies.get((engine, model, user), ()))
+                calls = totals["calls"]
+                rows.append({
+                    "engine": engine,
+                    "model": model,
+                    "userId": user,
+                    "calls": calls,
+                    "errors": totals["errors"],
+                    "promptTokens": totals["promptTokens"],
+                    "completionTokens": totals["completionTokens"],
+                    "cost": round(totals["cost"], 6),
+                    "latencyAvg": round(totals["latencySum"] / calls, 4) if calls else None,
+                    "latencyP50": _percentile(latencies, 50),
+                    "latencyP95": _percentile(latencies, 95),
+                    "latencyMax": round(totals["latencyMax"], 4),
+                    "ttftAvg": round(totals["ttftSum"] / totals["ttftCount"], 4) if totals["ttftCount"] else None,
+                })
+        return rows
+
+    def flush(self, collection=None) -> int:
+        """Write pending hourly deltas to Mongo; returns the number of rollups touched."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        if collection is None:
+            from ..services.mongo_client import get_db
+            collection = get_db().ai_usage_rollups
+        operations = [
+            UpdateOne(
+                {"hour": hour, "engine": engine, "model": model, "userId": user},
+                {
+                    "$inc": {
+                        "calls": totals["calls"],
+                        "errors": totals["errors"],
+                        "promptTokens": totals["promptTokens"],
+                        "completionTokens": totals["completionTokens"],
+                        "cost": totals["cost"],
+                        "latencySum": totals["latencySum"],
+                        "ttftSum": totals["ttftSum"],
+                        "ttftCount": totals["ttftCount"],
+                    },
+                    "$max": {"latencyMax": totals["latencyMax"]},
+                },
+                upsert=True
+            )
+            for (hour, engine, model, user), totals in pending.items()
+        ]
+        try:
+            collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Error flushing AI usage rollups: {str(e)}")
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                for key, totals in pending.items():
+                    current = self._pending.setdefault(key, _empty_totals())
+                    for field, value in totals.items():
+                        if field == "latencyMax":
+                            current[field] = max(current[field], value)
+                        else:
+                            current[field] += value
+            return 0
+        return len(operations)
+
+    def _ensure_flusher(self):
+        if self._flusher is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="ai-usage-flusher", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def after_fork(self):
+        """Drop the parent's flusher thread and buffers; the next record() starts a new thread."""
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._flusher = None
+        self._stop = threading.Event()
+
+    def shutdown(self):
+        self._stop.set()
+        self.flush()
+
+usage_tracker = UsageTracker()
+atexit.register(usage_tracker.shutdown)
+
+class UsageRecord:
+    """Mutable record a client fills in while a tracked call is running."""
+
+    def __init__(self, model: Optional[str]):
+        self.model = model
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.ttft: Optional[float] = None
+        self.started = time.perf_counter()
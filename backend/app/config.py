@@ -7,5 +7,90 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017')
     MONGODB_DB = os.getenv('MONGODB_DB', 'scrum_master_db')
+    # One pool serves both MongoEngine and PyMongo; tune it here
+    MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', '50'))
+    MONGODB_MIN_POOL_SIZE = int(os.getenv('MONGODB_MIN_POOL_SIZE', '0'))
+    MONGODB_MAX_IDLE_TIME_MS = int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', '60000'))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '5000'))
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key-here')
-    JWT_ACCESS_TOKEN_EXPIRES = 86400  # 24 hours 
\ No newline at end of file
+    JWT_ACCESS_TOKEN_EXPIRES = 86400  # 24 hours 
+    # Create the registered PyMongo indexes when the app starts
+    MONGODB_ENSURE_INDEXES = os.getenv('MONGODB_ENSURE_INDEXES', 'true').lower() == 'true'
+    # Per-route command counts and latency; commands slower than this are logged
+    MONGODB_COMMAND_MONITORING = os.getenv('MONGODB_COMMAND_MONITORING', 'true').lower() == 'true'
+    MONGODB_SLOW_COMMAND_MS = float(os.getenv('MONGODB_SLOW_COMMAND_MS', '100'))
+    # Buffer conversation appends and write them in batches off the request path
+    CONVERSATION_WRITE_BEHIND = os.getenv('CONVERSATION_WRITE_BEHIND', 'false').lower() == 'true'
+    CONVERSATION_FLUSH_INTERVAL_MS = int(os.getenv('CONVERSATION_FLUSH_INTERVAL_MS', '200'))
+    CONVERSATION_FLUSH_BATCH = int(os.getenv('CONVERSATION_FLUSH_BATCH', '100'))
+    CONVERSATION_MAX_PENDING = int(os.getenv('CONVERSATION_MAX_PENDING', '1000'))
+    # Conversations idle this long move to compressed cold storage ('mongo' or 'file' backend)
+    ARCHIVE_IDLE_DAYS = int(os.getenv('ARCHIVE_IDLE_DAYS', '90'))
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+    ARCHIVE_BACKEND = os.getenv('ARCHIVE_BACKEND', 'mongo')
+    ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+    # 'zstd' or 'gzip'; empty picks zstd when the zstandard package is installed
+    ARCHIVE_CODEC = os.getenv('ARCHIVE_CODEC', '')
+    # Defaults for scripts/migrate_db.py; 0 documents/sec means unthrottled
+    MIGRATION_BATCH_SIZE = int(os.getenv('MIGRATION_BATCH_SIZE', '1000'))
+    # MIGRATION_OPS_PER_SEC is the old name for MIGRATION_DOCS_PER_SEC
+    MIGRATION_DOCS_PER_SEC = float(os.getenv('MIGRATION_DOCS_PER_SEC',
+                                             os.getenv('MIGRATION_OPS_PER_SEC', '2000')))
+    # Logging: root level, per-logger overrides ("app.routes.chat=DEBUG,pymongo=WARNING"),
+    # json or text output, the fraction of DEBUG records kept and a cap on message length
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1.0'))
+    LOG_MAX_MESSAGE_CHARS = int(os.getenv('LOG_MAX_MESSAGE_CHARS', '2000'))
+    # When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    # Request tracing, off by default: spans feed the Server-Timing header, and TRACE_SAMPLE_RATE
+    # of new traces are exported; TRACE_EXPORT is '', 'file' or 'otlp'
+    TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() == 'true'
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.01'))
+    TRACE_EXPORT = os.getenv('TRACE_EXPORT', '')
+    TRACE_FILE = os.getenv('TRACE_FILE', 'traces.jsonl')
+    TRACE_OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+    # JSON responses via orjson when installed ('default' keeps Flask's provider), and
+    # gzip/brotli compression for text and JSON bodies of at least COMPRESS_MIN_BYTES
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))
+    # Request profiling: admins send X-Profile, or a PROFILE_SAMPLE_RATE fraction is sampled
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+    PROFILE_MAX_STORED = int(os.getenv('PROFILE_MAX_STORED', '50'))
+    # /api/chat limits: sliding windows such as "20/minute" ('' or 0 disables one), per user,
+    # per Jira site and per AI engine, plus in-flight caps per worker and per user.
+    # Off unless RATE_LIMIT_ENABLED=true; RATE_LIMIT_BACKEND=mongo shares the counters
+    # across workers and hosts.
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_STORE_TIMEOUT_MS = int(os.getenv('RATE_LIMIT_STORE_TIMEOUT_MS', '200'))
+    CHAT_USER_LIMIT = os.getenv('CHAT_USER_LIMIT', '20/minute')
+    CHAT_JIRA_DOMAIN_LIMIT = os.getenv('CHAT_JIRA_DOMAIN_LIMIT', '300/minute')
+    CHAT_AI_ENGINE_LIMIT = os.getenv('CHAT_AI_ENGINE_LIMIT', '120/minute')
+    CHAT_MAX_CONCURRENT = int(os.getenv('CHAT_MAX_CONCURRENT', '32'))
+    CHAT_MAX_CONCURRENT_PER_USER = int(os.getenv('CHAT_MAX_CONCURRENT_PER_USER', '2'))
+    # Dependency probes behind /api/health/ready; Jira and Ollama are only probed when a URL is set
+    # (e.g. https://your-domain.atlassian.net/status, http://localhost:11434)
+    HEALTH_CHECK_INTERVAL = float(os.getenv('HEALTH_CHECK_INTERVAL', '10'))
+    HEALTH_PROBE_TIMEOUT = float(os.getenv('HEALTH_PROBE_TIMEOUT', '2'))
+    HEALTH_STALE_AFTER = float(os.getenv('HEALTH_STALE_AFTER', '0'))
+    HEALTH_JIRA_URL = os.getenv('HEALTH_JIRA_URL', '')
+    HEALTH_OLLAMA_URL = os.getenv('HEALTH_OLLAMA_URL', '')
+    # Production server (serve.py): gunicorn gthread workers; 0 workers means 2 * CPUs + 1.
+    # The timeout has to outlast the slowest AI provider call.
+    WEB_BIND = os.getenv('WEB_BIND', '0.0.0.0:6001')
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', '0'))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', '8'))
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', '150'))
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+    WEB_KEEPALIVE = int(os.getenv('WEB_KEEPALIVE', '5'))
+    WEB_PRELOAD = os.getenv('WEB_PRELOAD', 'true').lower() == 'true'
+    WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', '0'))
+    WEB_MAX_REQUESTS_JITTER = int(os.getenv('WEB_MAX_REQUESTS_JITTER', '0'))
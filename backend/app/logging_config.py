@@ -0,0 +1,167 @@
+"""
+Application logging setup.
+
+Request threads only put records on a queue. A QueueListener thread formats
+them (JSON by default) and writes them to stderr, so slow formatting and
+I/O stay off the request path. High-volume DEBUG records can be sampled
+before they are queued. Credentials and long payloads are redacted on the
+listener side before anything is written.
+
+Everything is driven by Config:
+    LOG_LEVEL=INFO
+    LOG_LEVELS=app.routes.chat=DEBUG,pymongo=WARNING
+    LOG_FORMAT=json|text
+    LOG_DEBUG_SAMPLE_RATE=0.01
+    LOG_MAX_MESSAGE_CHARS=2000
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from .config import Config
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_REDACTIONS = [
+    # Authorization: Bearer <jwt>, and bare JWTs
+    (re.compile(r"(Bearer\s+)[A-Za-z0-9\-_.=]+"), r"\1[REDACTED]"),
+    (re.compile(r"eyJ[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+"), "[REDACTED]"),
+    # OpenAI-style keys
+    (re.compile(r"sk-[A-Za-z0-9\-_]{8,}"), "[REDACTED]"),
+    # Secrets in dict reprs, JSON and query strings
+    (re.compile(r"""(['"]?(?:password|api_token|apiKey|api_key|aiCredentials|managementCredentials|"""
+                r"""secret_key|access_token)['"]?\s*[:=]\s*)(['"]?)[^'",&\s}]+\2""", re.IGNORECASE),
+     r"\1\2[REDACTED]\2"),
+]
+
+_listener: Optional[QueueListener] = None
+# Config the listener was built from, reused when a forked worker restarts it
+_config = Config
+
+def redact(text: str, max_chars: int = 0) -> str:
+    """Mask credentials in a log message and truncate it to `max_chars` (0 for no limit)."""
+    for pattern, replacement in _REDACTIONS:
+        text = pattern.sub(replacement, text)
+    if max_chars and len(text) > max_chars:
+        text = f"{text[:max_chars]}... [{len(text) - max_chars} chars truncated]"
+    return text
+
+class RedactionFilter(logging.Filter):
+    def __init__(self, max_chars: int = 0):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def filter(self, record):
+        record.msg = redact(record.getMessage(), self.max_chars)
+        record.args = None
+        if record.exc_info:
+            # Tracebacks can quote request data too
+            record.exc_text = redact(logging.Formatter().formatException(record.exc_info))
+            record.exc_info = None
+        return True
+
+class _RecordQueueHandler(QueueHandler):
+    """Queue records unformatted; QueueHandler.prepare() would format them on the request thread."""
+
+    def prepare(self, record):
+        # A copy, so handlers elsewhere in the process never see the listener's redaction
+        return copy.copy(record)
+
+class SamplingFilter(logging.Filter):
+    """Keep a `rate` fraction of records below INFO; everything else passes."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.INFO or self.rate >= 1.0 or random.random() < self.rate
+
+class TraceContextFilter(logging.Filter):
+    """Tag records with the current trace id while they are still on the request thread."""
+
+    def filter(self, record):
+        from .services.tracing import current_trace_id
+        trace_id = current_trace_id()
+        if trace_id:
+            record.trace_id = trace_id
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; fields passed via `extra` are included."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+def _parse_levels(spec: str):
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+def configure_logging(config=Config) -> None:
+    """Install the queue handler on the root logger; safe to call more than once."""
+    global _listener, _config
+    if _listener is not None:
+        return
+    _config = config
+
+    formatter = JsonFormatter() if config.LOG_FORMAT == "json" else \
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(formatter)
+    stream.addFilter(RedactionFilter(config.LOG_MAX_MESSAGE_CHARS))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _RecordQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(config.LOG_DEBUG_SAMPLE_RATE))
+    queue_handler.addFilter(TraceContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(config.LOG_LEVEL.upper())
+    for name, level in _parse_levels(config.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def restart_logging() -> None:
+    """Start a fresh listener thread, e.g. in a worker forked from a configured parent."""
+    global _listener
+    _listener = None
+    configure_logging(_config)
+
+def stop_logging() -> None:
+    """Drain the queue and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,12 @@
+"""
+Versioned data migrations. Run them with scripts/migrate_db.py.
+"""
+
+from .runner import Migration, MigrationRunner
+from .versions import MIGRATIONS
+
+__all__ = [
+    'Migration',
+    'MigrationRunner',
+    'MIGRATIONS'
+]
@@ -0,0 +1,144 @@
+"""
+Batched, resumable, throttled data migrations.
+
+A migration walks one collection in _id order, `batch_size` documents at a
+time. It turns each batch into bulk_write operations and records the last
+_id it finished in schema_migrations. An interrupted run resumes from that
+checkpoint. A finished migration is marked completed and skipped on later
+runs. Batches are paced to `docs_per_sec` source documents per second, so
+a migration can run against a live database.
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS = "schema_migrations"
+
+class Migration:
+    """
+    One versioned migration over a single source collection.
+
+    Subclasses set `version`, `name` and `collection`, optionally narrow
+    `filter()`, and implement `operations()` to map a batch of source
+    documents to write operations on `target()`.
+    """
+    version: int = 0
+    name: str = ""
+    collection: str = ""
+
+    def source(self, db):
+        return db[self.collection]
+
+    def target(self, db):
+        return db[self.collection]
+
+    def filter(self) -> Dict[str, Any]:
+        return {}
+
+    def operations(self, documents: List[Dict[str, Any]]) -> List[Any]:
+        raise NotImplementedError
+
+    @property
+    def id(self) -> str:
+        return f"{self.version:04d}_{self.name}"
+
+class MigrationRunner:
+    def __init__(self, db, batch_size: int = 1000, docs_per_sec: float = 0, dry_run: bool = False,
+                 out=print):
+        self.db = db
+        self.batch_size = batch_size
+        self.docs_per_sec = docs_per_sec
+        self.dry_run = dry_run
+        self.out = out
+
+    def status(self, migrations: Iterable[Migration]) -> List[Dict[str, Any]]:
+        checkpoints = {c["_id"]: c for c in self.db[CHECKPOINTS].find()}
+        return [
+            {
+                "id": migration.id,
+                "status": checkpoints.get(migration.id, {}).get("status", "pending"),
+                "processed": checkpoints.get(migration.id, {}).get("processed", 0),
+            }
+            for migration in sorted(migrations, key=lambda m: m.version)
+        ]
+
+    def run_all(self, migrations: Iterable[Migration]) -> None:
+        for migration in sorted(migrations, key=lambda m: m.version):
+            self.run(migration)
+
+    def run(self, migration: Migration) -> Optional[Dict[str, Any]]:
+        checkpoints = self.db[CHECKPOINTS]
+        checkpoint = checkpoints.find_one({"_id": migration.id}) or {}
+        if checkpoint.get("status") == "completed":
+            self.out(f"{migration.id}: already completed")
+            return checkpoint
+
+        source = migration.source(self.db)
+        target = migration.target(self.db)
+        last_id = checkpoint.get("last_id")
+        processed = checkpoint.get("processed", 0)
+        estimate = source.estimated_document_count()
+        if last_id is not None:
+            self.out(f"{migration.id}: resuming after _id {last_id} ({processed} done)")
+        else:
+            self.out(f"{migration.id}: starting (about {estimate} documents in {migration.collection})")
+            if not self.dry_run:
+                checkpoints.update_one(
+                    {"_id": migration.id},
+                    {"$set": {"status": "running", "started_at": datetime.utcnow(), "processed": 0}},
+                    upsert=True
+                )
+
+        start = time.monotonic()
+        run_docs = 0
+        run_writes = 0
+        while True:
+            query = dict(migration.filter())
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            documents = list(source.find(query).sort("_id", ASCENDING).limit(self.batch_size))
+            if not documents:
+                break
+
+            operations = migration.operations(documents)
+            if operations and not self.dry_run:
+                target.bulk_write(operations, ordered=False)
+            last_id = documents[-1]["_id"]
+            processed += len(documents)
+            run_docs += len(documents)
+            run_writes += len(operations)
+            if not self.dry_run:
+                checkpoints.update_one(
+                    {"_id": migration.id},
+                    {"$set": {"last_id": last_id, "processed": processed, "updated_at": datetime.utcnow()}}
+                )
+
+            elapsed = time.monotonic() - start
+            self._throttle(run_docs, elapsed)
+            elapsed = time.monotonic() - start
+            rate = run_docs / elapsed if elapsed else 0.0
+            self.out(f"{migration.id}: {processed}/{estimate} documents, {run_writes} writes, "
+                     f"{rate:.0f} docs/s")
+
+        elapsed = time.monotonic() - start
+        if not self.dry_run:
+            checkpoints.update_one(
+                {"_id": migration.id},
+                {"$set": {"status": "completed", "completed_at": datetime.utcnow(), "processed": processed}}
+            )
+        self.out(f"{migration.id}: completed {run_docs} documents ({run_writes} writes) in {elapsed:.1f}s"
+                 + (" [dry run]" if self.dry_run else ""))
+        return {"_id": migration.id, "processed": processed, "writes": run_writes}
+
+    def _throttle(self, done: int, elapsed: float) -> None:
+        """Sleep until the run is back under `docs_per_sec` documents processed."""
+        if self.docs_per_sec <= 0:
+            return
+        ahead = done / self.docs_per_sec - elapsed
+        if ahead > 0:
+            time.sleep(ahead)
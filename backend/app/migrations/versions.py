@@ -0,0 +1,57 @@
+"""
+The registered migrations, applied in version order.
+
+Every migration must be safe to re-run over documents it has already
+handled, because a crash between bulk_write and the checkpoint replays that
+batch.
+"""
+from pymongo import ReplaceOne, UpdateOne
+
+from .runner import Migration
+
+class CopyCollection(Migration):
+    """Copy a collection from the old intel_agent database, keeping _ids."""
+
+    source_database = "intel_agent"
+
+    def __init__(self, version, collection):
+        self.version = version
+        self.collection = collection
+        self.name = f"copy_{self.source_database}_{collection}"
+
+    def source(self, db):
+        return db.client[self.source_database][self.collection]
+
+    def operations(self, documents):
+        return [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in documents]
+
+class BackfillUpdatedAt(Migration):
+    """Set updated_at on documents that lack it, which the sort and archival indexes need."""
+
+    def __init__(self, version, collection, fallbacks):
+        self.version = version
+        self.collection = collection
+        self.fallbacks = fallbacks
+        self.name = f"{collection}_updated_at"
+
+    def filter(self):
+        return {"updated_at": {"$exists": False}}
+
+    def operations(self, documents):
+        operations = []
+        for doc in documents:
+            value = next((doc[field] for field in self.fallbacks if doc.get(field)), None)
+            if value is None:
+                value = doc["_id"].generation_time.replace(tzinfo=None)
+            operations.append(UpdateOne({"_id": doc["_id"], "updated_at": {"$exists": False}},
+                                        {"$set": {"updated_at": value}}))
+        return operations
+
+MIGRATIONS = [
+    # Formerly scripts/migrate_db.py
+    CopyCollection(1, "users"),
+    CopyCollection(2, "user_configs"),
+    # create_default_user_config() wrote camelCase timestamps only
+    BackfillUpdatedAt(3, "user_configs", ["updatedAt", "createdAt"]),
+    BackfillUpdatedAt(4, "conversations", ["created_at"]),
+]
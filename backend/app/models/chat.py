@@ -1,7 +1,26 @@
 from datetime import datetime
 from bson import ObjectId
+from bson.errors import InvalidId
+import base64
 import json
 
+# Fields returned by the history API unless the caller asks for fewer
+HISTORY_FIELDS = ('message', 'intent', 'response', 'created_at')
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(chat):
+    """Opaque cursor pointing just past the given chat in newest-first order."""
+    position = {'t': chat['created_at'].isoformat(), 'id': str(chat['_id'])}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(position['t']), ObjectId(position['id'])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+
 class Chat:
     def __init__(self, db):
         self.db = db
@@ -27,11 +46,60 @@ class Chat:
         chat['_id'] = str(result.inserted_id)
         return chat
 
+    def iter_history(self, user_id, limit=50, cursor=None, since=None, until=None, fields=HISTORY_FIELDS):
+        """
+        Stream a user's chats newest first, starting after `cursor`.
+
+        Keyset pagination on (user_id, created_at, _id) served by the
+        user_id_created_at_id index, so a page deep in the history costs the
+        same as the first one. `since`/`until` bound created_at.
+        """
+        query = {'user_id': user_id}
+        created_at = {}
+        if since is not None:
+            created_at['$gte'] = since
+        if until is not None:
+            created_at['$lt'] = until
+        if created_at:
+            query['created_at'] = created_at
+        if cursor:
+            after_time, after_id = decode_cursor(cursor)
+            query['$or'] = [
+                {'created_at': {'$lt': after_time}},
+                {'created_at': after_time, '_id': {'$lt': after_id}}
+            ]
+
+        projection = {field: 1 for field in fields}
+        projection['created_at'] = 1
+        results = self.collection.find(query, projection) \
+            .sort([('created_at', -1), ('_id', -1)]) \
+            .limit(limit) \
+            .batch_size(min(limit, 100))
+        for chat in results:
+            yield chat
+
+    def get_history_page(self, user_id, limit=50, cursor=None, since=None, until=None, fields=HISTORY_FIELDS):
+        """One page of history and the cursor for the next page (None at the end)."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        chats = []
+        next_cursor = None
+        # Fetch one extra to know whether another page exists
+        for chat in self.iter_history(user_id, limit + 1, cursor, since, until, fields):
+            if len(chats) == limit:
+                next_cursor = encode_cursor(chats[-1])
+                break
+            chats.append(chat)
+
+        for chat in chats:
+            chat['_id'] = str(chat['_id'])
+        return chats, next_cursor
+
     def get_user_chats(self, user_id, limit=50):
+        # Whole documents and no page size cap; MAX_PAGE_SIZE only applies to the history API
         chats = list(self.collection.find(
             {'user_id': user_id}
-        ).sort('created_at', -1).limit(limit))
-        
+        ).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+
         for chat in chats:
             chat['_id'] = str(chat['_id'])
         return chats
@@ -1,6 +1,7 @@
 from datetime import datetime
+from bson import ObjectId
 from mongoengine import Document, StringField, DateTimeField, BooleanField
-from werkzeug.security import generate_password_hash, check_password_hash
+from ..services.password_hasher import password_hasher, HashingBusy
 import logging
 
 logger = logging.getLogger(__name__)
@@ -44,19 +45,24 @@ class User(Document):
             # Create new user with hashed password
             user = cls(
                 email=email,
-                password=generate_password_hash(password),
+                password=password_hasher.hash(password),
                 name=name,
                 role=role
             )
             user.save()
             return user, None
+        except HashingBusy:
+            raise
         except Exception as e:
             logger.error(f"Error creating user: {str(e)}")
             return None, str(e)
 
     def verify_password(self, password):
+        """Check a password; raises HashingBusy when the hashing pool is saturated."""
         try:
-            return check_password_hash(self.password, password)
+            return password_hasher.verify(self.password, password)
+        except HashingBusy:
+            raise
         except Exception as e:
             logger.error(f"Error verifying password: {str(e)}")
             return False
@@ -79,10 +85,13 @@ class User(Document):
         try:
             logger.debug(f"Updating user: {user_id}")
             update_data['updated_at'] = datetime.utcnow()
-            result = self.collection.update_one(
+            result = self._get_collection().update_one(
                 {'_id': ObjectId(user_id)},
                 {'$set': update_data}
             )
+            # A raw update skips the post_save signal, so drop the cached user here
+            from ..utils.auth import invalidate_user
+            invalidate_user(user_id)
             success = result.modified_count > 0
             logger.debug(f"User update {'successful' if success else 'failed'}: {user_id}")
             return success
@@ -1,58 +1,16 @@
 from flask import Blueprint, request, jsonify, current_app
-from ..models.user import User
-from ..services.mongo_client import get_mongo_client
+from ..utils.auth import token_required
+from ..services.mongo_client import get_db
+from ..services.config_cache import invalidate_user_configs
+from ..ai_clients.usage import usage_tracker
 import logging
-from functools import wraps
-import jwt
-from datetime import datetime
+from datetime import datetime, timedelta
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 ai_config_bp = Blueprint('ai_config', __name__, url_prefix='/api/ai-config')
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        logger.debug("Checking token in request")
-        logger.debug(f"Request headers: {dict(request.headers)}")
-        
-        # Allow OPTIONS requests without token validation
-        if request.method == 'OPTIONS':
-            logger.debug("Allowing OPTIONS request without token validation")
-            return '', 200
-        
-        token = None
-        auth_header = request.headers.get('Authorization')
-        
-        if auth_header:
-            try:
-                token = auth_header.split(" ")[1]
-                logger.debug("Token found in Authorization header")
-            except IndexError:
-                logger.error("Token not found in Authorization header")
-                return jsonify({'message': 'Token is missing'}), 401
-        else:
-            logger.error("No Authorization header found")
-            return jsonify({'message': 'Token is missing'}), 401
-
-        try:
-            logger.debug("Decoding token")
-            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-            current_user = User.objects(id=data['user_id']).first()
-            if not current_user:
-                logger.error("User not found for token")
-                return jsonify({'message': 'Invalid token'}), 401
-            logger.debug(f"Token validated for user: {current_user.email}")
-        except Exception as e:
-            logger.error(f"Token validation error: {str(e)}")
-            return jsonify({'message': 'Invalid token'}), 401
-
-        return f(current_user, *args, **kwargs)
-    return decorated
-
 @ai_config_bp.route('/connect', methods=['POST', 'OPTIONS'])
 @token_required
 def connect_ai(current_user):
@@ -67,8 +25,7 @@ def connect_ai(current_user):
             return jsonify({'error': 'AI engine and credentials are required'}), 400
 
         logger.debug(f"Connecting AI engine for user: {current_user.email}, engine: {data['aiEngine']}")
-        client = get_mongo_client()
-        db = client.scrum_master_db
+        db = get_db()
 
         # Update or insert the AI configuration
         result = db.user_configs.update_one(
@@ -82,6 +39,7 @@ def connect_ai(current_user):
             },
             upsert=True
         )
+        invalidate_user_configs(current_user.id)
 
         if result.modified_count > 0 or result.upserted_id:
             logger.info(f"Successfully connected AI engine for user: {current_user.email}")
@@ -109,8 +67,7 @@ def check_ai_status(current_user):
         
     try:
         logger.debug(f"Checking AI status for user: {current_user.email}")
-        client = get_mongo_client()
-        db = client.scrum_master_db
+        db = get_db()
         config = db.user_configs.find_one({
             "userId": str(current_user.id)
         })
@@ -142,8 +99,7 @@ def get_ai_configs(current_user):
         
     try:
         logger.debug(f"Fetching AI configs for user: {current_user.email}")
-        client = get_mongo_client()
-        db = client.scrum_master_db
+        db = get_db()
         configs = list(db.user_configs.find({
             "userId": str(current_user.id)
         }))
@@ -177,12 +133,12 @@ def delete_ai_config(current_user):
             return jsonify({'error': 'AI engine type is required'}), 400
 
         logger.debug(f"Deleting AI config for user: {current_user.email}, engine: {data['aiEngine']}")
-        client = get_mongo_client()
-        db = client.scrum_master_db
+        db = get_db()
         result = db.user_configs.delete_one({
             "userId": str(current_user.id),
             "aiEngine": data['aiEngine']
         })
+        invalidate_user_configs(current_user.id)
 
         if result.deleted_count == 0:
             logger.error(f"No configuration found for engine: {data['aiEngine']}")
@@ -198,4 +154,40 @@ def delete_ai_config(current_user):
 
     except Exception as e:
         logger.error(f"Error deleting AI config: {str(e)}", exc_info=True)
-        return jsonify({'error': 'Internal server error'}), 500 
\ No newline at end of file
+        return jsonify({'error': 'Internal server error'}), 500
+
+@ai_config_bp.route('/metrics', methods=['GET', 'OPTIONS'])
+@token_required
+def get_ai_metrics(current_user):
+    """Token, latency and cost aggregates per engine and model.
+
+    Admins see every user. Pass ?hours=N to also get the persisted hourly
+    rollups for the last N hours.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        user_id = None if current_user.role == 'admin' else str(current_user.id)
+        response = {
+            'live': usage_tracker.snapshot(user_id)
+        }
+
+        hours = request.args.get('hours', type=int)
+        if hours:
+            # Include deltas that have not been flushed yet
+            usage_tracker.flush()
+            query = {'hour': {'$gte': datetime.utcnow() - timedelta(hours=hours)}}
+            if user_id is not None:
+                query['userId'] = user_id
+            db = get_db()
+            rollups = list(db.ai_usage_rollups.find(query, {'_id': 0}).sort('hour', -1))
+            for rollup in rollups:
+                rollup['hour'] = rollup['hour'].isoformat()
+            response['rollups'] = rollups
+
+        return jsonify(response)
+
+    except Exception as e:
+        logger.error(f"Error fetching AI metrics: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Internal server error'}), 500
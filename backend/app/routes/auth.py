@@ -1,37 +1,22 @@
 from flask import Blueprint, request, jsonify, current_app
 from ..models.user import User
+from ..services.password_hasher import HashingBusy
 import jwt
 from datetime import datetime, timedelta
-from functools import wraps
 import logging
-from werkzeug.security import generate_password_hash, check_password_hash
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Create blueprint with explicit name and URL prefix
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'message': 'Token is missing'}), 401
-
-        try:
-            token = token.split(' ')[1]  # Remove 'Bearer ' prefix
-            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-            current_user = User.objects(id=data['user_id']).first()
-            if not current_user:
-                return jsonify({'message': 'Invalid token'}), 401
-        except Exception as e:
-            logger.error(f"Token validation error: {str(e)}")
-            return jsonify({'message': 'Invalid token'}), 401
-
-        return f(current_user, *args, **kwargs)
-    return decorated
+def _busy_response():
+    response = jsonify({
+        'error': 'Server busy',
+        'message': 'Too many sign-ins right now. Please try again in a moment.'
+    })
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -63,6 +48,9 @@ def register():
             'user': user.to_dict()
         }), 201
 
+    except HashingBusy:
+        logger.warning("Registration rejected: password hashing pool is busy")
+        return _busy_response()
     except Exception as e:
         logger.error(f"Registration error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -107,6 +95,9 @@ def login():
             'user': user.to_dict()
         })
 
+    except HashingBusy:
+        logger.warning("Login rejected: password hashing pool is busy")
+        return _busy_response()
     except Exception as e:
         logger.error(f"Login error: {str(e)}", exc_info=True)
         return jsonify({'error': 'Internal server error'}), 500
@@ -1,34 +1,50 @@
 from flask import Blueprint, request, jsonify, current_app
-from app.utils.auth import token_required
-from app.services.mongo_client import get_mongo_client
+from app.utils.auth import token_required, authenticate
+from app.services.mongo_client import get_db
+from app.models.chat import Chat, HISTORY_FIELDS
 from app.ai_clients.base import AIClientFactory
 from app.intent_schemas import INTENT_SCHEMAS
-from app.services.jira_helper import JiraHelper
 from app.intent_handlers import invoke_intent_function
-from app.models.jira_config import JiraConfig
-from app.models.user import User
+from app.services.config_cache import get_active_jira_config, get_jira_helper, get_ai_config
+from app.services.sprint_insights import insights_key, insights_pipeline
+from app.services.conversation_writer import conversation_writer
+from app.services.rate_limit import limit_chat, rate_limiter
 import json
 from datetime import datetime
 import logging
-import jwt
 import requests
 import re
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 chat_bp = Blueprint("chat", __name__, url_prefix="/api")
 
+MEMBER_STATUS_RE = re.compile(r"status of ([a-zA-Z .,'-]+)")
+NAME_SEPARATOR_RE = re.compile(r"\s*or\s*|\s*and\s*|,")
+
+# Keyword intents answered straight from Jira, checked in order
+KEYWORD_INTENTS = [
+    ("sprint_status", ["sprint status", "status of the sprint", "current sprint status"]),
+    ("individual_status", ["individual status", "team status", "member status", "who is doing what"]),
+    ("sprint_insights", ["sprint insights", "insights", "sprint recommendations"]),
+]
+
+def match_intent(user_message):
+    """(intent, member names) for a lower-cased message; (None, None) when the AI should answer."""
+    member_status_match = MEMBER_STATUS_RE.search(user_message)
+    if member_status_match:
+        # Support multiple names separated by 'or', 'and', ','
+        names = NAME_SEPARATOR_RE.split(member_status_match.group(1))
+        return "member_status", [n.strip().title() for n in names if n.strip()]
+    for intent, keywords in KEYWORD_INTENTS:
+        if any(kw in user_message for kw in keywords):
+            return intent, None
+    return None, None
+
 def validate_token(token):
     """Validate JWT token and return user."""
     try:
-        data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-        user = User.objects(id=data['user_id']).first()
-        if not user:
-            logger.error("User not found for token")
-            return None
-        return user
+        return authenticate(token)
     except Exception as e:
         logger.error(f"Token validation error: {str(e)}")
         return None
@@ -60,7 +76,7 @@ def debug_config():
             return jsonify({"error": "Invalid token"}), 401
 
         user_id = str(current_user.id)
-        db = get_mongo_client().mydb
+        db = get_db()
 
         # Get all configs for the user
         all_configs = list(db.user_configs.find({"userId": user_id}))
@@ -89,6 +105,7 @@ def debug_config():
 
 @chat_bp.route("/chat", methods=["POST"])
 @token_required
+@limit_chat
 def chat(current_user):
     """Handle chat requests and process intents."""
     try:
@@ -104,34 +121,19 @@ def chat(current_user):
                 "message": "aiEngine, projectKey, boardId, and userMessage are required."
             }), 400
 
-        # 1. Check for specific member status query
-        member_status_match = re.search(r"status of ([a-zA-Z .,'-]+)", user_message)
-        if member_status_match:
-            # Extract member name(s)
-            names_str = member_status_match.group(1)
-            # Support multiple names separated by 'or', 'and', ','
-            names = re.split(r"\s*or\s*|\s*and\s*|,", names_str)
-            names = [n.strip().title() for n in names if n.strip()]
+        # Specific member status, then the keyword intents, are answered straight from Jira
+        intent, names = match_intent(user_message)
+        if intent == "member_status":
             return _handle_specific_member_status(current_user, project_key, board_id, names)
-
-        # 2. Sprint status intent
-        if any(kw in user_message for kw in ["sprint status", "status of the sprint", "current sprint status"]):
+        if intent == "sprint_status":
             return _handle_sprint_status(current_user, project_key, board_id)
-        # 3. Individual status intent
-        if any(kw in user_message for kw in ["individual status", "team status", "member status", "who is doing what"]):
+        if intent == "individual_status":
             return _handle_individual_status(current_user, project_key, board_id)
-
-        # Get MongoDB client
-        db = get_mongo_client().scrum_master_db
+        if intent == "sprint_insights":
+            return _handle_sprint_insights(current_user, project_key, board_id)
 
         # Get the most recent AI configuration for the user
-        ai_config = db.user_configs.find_one(
-            {
-                "userId": str(current_user.id),
-                "aiEngine": ai_engine
-            },
-            sort=[("updated_at", -1)]
-        )
+        ai_config = get_ai_config(current_user.id, ai_engine)
 
         if not ai_config:
             logger.error(f"No AI configuration found for user {str(current_user.id)} and engine {ai_engine}")
@@ -147,12 +149,9 @@ def chat(current_user):
                 "message": f"Please update your {ai_engine} configuration with valid credentials"
             }), 400
 
-        # Get existing conversation or create new one
-        convo = db.conversations.find_one({
-            "userId": str(current_user.id),
-            "projectKey": project_key,
-            "boardId": board_id
-        })
+        # Get existing conversation, including messages not yet flushed
+        conversation_key = (str(current_user.id), project_key, board_id)
+        convo = conversation_writer.load(conversation_key)
 
         # Prepare messages for AI
         messages = []
@@ -191,10 +190,15 @@ def chat(current_user):
             "content": user_message
         })
 
+        # Only requests that reach the AI provider count against its engine limit
+        limited = rate_limiter.check_response("ai_engine", ai_engine)
+        if limited is not None:
+            return limited
+
         # Initialize AI client with the credentials from the config
         try:
             logger.debug(f"Creating AI client with engine: {ai_engine}")
-            ai_client = AIClientFactory.create_client(ai_engine, ai_config["aiCredentials"])
+            ai_client = AIClientFactory.create_client(ai_engine, ai_config["aiCredentials"], user_id=str(current_user.id))
         except Exception as e:
             logger.error(f"Error creating AI client: {str(e)}")
             return jsonify({
@@ -205,61 +209,33 @@ def chat(current_user):
         # Get AI response
         try:
             logger.debug("Getting AI response...")
-            ai_response = ai_client.chat(messages)
+            jira_config = None
+            if hasattr(ai_client, "chat_with_functions"):
+                jira_config = get_active_jira_config(current_user)
+            if jira_config:
+                jira_helper = get_jira_helper(current_user)
+                ai_response = ai_client.chat_with_functions(
+                    messages,
+                    INTENT_SCHEMAS,
+                    _intent_invoker(jira_helper, project_key, board_id)
+                )
+            else:
+                ai_response = ai_client.chat(messages)
             logger.debug("Got AI response successfully")
 
-            # Save conversation
-            if not convo:
-                # Create new conversation
-                db.conversations.insert_one({
-                    "userId": str(current_user.id),
-                    "projectKey": project_key,
-                    "boardId": board_id,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": user_message,
-                            "timestamp": datetime.utcnow()
-                        },
-                        {
-                            "role": "assistant",
-                            "content": ai_response,
-                            "timestamp": datetime.utcnow()
-                        }
-                    ],
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                })
-            else:
-                # Update existing conversation - push each message individually
-                db.conversations.update_one(
-                    {
-                        "userId": str(current_user.id),
-                        "projectKey": project_key,
-                        "boardId": board_id
-                    },
-                    {
-                        "$push": {
-                            "messages": {
-                                "$each": [
-                                    {
-                                        "role": "user",
-                                        "content": user_message,
-                                        "timestamp": datetime.utcnow()
-                                    },
-                                    {
-                                        "role": "assistant",
-                                        "content": ai_response,
-                                        "timestamp": datetime.utcnow()
-                                    }
-                                ]
-                            }
-                        },
-                        "$set": {
-                            "updated_at": datetime.utcnow()
-                        }
-                    }
-                )
+            # Save conversation; with write-behind this only queues the append
+            conversation_writer.append(conversation_key, [
+                {
+                    "role": "user",
+                    "content": user_message,
+                    "timestamp": datetime.utcnow()
+                },
+                {
+                    "role": "assistant",
+                    "content": ai_response,
+                    "timestamp": datetime.utcnow()
+                }
+            ])
 
             return jsonify({"response": ai_response})
 
@@ -277,19 +253,70 @@ def chat(current_user):
             "message": str(e)
         }), 500
 
+@chat_bp.route("/chat/history", methods=["GET", "OPTIONS"])
+@token_required
+def chat_history(current_user):
+    """Page back through the user's chat history, newest first.
+
+    Query parameters: limit (max 200), cursor (nextCursor from the previous
+    page), since/until (ISO timestamps) and fields (comma-separated subset of
+    message, intent, response).
+    """
+    if request.method == "OPTIONS":
+        return "", 200
+
+    try:
+        since = request.args.get("since")
+        until = request.args.get("until")
+        since = datetime.fromisoformat(since) if since else None
+        until = datetime.fromisoformat(until) if until else None
+        fields = HISTORY_FIELDS
+        if request.args.get("fields"):
+            fields = tuple(f for f in request.args["fields"].split(",") if f in HISTORY_FIELDS)
+        chats, next_cursor = Chat(get_db()).get_history_page(
+            str(current_user.id),
+            limit=request.args.get("limit", 50, type=int),
+            cursor=request.args.get("cursor"),
+            since=since,
+            until=until,
+            fields=fields
+        )
+    except ValueError as e:
+        return jsonify({
+            "error": "Invalid parameters",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error fetching chat history: {str(e)}", exc_info=True)
+        return jsonify({
+            "error": "Internal server error",
+            "message": str(e)
+        }), 500
+
+    for item in chats:
+        item["created_at"] = item["created_at"].isoformat()
+    return jsonify({
+        "chats": chats,
+        "nextCursor": next_cursor
+    })
+
+def _intent_invoker(jira_helper, project_key, board_id):
+    """Bind intent functions to the user's Jira and the board the chat is about."""
+    async def invoke(name, args):
+        # The model is not told the board or project, so fill them in
+        args = {"boardId": board_id, "projectKey": project_key, **args}
+        return await invoke_intent_function(name, args, jira_helper)
+    return invoke
+
 def _handle_sprint_status(current_user, project_key, board_id):
     try:
         # Get active Jira configuration
-        jira_config = JiraConfig.objects(user=current_user, is_active=True).first()
+        jira_config = get_active_jira_config(current_user)
         if not jira_config:
             return jsonify({
                 "response": "Jira is not configured for your account. Please configure Jira first."
             })
-        jira_helper = JiraHelper(
-            domain=jira_config.domain,
-            email=jira_config.email,
-            api_token=jira_config.api_token
-        )
+        jira_helper = get_jira_helper(current_user)
         active_sprint = jira_helper.get_active_sprint(board_id)
         if not active_sprint:
             return jsonify({"response": "No active sprint found for the selected board."})
@@ -306,16 +333,12 @@ def _handle_sprint_status(current_user, project_key, board_id):
 def _handle_individual_status(current_user, project_key, board_id):
     try:
         # Get active Jira configuration
-        jira_config = JiraConfig.objects(user=current_user, is_active=True).first()
+        jira_config = get_active_jira_config(current_user)
         if not jira_config:
             return jsonify({
                 "response": "Jira is not configured for your account. Please configure Jira first."
             })
-        jira_helper = JiraHelper(
-            domain=jira_config.domain,
-            email=jira_config.email,
-            api_token=jira_config.api_token
-        )
+        jira_helper = get_jira_helper(current_user)
         active_sprint = jira_helper.get_active_sprint(board_id)
         if not active_sprint:
             return jsonify({"response": "No active sprint found for the selected board."})
@@ -328,6 +351,32 @@ def _handle_individual_status(current_user, project_key, board_id):
         logger.error(f"Error in _handle_individual_status: {str(e)}", exc_info=True)
         return jsonify({"response": f"Error fetching individual status: {str(e)}"})
 
+def _handle_sprint_insights(current_user, project_key, board_id):
+    try:
+        jira_config = get_active_jira_config(current_user)
+        if not jira_config:
+            return jsonify({
+                "response": "Jira is not configured for your account. Please configure Jira first."
+            })
+        key = insights_key(jira_config, board_id)
+        entry = insights_pipeline.get(key)
+        if entry is None:
+            jira_helper = get_jira_helper(current_user)
+            active_sprint = jira_helper.get_active_sprint(board_id)
+            if not active_sprint:
+                return jsonify({"response": "No active sprint found for the selected board."})
+            sprint_details = jira_helper.get_sprint_details(active_sprint["id"])
+            issues = jira_helper.get_sprint_issues(active_sprint["id"])
+            entry = insights_pipeline.observe(key, sprint_details, issues)
+        if entry["insights"]:
+            return jsonify({"response": entry["insights"]})
+        if entry["status"] == "failed":
+            return jsonify({"response": f"Could not generate sprint insights: {entry['error']}"})
+        return jsonify({"response": "Sprint insights are being generated. Please ask again in a moment."})
+    except Exception as e:
+        logger.error(f"Error in _handle_sprint_insights: {str(e)}", exc_info=True)
+        return jsonify({"response": f"Error fetching sprint insights: {str(e)}"})
+
 def _format_sprint_status(sprint_details, issues):
     # Calculate story progress
     to_do = in_progress = done = total = 0
@@ -397,16 +446,12 @@ def _format_individual_status(issues):
 
 def _handle_specific_member_status(current_user, project_key, board_id, member_names):
     try:
-        jira_config = JiraConfig.objects(user=current_user, is_active=True).first()
+        jira_config = get_active_jira_config(current_user)
         if not jira_config:
             return jsonify({
                 "response": "Jira is not configured for your account. Please configure Jira first."
             })
-        jira_helper = JiraHelper(
-            domain=jira_config.domain,
-            email=jira_config.email,
-            api_token=jira_config.api_token
-        )
+        jira_helper = get_jira_helper(current_user)
         active_sprint = jira_helper.get_active_sprint(board_id)
         if not active_sprint:
             return jsonify({"response": "No active sprint found for the selected board."})
@@ -1,70 +1,21 @@
 from flask import Blueprint, request, jsonify, current_app
-from ..models.user import User
+from ..utils.auth import token_required
 from ..models.scrum_master import ScrumMaster
 from ..services.integrations import JiraService
 import logging
-from functools import wraps
-import jwt
 from datetime import datetime
 from ..models.jira_config import JiraConfig
 import requests
 from requests.auth import HTTPBasicAuth
-from ..services.mongo_client import get_mongo_client
-from ..services.jira_helper import JiraHelper
+from ..services.mongo_client import get_db
+from ..services.jira_helper import jira_base_url
+from ..services.config_cache import get_active_jira_config, get_jira_helper, invalidate_user_configs
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 scrum_master_bp = Blueprint('scrum_master', __name__, url_prefix='/api/scrum-master')
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        logger.debug("Checking token in request")
-        logger.debug(f"Request headers: {dict(request.headers)}")
-        
-        # Allow OPTIONS requests without token validation
-        if request.method == 'OPTIONS':
-            logger.debug("Allowing OPTIONS request without token validation")
-            return '', 200
-        
-        token = None
-        auth_header = request.headers.get('Authorization')
-        
-        if auth_header:
-            try:
-                token = auth_header.split(" ")[1]
-                logger.debug("Token found in Authorization header")
-            except IndexError:
-                logger.error("Token not found in Authorization header")
-                return jsonify({'message': 'Token is missing'}), 401
-        else:
-            logger.error("No Authorization header found")
-            return jsonify({'message': 'Token is missing'}), 401
-
-        try:
-            logger.debug("Decoding token")
-            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-            current_user = User.objects(id=data['user_id']).first()
-            if not current_user:
-                logger.error("User not found for token")
-                return jsonify({'message': 'Invalid token'}), 401
-            logger.debug(f"Token validated for user: {current_user.email}")
-        except jwt.ExpiredSignatureError:
-            logger.error("Token has expired")
-            return jsonify({'error': 'Token has expired. Please login again.'}), 401
-        except jwt.InvalidTokenError as e:
-            logger.error(f"Invalid token: {str(e)}")
-            return jsonify({'error': 'Invalid token. Please login again.'}), 401
-        except Exception as e:
-            logger.error(f"Token validation error: {str(e)}")
-            return jsonify({'error': str(e)}), 401
-
-        return f(current_user, *args, **kwargs)
-    return decorated
-
 @scrum_master_bp.route('/test', methods=['GET'])
 def test():
     return jsonify({'message': 'Scrum master routes are working'}), 200
@@ -77,7 +28,7 @@ def create_config(current_user):
 
     try:
         data = request.get_json()
-        logger.debug(f"Creating config with data: {data}")
+        logger.debug("Creating config for user: %s", current_user.email)
 
         # Validate required fields for Jira
         if data.get('managementTool') == 'Jira':
@@ -117,7 +68,7 @@ def create_config(current_user):
                 logger.info(f"Jira configuration {'updated' if jira_config.id else 'created'} for user: {current_user.email}")
 
                 # Get MongoDB client
-                db = get_mongo_client().scrum_master_db
+                db = get_db()
 
                 # Create or update user config
                 user_config = {
@@ -143,6 +94,7 @@ def create_config(current_user):
                     {'$set': user_config},
                     upsert=True
                 )
+                invalidate_user_configs(current_user.id)
 
                 return jsonify({
                     'message': 'Configuration created successfully',
@@ -177,7 +129,7 @@ def create_config(current_user):
 def get_config(current_user):
     try:
         # Get MongoDB client
-        db = get_mongo_client().scrum_master_db
+        db = get_db()
         
         # Get the most recent config for the user
         config = db.user_configs.find_one(
@@ -211,7 +163,7 @@ def get_config(current_user):
 def update_config(current_user):
     try:
         data = request.get_json()
-        logger.debug(f"Updating config with data: {data}")
+        logger.debug("Updating config for user: %s", current_user.email)
         
         # If updating Jira credentials, update the JiraConfig
         if data.get('managementTool') == 'Jira':
@@ -229,6 +181,7 @@ def update_config(current_user):
                     jira_config.last_used = datetime.utcnow()
                     jira_config.is_active = True
                     jira_config.save()
+                    invalidate_user_configs(current_user.id)
                     logger.info(f"Updated Jira configuration for user: {current_user.email}")
                 else:
                     logger.error("No existing Jira configuration found to update")
@@ -264,8 +217,8 @@ def update_config(current_user):
 @token_required
 def delete_config(current_user):
     try:
-        scrum_master = ScrumMaster(current_user.db)
-        success = scrum_master.delete_config(current_user.id)
+        scrum_master = ScrumMaster(get_db())
+        success = scrum_master.delete_config(str(current_user.id))
         if not success:
             return jsonify({'error': 'Failed to delete configuration'}), 400
         return jsonify({'message': 'Configuration deleted successfully'}), 200
@@ -297,7 +250,7 @@ def check_jira_status(current_user):
         logger.debug(f"Checking Jira status for user: {current_user.email}")
         
         # Get active Jira configuration
-        jira_config = JiraConfig.objects(user=current_user, is_active=True).first()
+        jira_config = get_active_jira_config(current_user)
         if not jira_config:
             logger.debug("No active Jira configuration found")
             return jsonify({
@@ -310,8 +263,7 @@ def check_jira_status(current_user):
             'Accept': 'application/json'
         }
         
-        domain = jira_config.domain.replace('https://', '').replace('http://', '')
-        url = f'https://{domain}/rest/api/3/myself'
+        url = f'{jira_base_url(jira_config.domain)}/rest/api/3/myself'
         
         response = requests.get(
             url,
@@ -353,7 +305,7 @@ def get_jira_projects(current_user):
         logger.debug(f"Fetching Jira projects for user: {current_user.email}")
         
         # Get active Jira configuration
-        jira_config = JiraConfig.objects(user=current_user, is_active=True).first()
+        jira_config = get_active_jira_config(current_user)
         if not jira_config:
             logger.error("No active Jira configuration found")
             return jsonify({
@@ -367,8 +319,7 @@ def get_jira_projects(current_user):
         }
         
         # Construct the URL properly
-        domain = jira_config.domain.replace('https://', '').replace('http://', '')
-        url = f'https://{domain}/rest/api/3/project'
+        url = f'{jira_base_url(jira_config.domain)}/rest/api/3/project'
         
         logger.debug(f"Making request to Jira API: {url}")
         
@@ -411,7 +362,7 @@ def get_jira_boards(current_user):
         logger.debug(f"Fetching Jira boards for user: {current_user.email}")
         
         # Get active Jira configuration
-        jira_config = JiraConfig.objects(user=current_user, is_active=True).first()
+        jira_config = get_active_jira_config(current_user)
         if not jira_config:
             logger.error("No active Jira configuration found")
             return jsonify({
@@ -425,8 +376,7 @@ def get_jira_boards(current_user):
         }
         
         # Construct the URL properly
-        domain = jira_config.domain.replace('https://', '').replace('http://', '')
-        url = f'https://{domain}/rest/agile/1.0/board'
+        url = f'{jira_base_url(jira_config.domain)}/rest/agile/1.0/board'
         
         logger.debug(f"Making request to Jira API: {url}")
         
@@ -471,7 +421,7 @@ def get_active_sprint(current_user, board_id):
         logger.debug(f"Fetching active sprint for board {board_id}")
         
         # Get active Jira configuration
-        jira_config = JiraConfig.objects(user=current_user, is_active=True).first()
+        jira_config = get_active_jira_config(current_user)
         if not jira_config:
             logger.error("No active Jira configuration found")
             return jsonify({
@@ -480,11 +430,7 @@ def get_active_sprint(current_user, board_id):
             }), 404
 
         # Initialize Jira helper
-        jira_helper = JiraHelper(
-            domain=jira_config.domain,
-            email=jira_config.email,
-            api_token=jira_config.api_token
-        )
+        jira_helper = get_jira_helper(current_user)
 
         # Get active sprint
         try:
@@ -528,7 +474,7 @@ def get_jira_sprints(current_user):
             }), 400
 
         # Get active Jira configuration
-        jira_config = JiraConfig.objects(user=current_user, is_active=True).first()
+        jira_config = get_active_jira_config(current_user)
         if not jira_config:
             logger.error("No active Jira configuration found")
             return jsonify({
@@ -542,8 +488,7 @@ def get_jira_sprints(current_user):
         }
         
         # Construct the URL properly
-        domain = jira_config.domain.replace('https://', '').replace('http://', '')
-        url = f'https://{domain}/rest/agile/1.0/board/{board_id}/sprint'
+        url = f'{jira_base_url(jira_config.domain)}/rest/agile/1.0/board/{board_id}/sprint'
         
         logger.debug(f"Making request to Jira API: {url}")
         
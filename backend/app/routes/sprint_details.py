@@ -1,13 +1,11 @@
 from flask import Blueprint, request, jsonify
 from app.utils.auth import token_required
-from app.services.jira_helper import JiraHelper
-from app.models.jira_config import JiraConfig
+from app.services.config_cache import get_active_jira_config, get_jira_helper
+from app.services.sprint_insights import insights_key, insights_pipeline
 from datetime import datetime, timezone
 from collections import defaultdict
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 sprint_details_bp = Blueprint("sprint_details", __name__, url_prefix="/api/sprint-details")
@@ -28,7 +26,7 @@ def get_sprint_status(current_user):
             }), 400
 
         # Get active Jira configuration
-        jira_config = JiraConfig.objects(user=current_user, is_active=True).first()
+        jira_config = get_active_jira_config(current_user)
         if not jira_config:
             logger.error("No active Jira configuration found")
             return jsonify({
@@ -37,11 +35,7 @@ def get_sprint_status(current_user):
             }), 404
 
         # Initialize Jira helper with configuration
-        jira_helper = JiraHelper(
-            domain=jira_config.domain,
-            email=jira_config.email,
-            api_token=jira_config.api_token
-        )
+        jira_helper = get_jira_helper(current_user)
 
         # Get active sprint
         active_sprint = jira_helper.get_active_sprint(board_id)
@@ -81,6 +75,9 @@ def get_sprint_status(current_user):
         # Calculate sprint metrics
         sprint_metrics = calculate_sprint_metrics(sprint_details, issues)
 
+        # Refresh cached insights in the background if the sprint changed
+        insights = insights_pipeline.observe(insights_key(jira_config, board_id), sprint_details, issues)
+
         return jsonify({
             "sprint": {
                 "id": sprint_details.get("id"),
@@ -93,7 +90,8 @@ def get_sprint_status(current_user):
             "storyProgress": story_progress,
             "individualStatus": individual_status,
             "bugStatus": bug_status,
-            "sprintMetrics": sprint_metrics
+            "sprintMetrics": sprint_metrics,
+            "insights": insights_view(insights)
         })
 
     except Exception as e:
@@ -103,6 +101,66 @@ def get_sprint_status(current_user):
             "message": str(e)
         }), 500
 
+@sprint_details_bp.route("/insights", methods=["GET"])
+@token_required
+def get_sprint_insights(current_user):
+    """Get precomputed insights for the board's active sprint.
+
+    Cached insights are returned immediately. Otherwise the sprint is fetched,
+    generation starts in the background and 202 is returned.
+    """
+    try:
+        board_id = request.args.get("boardId")
+        if not board_id:
+            return jsonify({
+                "error": "Missing required parameters",
+                "message": "Please provide boardId"
+            }), 400
+
+        jira_config = get_active_jira_config(current_user)
+        if not jira_config:
+            logger.error("No active Jira configuration found")
+            return jsonify({
+                "error": "No Jira configuration found",
+                "message": "Please configure Jira first"
+            }), 404
+
+        key = insights_key(jira_config, board_id)
+        entry = insights_pipeline.get(key)
+        refresh = request.args.get("refresh") == "true"
+        if entry is None or refresh:
+            jira_helper = get_jira_helper(current_user)
+            active_sprint = jira_helper.get_active_sprint(board_id)
+            if not active_sprint:
+                return jsonify({
+                    "error": "No active sprint",
+                    "message": "No active sprint found for the selected board"
+                }), 404
+            sprint_details = jira_helper.get_sprint_details(active_sprint["id"])
+            issues = jira_helper.get_sprint_issues(active_sprint["id"])
+            entry = insights_pipeline.observe(key, sprint_details, issues, force=refresh)
+
+        view = insights_view(entry)
+        return jsonify(view), 200 if view["insights"] else 202
+
+    except Exception as e:
+        logger.error(f"Error getting sprint insights: {str(e)}", exc_info=True)
+        return jsonify({
+            "error": "Internal server error",
+            "message": str(e)
+        }), 500
+
+def insights_view(entry):
+    """Public fields of an insights cache entry."""
+    return {
+        "sprintId": entry["sprintId"],
+        "version": entry["version"],
+        "status": entry["status"],
+        "insights": entry["insights"],
+        "generatedAt": entry["generatedAt"],
+        "summary": entry["summary"]
+    }
+
 def get_story_progress(issues):
     """Calculate story progress by status."""
     # Initialize counters
@@ -0,0 +1,171 @@
+"""
+Cold storage for idle conversations.
+
+archive_idle_conversations() moves conversations not updated for
+ARCHIVE_IDLE_DAYS out of db.conversations. Each batch becomes one compressed
+JSONL blob (zstd when the `zstandard` package is installed, gzip otherwise).
+The blob is stored either as a document in conversation_archives or as a
+file under ARCHIVE_DIR. A small archived_conversations entry per
+conversation records where it went. When a user reopens an archived
+conversation, rehydrate_conversation() puts it back in the hot collection.
+
+Run it from cron or by hand:
+    flask archive-conversations --idle-days 90
+"""
+import gzip
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import Binary, ObjectId, json_util
+from bson.json_util import CANONICAL_JSON_OPTIONS
+from pymongo import ASCENDING, UpdateOne
+
+from ..config import Config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This archive is zstd-compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+def default_codec() -> str:
+    if not Config.ARCHIVE_CODEC:
+        return "zstd" if zstandard is not None else "gzip"
+    if Config.ARCHIVE_CODEC == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed; archiving with gzip")
+        return "gzip"
+    return Config.ARCHIVE_CODEC
+
+def encode_batch(conversations: List[Dict[str, Any]], codec: str) -> bytes:
+    """JSONL (extended JSON, so ObjectIds and dates round-trip), compressed."""
+    lines = "\n".join(json_util.dumps(conversation, json_options=CANONICAL_JSON_OPTIONS)
+                      for conversation in conversations)
+    return _compress(lines.encode("utf-8"), codec)
+
+def decode_batch(data: bytes, codec: str) -> List[Dict[str, Any]]:
+    text = _decompress(data, codec).decode("utf-8")
+    return [json_util.loads(line) for line in text.splitlines() if line]
+
+def _write_batch(db, batch_id: ObjectId, data: bytes, codec: str, count: int, backend: str) -> None:
+    batch = {"_id": batch_id, "codec": codec, "count": count, "created_at": datetime.utcnow()}
+    if backend == "file":
+        os.makedirs(Config.ARCHIVE_DIR, exist_ok=True)
+        filename = f"{batch_id}.jsonl.{'zst' if codec == 'zstd' else 'gz'}"
+        tmp_path = os.path.join(Config.ARCHIVE_DIR, filename + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(Config.ARCHIVE_DIR, filename))
+        batch["file"] = filename
+    else:
+        batch["data"] = Binary(data)
+    db.conversation_archives.insert_one(batch)
+
+def _read_batch(db, batch_id: ObjectId) -> List[Dict[str, Any]]:
+    batch = db.conversation_archives.find_one({"_id": batch_id})
+    if batch is None:
+        raise LookupError(f"Archive batch {batch_id} not found")
+    if "file" in batch:
+        with open(os.path.join(Config.ARCHIVE_DIR, batch["file"]), "rb") as f:
+            data = f.read()
+    else:
+        data = bytes(batch["data"])
+    return decode_batch(data, batch["codec"])
+
+def archive_idle_conversations(db, idle_days: Optional[int] = None, batch_size: Optional[int] = None,
+                               backend: Optional[str] = None) -> Dict[str, int]:
+    """
+    Archive conversations idle for longer than `idle_days`, one batch at a time.
+
+    Each batch is written to cold storage and indexed before the hot copies
+    are deleted, so an interrupted run only leaves conversations in both
+    places. A rerun archives them again and repoints the index.
+    """
+    idle_days = Config.ARCHIVE_IDLE_DAYS if idle_days is None else idle_days
+    batch_size = batch_size or Config.ARCHIVE_BATCH_SIZE
+    backend = backend or Config.ARCHIVE_BACKEND
+    codec = default_codec()
+    cutoff = datetime.utcnow() - timedelta(days=idle_days)
+    totals = {"conversations": 0, "batches": 0, "bytes": 0}
+
+    last_id = None
+    while True:
+        query = {"updated_at": {"$lt": cutoff}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        conversations = list(db.conversations.find(query).sort("_id", ASCENDING).limit(batch_size))
+        if not conversations:
+            break
+        last_id = conversations[-1]["_id"]
+
+        batch_id = ObjectId()
+        data = encode_batch(conversations, codec)
+        _write_batch(db, batch_id, data, codec, len(conversations), backend)
+
+        now = datetime.utcnow()
+        db.archived_conversations.bulk_write([
+            UpdateOne(
+                {"conversationId": conversation["_id"]},
+                {"$set": {
+                    "userId": conversation.get("userId"),
+                    "projectKey": conversation.get("projectKey"),
+                    "boardId": conversation.get("boardId"),
+                    "batchId": batch_id,
+                    "archived_at": now
+                }},
+                upsert=True
+            )
+            for conversation in conversations
+        ], ordered=False)
+
+        # Leave anything that was written to while we were archiving it
+        db.conversations.delete_many({
+            "_id": {"$in": [conversation["_id"] for conversation in conversations]},
+            "updated_at": {"$lt": cutoff}
+        })
+
+        totals["conversations"] += len(conversations)
+        totals["batches"] += 1
+        totals["bytes"] += len(data)
+        logger.info(f"Archived {len(conversations)} conversations into batch {batch_id} "
+                    f"({len(data)} bytes, {codec}, {backend})")
+
+    return totals
+
+def rehydrate_conversation(db, user_id: str, project_key, board_id) -> Optional[Dict[str, Any]]:
+    """Move an archived conversation back into db.conversations; None if it was never archived."""
+    entry = db.archived_conversations.find_one(
+        {"userId": user_id, "projectKey": project_key, "boardId": board_id},
+        sort=[("archived_at", -1)]
+    )
+    if entry is None:
+        return None
+
+    conversation = next(
+        (c for c in _read_batch(db, entry["batchId"]) if c["_id"] == entry["conversationId"]),
+        None
+    )
+    if conversation is None:
+        logger.error(f"Conversation {entry['conversationId']} missing from batch {entry['batchId']}")
+        return None
+
+    db.conversations.replace_one({"_id": conversation["_id"]}, conversation, upsert=True)
+    db.archived_conversations.delete_one({"_id": entry["_id"]})
+    logger.info(f"Rehydrated conversation {conversation['_id']} from batch {entry['batchId']}")
+    return conversation
@@ -0,0 +1,94 @@
+"""
+Cache for per-user configuration lookups.
+
+Almost every handler needs the user's active JiraConfig (and a JiraHelper
+built from it), and chat needs the user's AI engine config. Lookups are
+memoized for the duration of a request on flask.g and across requests in
+TTL caches. Writers call invalidate_user_configs() so a change is visible
+immediately in this process; other workers pick it up within
+CONFIG_CACHE_TTL seconds.
+"""
+import os
+from flask import g, has_request_context
+from mongoengine import signals
+from ..models.jira_config import JiraConfig
+from ..utils.cache import TTLCache
+from .jira_helper import JiraHelper
+from .mongo_client import get_db
+
+CONFIG_CACHE_TTL = float(os.getenv('CONFIG_CACHE_TTL', '60'))
+CONFIG_CACHE_SIZE = int(os.getenv('CONFIG_CACHE_SIZE', '4096'))
+
+# Cached "not configured" results, so unconfigured users do not hit Mongo either
+_NONE = object()
+
+jira_config_cache = TTLCache(maxsize=CONFIG_CACHE_SIZE, ttl=CONFIG_CACHE_TTL, name='jira_configs')
+jira_helper_cache = TTLCache(maxsize=CONFIG_CACHE_SIZE, ttl=CONFIG_CACHE_TTL, name='jira_helpers')
+ai_config_cache = TTLCache(maxsize=CONFIG_CACHE_SIZE, ttl=CONFIG_CACHE_TTL, name='ai_configs')
+
+def _request_memo(key, loader):
+    """Memoize a lookup on flask.g for the rest of the request."""
+    if not has_request_context():
+        return loader()
+    memo = g.setdefault('_config_memo', {})
+    if key not in memo:
+        memo[key] = loader()
+    return memo[key]
+
+def _cached(cache, key, loader):
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        cache.set(key, _NONE if value is None else value)
+    return None if value is _NONE else value
+
+def get_active_jira_config(user):
+    """The user's active JiraConfig, or None."""
+    user_id = str(user.id)
+    return _request_memo(('jira_config', user_id), lambda: _cached(
+        jira_config_cache, user_id,
+        lambda: JiraConfig.objects(user=user, is_active=True).first()
+    ))
+
+def get_jira_helper(user):
+    """A JiraHelper for the user's active Jira config, or None if Jira is not configured."""
+    user_id = str(user.id)
+
+    def build():
+        jira_config = get_active_jira_config(user)
+        if not jira_config:
+            return None
+        return JiraHelper(
+            domain=jira_config.domain,
+            email=jira_config.email,
+            api_token=jira_config.api_token
+        )
+
+    return _request_memo(('jira_helper', user_id), lambda: _cached(jira_helper_cache, user_id, build))
+
+def get_ai_config(user_id, ai_engine):
+    """The most recent user_configs document for the user and engine, or None."""
+    key = (str(user_id), ai_engine)
+    return _request_memo(('ai_config',) + key, lambda: _cached(
+        ai_config_cache, key,
+        lambda: get_db().user_configs.find_one(
+            {"userId": key[0], "aiEngine": ai_engine},
+            sort=[("updated_at", -1)]
+        )
+    ))
+
+def invalidate_user_configs(user_id):
+    """Forget every cached config for a user after one of them changes."""
+    user_id = str(user_id)
+    jira_config_cache.invalidate(user_id)
+    jira_helper_cache.invalidate(user_id)
+    ai_config_cache.invalidate_where(lambda key: key[0] == user_id)
+    if has_request_context():
+        g.pop('_config_memo', None)
+
+def _on_jira_config_change(sender, document, **kwargs):
+    if document.user is not None:
+        invalidate_user_configs(document.user.id)
+
+signals.post_save.connect(_on_jira_config_change, sender=JiraConfig)
+signals.post_delete.connect(_on_jira_config_change, sender=JiraConfig)
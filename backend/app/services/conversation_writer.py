@@ -0,0 +1,216 @@
+"""
+Conversation persistence with optional write-behind.
+
+chat() appends each user/assistant exchange to the conversation for a
+(user, project, board). With CONVERSATION_WRITE_BEHIND enabled the append is
+buffered in memory and the response returns immediately. A background thread
+flushes the buffer with one bulk_write once it holds
+CONVERSATION_FLUSH_BATCH conversations or its oldest entry is
+CONVERSATION_FLUSH_INTERVAL_MS old. Appends that have not reached Mongo yet
+are merged into load(), so the next message in the same conversation sees
+them. The buffer is flushed at exit. Conversations moved to cold storage by
+archival.py are rehydrated by load().
+
+Read-your-writes holds within one process; with several workers, route a
+user's requests to the same worker or leave write-behind off.
+"""
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from ..config import Config
+from .archival import rehydrate_conversation
+
+logger = logging.getLogger(__name__)
+
+ConversationKey = Tuple[str, Optional[str], Any]
+
+def _filter(key: ConversationKey) -> Dict[str, Any]:
+    user_id, project_key, board_id = key
+    return {"userId": user_id, "projectKey": project_key, "boardId": board_id}
+
+def _append_update(key: ConversationKey, messages: List[Dict[str, Any]], now: datetime) -> UpdateOne:
+    return UpdateOne(
+        _filter(key),
+        {
+            "$push": {"messages": {"$each": messages}},
+            "$set": {"updated_at": now},
+            "$setOnInsert": {"created_at": now},
+        },
+        upsert=True
+    )
+
+def _message_key(message: Dict[str, Any]) -> tuple:
+    """Identity of a message that survives a round trip through Mongo."""
+    timestamp = message.get("timestamp")
+    if isinstance(timestamp, datetime):
+        # BSON dates keep milliseconds; the buffered copy still has microseconds
+        timestamp = timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000, tzinfo=None)
+    return message.get("role"), message.get("content"), timestamp
+
+def _not_stored(stored: List[Dict[str, Any]], unflushed: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The part of `unflushed` not yet in `stored`.
+
+    Flushes write a conversation's buffered messages in order, so whatever
+    landed is a prefix of `unflushed`, possibly followed in `stored` by newer
+    appends.
+    """
+    stored_keys = [_message_key(message) for message in stored]
+    unflushed_keys = [_message_key(message) for message in unflushed]
+    first = unflushed_keys[0]
+    for start in range(len(stored_keys) - 1, -1, -1):
+        if stored_keys[start] != first:
+            continue
+        written = 0
+        while (written < len(unflushed_keys) and start + written < len(stored_keys)
+               and stored_keys[start + written] == unflushed_keys[written]):
+            written += 1
+        if written:
+            return unflushed[written:]
+    return unflushed
+
+class ConversationWriter:
+    def __init__(self, write_behind: bool = False, flush_interval: float = 0.2,
+                 batch_size: int = 100, max_pending: int = 1000):
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        # Serializes flushes so appends to one conversation reach Mongo in order
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[ConversationKey, List[Dict[str, Any]]] = {}
+        # Batch being written; still visible to load() until the write completes
+        self._in_flight: Dict[ConversationKey, List[Dict[str, Any]]] = {}
+        self._oldest: Optional[float] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def _collection(self, collection):
+        if collection is not None:
+            return collection
+        from .mongo_client import get_db
+        return get_db().conversations
+
+    def load(self, key: ConversationKey, collection=None) -> Optional[Dict[str, Any]]:
+        """The stored conversation with any unflushed messages appended."""
+        collection = self._collection(collection)
+        # Snapshot the buffers before reading, so a flush landing in between cannot drop
+        # messages from both; any that did land are then in the document as well
+        unflushed = []
+        if self.write_behind:
+            with self._lock:
+                unflushed = self._in_flight.get(key, []) + self._pending.get(key, [])
+        convo = collection.find_one(_filter(key))
+        if convo is None:
+            # Reopening an idle conversation brings it back from cold storage
+            convo = rehydrate_conversation(collection.database, *key)
+        if not unflushed:
+            return convo
+        if convo is None:
+            convo = dict(_filter(key), messages=[])
+        stored = list(convo.get("messages", []))
+        convo["messages"] = stored + _not_stored(stored, unflushed)
+        return convo
+
+    def append(self, key: ConversationKey, messages: List[Dict[str, Any]], collection=None) -> None:
+        """Append messages to a conversation, creating it if needed."""
+        if not self.write_behind:
+            self._collection(collection).bulk_write([_append_update(key, messages, datetime.utcnow())])
+            return
+
+        with self._lock:
+            self._pending.setdefault(key, []).extend(messages)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            queued = len(self._pending)
+        self._ensure_flusher()
+        if queued >= self.max_pending:
+            # Mongo is not keeping up; make the caller wait instead of growing without bound
+            self.flush(collection)
+        elif queued >= self.batch_size:
+            self._wake.set()
+
+    def pending_count(self) -> int:
+        """Conversations with appends not yet written."""
+        with self._lock:
+            return len(self._pending) + len(self._in_flight)
+
+    def flush(self, collection=None) -> int:
+        """Write buffered appends; returns the number of conversations written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._oldest = None
+                self._in_flight = batch
+            if not batch:
+                return 0
+            now = datetime.utcnow()
+            try:
+                self._collection(collection).bulk_write(
+                    [_append_update(key, messages, now) for key, messages in batch.items()],
+                    ordered=False
+                )
+            except Exception as e:
+                logger.error(f"Error flushing {len(batch)} conversations: {str(e)}")
+                # Keep the batch ahead of newer appends so the next flush retries it in order
+                with self._lock:
+                    for key, messages in self._pending.items():
+                        batch.setdefault(key, []).extend(messages)
+                    self._pending = batch
+                    self._in_flight = {}
+                    self._oldest = self._oldest or time.monotonic()
+                return 0
+            with self._lock:
+                self._in_flight = {}
+            return len(batch)
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="conversation-writer", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                due = self._oldest is not None and (
+                    len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._oldest >= self.flush_interval
+                )
+            if due:
+                self.flush()
+
+    def after_fork(self):
+        """Drop the parent's flusher thread and buffers; the next append() starts a new thread."""
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._in_flight = {}
+        self._oldest = None
+        self._flusher = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def shutdown(self):
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+conversation_writer = ConversationWriter(
+    write_behind=Config.CONVERSATION_WRITE_BEHIND,
+    flush_interval=Config.CONVERSATION_FLUSH_INTERVAL_MS / 1000.0,
+    batch_size=Config.CONVERSATION_FLUSH_BATCH,
+    max_pending=Config.CONVERSATION_MAX_PENDING
+)
+atexit.register(conversation_writer.shutdown)
@@ -0,0 +1,184 @@
+"""
+Dependency health probes.
+
+A background thread pings MongoDB, and Jira and Ollama when their URLs are
+configured, every HEALTH_CHECK_INTERVAL seconds and keeps the latest result
+of each. The readiness endpoint only reads those cached results, so load
+balancer polling never turns into dependency traffic. A result older than
+HEALTH_STALE_AFTER seconds counts as a failure, so a wedged probe thread
+takes the node out of rotation instead of freezing it as healthy.
+
+Only critical probes (MongoDB) decide readiness; the others are reported as
+degraded but keep the node in rotation, since a Jira outage affects every
+node alike.
+"""
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from ..config import Config
+from .metrics import gauge_lines, registry
+
+logger = logging.getLogger(__name__)
+
+class Probe:
+    def __init__(self, name: str, check: Callable[[], Optional[str]], critical: bool = False):
+        """
+        Args:
+            name: Dependency name used in responses and metrics
+            check: Raises (or returns an error string) when the dependency is unhealthy
+            critical: Whether a failure makes the node not ready
+        """
+        self.name = name
+        self.check = check
+        self.critical = critical
+
+class ProbeResult:
+    def __init__(self, ok: bool, latency: float, error: Optional[str] = None):
+        self.ok = ok
+        self.latency = latency
+        self.error = error
+        self.checked_at = time.time()
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "latencyMs": round(self.latency * 1000, 1),
+            "checkedAt": datetime.fromtimestamp(self.checked_at, timezone.utc).isoformat(),
+            "ageSeconds": round(now - self.checked_at, 1),
+            "error": self.error,
+        }
+
+class HealthMonitor:
+    def __init__(self, probes: List[Probe], interval: float = 10.0, stale_after: float = 30.0):
+        self.probes = probes
+        self.interval = interval
+        self.stale_after = stale_after
+        self._results: Dict[str, ProbeResult] = {}
+        self._lock = threading.Lock()
+        self._first_round = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = time.time()
+
+    def run_probes(self) -> None:
+        for probe in self.probes:
+            start = time.perf_counter()
+            try:
+                error = probe.check()
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            result = ProbeResult(error is None, time.perf_counter() - start, error)
+            with self._lock:
+                previous = self._results.get(probe.name)
+                self._results[probe.name] = result
+            if previous is not None and previous.ok != result.ok:
+                if result.ok:
+                    logger.info(f"Dependency {probe.name} recovered")
+                else:
+                    logger.warning(f"Dependency {probe.name} is failing: {result.error}")
+        self._first_round.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_probes()
+            except Exception as e:
+                logger.error(f"Error running health probes: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="health-probes", daemon=True)
+                self._thread.start()
+
+    def readiness(self, wait: float = 0.0) -> Dict[str, Any]:
+        """Cached probe results; `wait` bounds how long to wait for the very first round."""
+        self.start()
+        if wait:
+            self._first_round.wait(wait)
+        now = time.time()
+        with self._lock:
+            results = dict(self._results)
+        checks = {}
+        ready = True
+        degraded = False
+        for probe in self.probes:
+            result = results.get(probe.name)
+            if result is None:
+                checks[probe.name] = {"ok": False, "error": "not checked yet", "critical": probe.critical}
+                healthy = False
+            else:
+                checks[probe.name] = dict(result.to_dict(now), critical=probe.critical)
+                healthy = result.ok and now - result.checked_at <= self.stale_after
+                if result.ok and not healthy:
+                    checks[probe.name]["error"] = "result is stale"
+            if not healthy:
+                if probe.critical:
+                    ready = False
+                else:
+                    degraded = True
+        return {
+            "status": "unavailable" if not ready else "degraded" if degraded else "ready",
+            "ready": ready,
+            "checks": checks,
+            "uptimeSeconds": round(now - self.started_at, 1),
+        }
+
+    def samples(self):
+        """(labels, value) pairs for the dependency_up gauge."""
+        with self._lock:
+            return [((name,), 1 if result.ok else 0) for name, result in sorted(self._results.items())]
+
+    def after_fork(self) -> None:
+        """Drop the parent's probe thread and results and start probing from this process."""
+        self._results = {}
+        self._lock = threading.Lock()
+        self._first_round = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+def _check_mongo() -> Optional[str]:
+    from .mongo_client import get_mongo_client
+    get_mongo_client().admin.command('ping')
+    return None
+
+def _http_check(url: str) -> Callable[[], Optional[str]]:
+    def check() -> Optional[str]:
+        response = requests.get(url, timeout=Config.HEALTH_PROBE_TIMEOUT)
+        if response.status_code >= 400:
+            return f"HTTP {response.status_code}"
+        return None
+    return check
+
+def _default_probes() -> List[Probe]:
+    probes = [Probe("mongo", _check_mongo, critical=True)]
+    if Config.HEALTH_JIRA_URL:
+        probes.append(Probe("jira", _http_check(Config.HEALTH_JIRA_URL)))
+    if Config.HEALTH_OLLAMA_URL:
+        probes.append(Probe("ollama", _http_check(f"{Config.HEALTH_OLLAMA_URL.rstrip('/')}/api/tags")))
+    return probes
+
+health_monitor = HealthMonitor(
+    _default_probes(),
+    interval=Config.HEALTH_CHECK_INTERVAL,
+    stale_after=Config.HEALTH_STALE_AFTER or Config.HEALTH_CHECK_INTERVAL * 3
+)
+atexit.register(health_monitor.shutdown)
+
+@registry.collector
+def _health_lines() -> List[str]:
+    return gauge_lines("dependency_up", "Whether the last probe of a dependency succeeded",
+                       ("dependency",), health_monitor.samples())
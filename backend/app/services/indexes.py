@@ -0,0 +1,208 @@
+"""
+Index registry for the collections accessed through raw PyMongo.
+
+MongoEngine documents (User, JiraConfig) declare their own indexes in
+`meta`; everything else is declared here next to a sample of the query the
+index serves. ensure_indexes() creates them idempotently at startup or via
+`flask ensure-indexes`, and find_collscans() explains each sample query (or
+queries recorded by QueryShapeRecorder in tests) and reports collection scans.
+"""
+import logging
+import threading
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, monitoring
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[Dict[str, Any]]] = {
+    "user_configs": [
+        {
+            # chat(): most recent config for a user and engine
+            "keys": [("userId", ASCENDING), ("aiEngine", ASCENDING), ("updated_at", DESCENDING)],
+            "name": "userId_aiEngine_updated_at",
+            "query": {"filter": {"userId": "", "aiEngine": ""}, "sort": [("updated_at", DESCENDING)]},
+        },
+        {
+            # scrum_master.get_config(): most recent config for a user
+            "keys": [("userId", ASCENDING), ("updated_at", DESCENDING)],
+            "name": "userId_updated_at",
+            "query": {"filter": {"userId": ""}, "sort": [("updated_at", DESCENDING)]},
+        },
+    ],
+    "conversations": [
+        {
+            # chat(): the conversation for a user's project board
+            "keys": [("userId", ASCENDING), ("projectKey", ASCENDING), ("boardId", ASCENDING)],
+            "name": "userId_projectKey_boardId",
+            "query": {"filter": {"userId": "", "projectKey": "", "boardId": 0}},
+        },
+        {
+            # archive_idle_conversations(): idle conversations
+            "keys": [("updated_at", ASCENDING)],
+            "name": "updated_at",
+            "query": {"filter": {"updated_at": {"$lt": None}}},
+        },
+    ],
+    "archived_conversations": [
+        {
+            # rehydrate_conversation(): where a user's board conversation was archived
+            "keys": [("userId", ASCENDING), ("projectKey", ASCENDING), ("boardId", ASCENDING),
+                     ("archived_at", DESCENDING)],
+            "name": "userId_projectKey_boardId_archived_at",
+            "query": {"filter": {"userId": "", "projectKey": "", "boardId": 0},
+                      "sort": [("archived_at", DESCENDING)]},
+        },
+        {
+            # archive_idle_conversations() upserts on this key
+            "keys": [("conversationId", ASCENDING)],
+            "name": "conversationId",
+            "unique": True,
+            "query": {"filter": {"conversationId": None}},
+        },
+    ],
+    "chats": [
+        {
+            # Chat.iter_history(): keyset pages, newest chats first
+            "keys": [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            "name": "user_id_created_at_id",
+            "query": {"filter": {"user_id": "", "created_at": {"$lt": None}},
+                      "sort": [("created_at", DESCENDING), ("_id", DESCENDING)]},
+        },
+    ],
+    "scrum_master_configs": [
+        {
+            "keys": [("user_id", ASCENDING)],
+            "name": "user_id",
+            "query": {"filter": {"user_id": ""}},
+        },
+    ],
+    "rate_limits": [
+        {
+            # MongoStore counters expire two windows after they start
+            "keys": [("expires_at", ASCENDING)],
+            "name": "expires_at_ttl",
+            "options": {"expireAfterSeconds": 0},
+            "query": {"filter": {"expires_at": {"$lt": None}}},
+        },
+    ],
+    "ai_usage_rollups": [
+        {
+            # UsageTracker.flush() upserts on this key
+            "keys": [("hour", ASCENDING), ("engine", ASCENDING), ("model", ASCENDING), ("userId", ASCENDING)],
+            "name": "hour_engine_model_userId",
+            "unique": True,
+            "query": {"filter": {"hour": None, "engine": "", "model": "", "userId": ""}},
+        },
+        {
+            # /api/ai-config/metrics?hours=N for one user
+            "keys": [("userId", ASCENDING), ("hour", DESCENDING)],
+            "name": "userId_hour",
+            "query": {"filter": {"userId": "", "hour": {"$gte": None}}, "sort": [("hour", DESCENDING)]},
+        },
+    ],
+}
+
+def ensure_indexes(db) -> Dict[str, List[str]]:
+    """Create every registered index; existing identical indexes are left alone."""
+    created = {}
+    for collection, specs in INDEXES.items():
+        models = [
+            IndexModel(spec["keys"], name=spec["name"], unique=spec.get("unique", False),
+                       **spec.get("options", {}))
+            for spec in specs
+        ]
+        try:
+            created[collection] = db[collection].create_indexes(models)
+        except OperationFailure as e:
+            # Usually an index with the same name but different options
+            logger.error(f"Error creating indexes on {collection}: {str(e)}")
+    logger.info(f"Ensured indexes on {len(created)} collections")
+    return created
+
+def _plan_stages(plan):
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        yield from _plan_stages(plan.get(key))
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+def explain_uses_collscan(db, collection: str, query: Dict[str, Any]) -> bool:
+    """True when the winning plan for the query scans the whole collection."""
+    cursor = db[collection].find(query.get("filter", {}))
+    if query.get("sort"):
+        cursor = cursor.sort(query["sort"])
+    explanation = cursor.explain()
+    winning = explanation.get("queryPlanner", {}).get("winningPlan", {})
+    return "COLLSCAN" in set(_plan_stages(winning))
+
+def find_collscans(db, queries=None) -> List[Dict[str, Any]]:
+    """
+    Explain queries and return those that fall back to a COLLSCAN.
+
+    Defaults to the sample query of every registered index. Pass
+    QueryShapeRecorder.queries() to check what a test run actually issued.
+    """
+    if queries is None:
+        queries = [
+            {"collection": collection, "filter": spec["query"].get("filter", {}),
+             "sort": spec["query"].get("sort")}
+            for collection, specs in INDEXES.items() for spec in specs if "query" in spec
+        ]
+    collscans = []
+    for query in queries:
+        try:
+            if explain_uses_collscan(db, query["collection"], query):
+                collscans.append(query)
+        except OperationFailure as e:
+            logger.error(f"Error explaining query on {query['collection']}: {str(e)}")
+    return collscans
+
+def filter_shape(value):
+    """Replace literal values in a filter with their type names, keeping operators."""
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [filter_shape(item) for item in value[:1]]
+    return type(value).__name__
+
+class QueryShapeRecorder(monitoring.CommandListener):
+    """
+    Records the find commands a client issues, for COLLSCAN checks in tests.
+
+        recorder = QueryShapeRecorder()
+        client = MongoClient(uri, event_listeners=[recorder])
+        ... exercise the app ...
+        assert not find_collscans(client[db_name], recorder.queries())
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queries = {}
+
+    def started(self, event):
+        if event.command_name != "find":
+            return
+        command = event.command
+        query = {
+            "collection": command.get("find"),
+            "filter": command.get("filter", {}),
+            "sort": list(command.get("sort", {}).items()) or None,
+        }
+        key = (event.database_name, query["collection"], repr(filter_shape(query["filter"])), repr(query["sort"]))
+        with self._lock:
+            self._queries.setdefault(key, query)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def queries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._queries.values())
@@ -4,6 +4,9 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from requests.auth import HTTPBasicAuth
 import logging
+from .jira_helper import jira_base_url
+from .metrics import instrument_session
+from .tracing import trace_session
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +15,9 @@ class JiraService:
         self.email = email
         self.api_token = api_token
         self.domain = domain
-        self.base_url = f"https://{domain}/rest/api/3"
+        self.base_url = f"{jira_base_url(domain)}/rest/api/3"
         self.auth = HTTPBasicAuth(email, api_token)
+        self.session = trace_session(instrument_session(requests.Session()))
         self.headers = {
             "Accept": "application/json",
             "Content-Type": "application/json"
@@ -24,7 +28,7 @@ class JiraService:
         """Test the connection to Jira"""
         try:
             logger.debug(f"Testing connection to {self.base_url}/myself")
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/myself",
                 auth=self.auth,
                 headers=self.headers,
@@ -42,7 +46,7 @@ class JiraService:
         """Get all projects from Jira"""
         try:
             logger.debug(f"Fetching projects from {self.base_url}/project")
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/project",
                 auth=self.auth,
                 headers=self.headers,
@@ -58,7 +62,7 @@ class JiraService:
     def get_boards(self, project_key: str) -> List[Dict]:
         """Get all boards for a project"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/board",
                 auth=self.auth,
                 headers={"Accept": "application/json"},
@@ -73,7 +77,7 @@ class JiraService:
     def get_sprints(self, board_id: int) -> List[Dict]:
         """Get all sprints for a board"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/board/{board_id}/sprint",
                 auth=self.auth,
                 headers={"Accept": "application/json"}
@@ -87,7 +91,7 @@ class JiraService:
     def get_issues(self, sprint_id: int) -> List[Dict]:
         """Get all issues in a sprint"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/sprint/{sprint_id}/issue",
                 auth=self.auth,
                 headers={"Accept": "application/json"}
@@ -109,7 +113,7 @@ class JiraService:
                     "issuetype": {"name": issue_type}
                 }
             }
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/issue",
                 auth=self.auth,
                 headers={"Content-Type": "application/json"},
@@ -124,7 +128,7 @@ class JiraService:
     def update_issue(self, issue_key: str, updates: Dict) -> bool:
         """Update an existing issue in Jira"""
         try:
-            response = requests.put(
+            response = self.session.put(
                 f"{self.base_url}/issue/{issue_key}",
                 auth=self.auth,
                 headers={"Content-Type": "application/json"},
@@ -140,7 +144,7 @@ class JiraService:
         """Add a comment to an issue"""
         try:
             data = {"body": {"type": "doc", "content": [{"type": "paragraph", "content": [{"type": "text", "text": comment}]}]}}
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/issue/{issue_key}/comment",
                 auth=self.auth,
                 headers={"Content-Type": "application/json"},
@@ -154,7 +158,7 @@ class JiraService:
 
     def get_sprint_status(self, board_id):
         try:
-            response = requests.get(
+            response = self.session.get(
                 f'{self.base_url}/rest/agile/1.0/board/{board_id}/sprint',
                 auth=self.auth,
                 headers={"Accept": "application/json"}
@@ -165,7 +169,7 @@ class JiraService:
 
     def get_team_velocity(self, board_id):
         try:
-            response = requests.get(
+            response = self.session.get(
                 f'{self.base_url}/rest/agile/1.0/board/{board_id}/velocity',
                 auth=self.auth,
                 headers={"Accept": "application/json"}
@@ -176,7 +180,7 @@ class JiraService:
 
     def get_burndown(self, sprint_id):
         try:
-            response = requests.get(
+            response = self.session.get(
                 f'{self.base_url}/rest/agile/1.0/sprint/{sprint_id}/burndown',
                 auth=self.auth,
                 headers={"Accept": "application/json"}
@@ -188,10 +192,12 @@ class JiraService:
 class OllamaService:
     def __init__(self, base_url="http://localhost:11434"):
         self.base_url = base_url
+        # Traced as AI calls; instrument_session() would count them as Jira requests
+        self.session = trace_session(requests.Session(), category="ai")
 
     def query(self, prompt, model="llama2"):
         try:
-            response = requests.post(
+            response = self.session.post(
                 f'{self.base_url}/api/generate',
                 json={
                     "model": model,
@@ -204,13 +210,14 @@ class OllamaService:
             return {'error': str(e)}
 
     def get_sprint_insights(self, sprint_data):
-        prompt = f"""
-        Analyze the following sprint data and provide insights:
-        {json.dumps(sprint_data, indent=2)}
-        
-        Please provide:
-        1. Key achievements
-        2. Areas of concern
-        3. Recommendations for improvement
         """
-        return self.query(prompt) 
\ No newline at end of file
+        Ask the model for insights on a sprint.
+
+        sprint_data is either a summary from summarize_sprint() or raw
+        {"sprint": ..., "issues": [...]} data, which is summarized first so
+        the prompt carries counts and outliers instead of Jira JSON.
+        """
+        from .sprint_insights import build_insights_prompt, encode_summary, summarize_sprint
+        if "issues" in sprint_data and isinstance(sprint_data["issues"], list):
+            sprint_data = summarize_sprint(sprint_data.get("sprint", {}), sprint_data["issues"])
+        return self.query(build_insights_prompt(encode_summary(sprint_data))) 
\ No newline at end of file
@@ -1,32 +1,44 @@
+import os
 import requests
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 from requests.auth import HTTPBasicAuth
 import logging
+from .metrics import instrument_session
+from .tracing import trace_session
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+def jira_base_url(domain: str) -> str:
+    """
+    Build the base URL for a Jira site from a stored domain.
+
+    The scheme defaults to https; JIRA_URL_SCHEME=http lets the backend talk
+    to a local fake Jira (see loadtest/fake_jira.py).
+    """
+    domain = domain.replace('https://', '').replace('http://', '').rstrip('/')
+    scheme = os.getenv('JIRA_URL_SCHEME', 'https')
+    return f"{scheme}://{domain}"
+
 class JiraHelper:
     def __init__(self, domain: str, email: str, api_token: str):
         """
         Initialize JiraHelper with domain and credentials
         """
-        # Clean up domain URL
-        domain = domain.replace('https://', '').replace('http://', '')
-        self.base_url = f"https://{domain}"
+        self.base_url = jira_base_url(domain)
         self.auth = HTTPBasicAuth(email, api_token)
         self.headers = {
             'Accept': 'application/json',
             'Content-Type': 'application/json'
         }
+        # Helpers are cached per user, so keep connections to Jira alive
+        self.session = trace_session(instrument_session(requests.Session()))
         logger.debug(f"Initialized JiraHelper with base URL: {self.base_url}")
 
     def create_sprint(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new sprint in Jira."""
         url = f"{self.base_url}/rest/agile/1.0/sprint"
-        response = requests.post(url, json=payload, auth=self.auth, headers=self.headers)
+        response = self.session.post(url, json=payload, auth=self.auth, headers=self.headers)
         response.raise_for_status()
         return response.json()
 
@@ -41,7 +53,7 @@ class JiraHelper:
                 'fields': 'status,summary,assignee,issuetype,priority,customfield_10016'
             }
             logger.debug(f"Getting sprint issues from: {url}")
-            response = requests.get(url, auth=self.auth, headers=self.headers, params=params)
+            response = self.session.get(url, auth=self.auth, headers=self.headers, params=params)
             response.raise_for_status()
             return response.json().get('issues', [])
         except Exception as e:
@@ -52,19 +64,19 @@ class JiraHelper:
         """Add issues to a sprint."""
         url = f"{self.base_url}/rest/agile/1.0/sprint/{sprint_id}/issue"
         payload = {"issues": issue_keys}
-        response = requests.post(url, json=payload, auth=self.auth, headers=self.headers)
+        response = self.session.post(url, json=payload, auth=self.auth, headers=self.headers)
         response.raise_for_status()
 
     def close_sprint(self, sprint_id: int) -> None:
         """Close a sprint."""
         url = f"{self.base_url}/rest/agile/1.0/sprint/{sprint_id}/complete"
-        response = requests.post(url, auth=self.auth, headers=self.headers)
+        response = self.session.post(url, auth=self.auth, headers=self.headers)
         response.raise_for_status()
 
     def list_backlog_items(self, project_key: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """List backlog items for a project."""
         url = f"{self.base_url}/rest/agile/1.0/backlog/{project_key}?maxResults={max_results}"
-        response = requests.get(url, auth=self.auth, headers=self.headers)
+        response = self.session.get(url, auth=self.auth, headers=self.headers)
         response.raise_for_status()
         return response.json()["issues"]
 
@@ -75,7 +87,7 @@ class JiraHelper:
         try:
             url = f"{self.base_url}/rest/agile/1.0/sprint/{sprint_id}"
             logger.debug(f"Getting sprint details from: {url}")
-            response = requests.get(url, auth=self.auth, headers=self.headers)
+            response = self.session.get(url, auth=self.auth, headers=self.headers)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -85,7 +97,7 @@ class JiraHelper:
     def get_board_sprints(self, board_id: int) -> List[Dict[str, Any]]:
         """Get all sprints for a board."""
         url = f"{self.base_url}/rest/agile/1.0/board/{board_id}/sprint"
-        response = requests.get(url, auth=self.auth, headers=self.headers)
+        response = self.session.get(url, auth=self.auth, headers=self.headers)
         response.raise_for_status()
         return response.json()["values"]
 
@@ -99,7 +111,7 @@ class JiraHelper:
                 'state': 'active'
             }
             logger.debug(f"Getting active sprint from: {url}")
-            response = requests.get(url, auth=self.auth, headers=self.headers, params=params)
+            response = self.session.get(url, auth=self.auth, headers=self.headers, params=params)
             response.raise_for_status()
             sprints = response.json().get('values', [])
             return sprints[0] if sprints else None
@@ -0,0 +1,223 @@
+"""
+Process metrics in the Prometheus text exposition format.
+
+Request metrics are recorded per Flask URL rule by init_app(). Outbound
+calls are recorded where they happen: Jira through instrument_session() on
+the JiraHelper session, and AI providers from BaseAIClient.track_usage().
+Mongo command stats, cache hit ratios and pool gauges are read from their
+owners when /metrics is scraped, so the hot paths pay nothing extra for them.
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from flask import g, request
+
+# Seconds; roughly doubling from 5ms to 30s
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def format_number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_labels(self.labels, values)} {format_number(total)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((values, [list(s[0]), s[1], s[2]]) for values, s in self._series.items())
+        for values, (counts, total, count) in series:
+            lines.extend(histogram_lines(self.name, self.labels, values, self.buckets, counts, total, count))
+        return lines
+
+def histogram_lines(name, label_names, label_values, buckets, counts, total, count) -> List[str]:
+    """Exposition lines for one histogram series from per-bucket (non-cumulative) counts."""
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(list(buckets) + [float("inf")], counts):
+        cumulative += bucket_count
+        labels = format_labels(tuple(label_names) + ("le",), tuple(label_values) + (format_number(bound),))
+        lines.append(f"{name}_bucket{labels} {cumulative}")
+    labels = format_labels(label_names, label_values)
+    lines.append(f"{name}_sum{labels} {format_number(float(total))}")
+    lines.append(f"{name}_count{labels} {count}")
+    return lines
+
+def gauge_lines(name: str, help_text: str, label_names: Tuple[str, ...], samples,
+                kind: str = "gauge") -> List[str]:
+    """Exposition lines for values read at scrape time; kind="counter" for running totals."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for label_values, value in samples:
+        lines.append(f"{name}{format_labels(label_names, label_values)} {format_number(value)}")
+    return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], List[str]]) -> Callable[[], List[str]]:
+        """Register a function that returns exposition lines at scrape time."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status"))
+http_errors = registry.counter(
+    "http_request_errors_total", "HTTP requests answered with a 5xx status", ("route", "method"))
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("route", "method"))
+jira_duration = registry.histogram(
+    "jira_request_duration_seconds", "Outbound Jira API call latency", ("method", "status"))
+ai_duration = registry.histogram(
+    "ai_request_duration_seconds", "AI provider call latency", ("engine", "model", "outcome"),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0))
+ai_tokens = registry.counter(
+    "ai_tokens_total", "AI provider tokens by direction", ("engine", "model", "type"))
+
+def _route_label() -> str:
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+def init_app(app) -> None:
+    """Time every request and count it by route, method and status."""
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            route = _route_label()
+            http_duration.observe(time.perf_counter() - start, route, request.method)
+            http_requests.inc(route, request.method, str(response.status_code))
+            if response.status_code >= 500:
+                http_errors.inc(route, request.method)
+        return response
+
+def instrument_session(session):
+    """Observe every response on a requests.Session in jira_request_duration_seconds."""
+    def record(response, *args, **kwargs):
+        jira_duration.observe(response.elapsed.total_seconds(), response.request.method,
+                              str(response.status_code))
+        return response
+    session.hooks["response"].append(record)
+    return session
+
+def observe_ai_call(engine: str, model: str, latency: float, prompt_tokens: int,
+                    completion_tokens: int, error: bool) -> None:
+    ai_duration.observe(latency, engine, model or "unknown", "error" if error else "ok")
+    if prompt_tokens:
+        ai_tokens.inc(engine, model or "unknown", "prompt", amount=prompt_tokens)
+    if completion_tokens:
+        ai_tokens.inc(engine, model or "unknown", "completion", amount=completion_tokens)
+
+@registry.collector
+def _mongo_lines() -> List[str]:
+    from .mongo_monitoring import LATENCY_BUCKETS_MS, command_monitor, pool_monitor
+    commands = ["# HELP mongo_command_duration_seconds MongoDB command latency by route and operation",
+                "# TYPE mongo_command_duration_seconds histogram"]
+    buckets = [bound / 1000.0 for bound in LATENCY_BUCKETS_MS]
+    for route, operation, histogram in command_monitor.operation_histograms():
+        commands.extend(histogram_lines("mongo_command_duration_seconds", ("route", "operation"),
+                                        (route, operation), buckets, histogram.counts,
+                                        histogram.total / 1000.0, histogram.count))
+    return commands + gauge_lines(
+        "mongo_pool_connections", "MongoDB pool connections by state", ("address", "state"),
+        pool_monitor.samples())
+
+@registry.collector
+def _cache_lines() -> List[str]:
+    from ..utils.cache import named_caches
+    caches = named_caches()
+    return (
+        gauge_lines("cache_hits_total", "Cache hits", ("cache",),
+                    [((c.name,), c.hits) for c in caches], kind="counter")
+        + gauge_lines("cache_misses_total", "Cache misses", ("cache",),
+                      [((c.name,), c.misses) for c in caches], kind="counter")
+        + gauge_lines("cache_hit_ratio", "Cache hits over lookups", ("cache",),
+                      [((c.name,), c.hits / (c.hits + c.misses) if c.hits + c.misses else 0.0)
+                       for c in caches])
+        + gauge_lines("cache_entries", "Entries currently cached", ("cache",),
+                      [((c.name,), len(c)) for c in caches])
+    )
+
+@registry.collector
+def _pool_lines() -> List[str]:
+    from .conversation_writer import conversation_writer
+    from .password_hasher import password_hasher
+    return (
+        gauge_lines("password_hasher_in_flight", "Password hash jobs running or queued", (),
+                    [((), password_hasher.in_flight)])
+        + gauge_lines("password_hasher_capacity", "Password hash jobs admitted before rejecting", (),
+                      [((), password_hasher.capacity)])
+        + gauge_lines("conversation_writer_pending", "Conversations waiting to be flushed", (),
+                      [((), conversation_writer.pending_count())])
+    )
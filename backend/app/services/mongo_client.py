@@ -1,39 +1,65 @@
 from pymongo import MongoClient
-import os
+from pymongo.database import Database
+from mongoengine import connect, disconnect
+from mongoengine.connection import get_connection
 from typing import Optional
 import logging
+from ..config import Config
+from .mongo_monitoring import command_monitor, pool_monitor
+from . import tracing
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 _client: Optional[MongoClient] = None
 
 def get_mongo_client() -> MongoClient:
-    """Get MongoDB client instance."""
+    """Get the shared MongoDB client.
+
+    The client is created through MongoEngine's default connection, so the
+    Document models and the raw PyMongo collections share one pool.
+    """
     global _client
     if _client is None:
         try:
-            # Get MongoDB URI from environment variable or use default
-            mongo_uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-            logger.debug(f"Connecting to MongoDB at {mongo_uri}")
-            _client = MongoClient(mongo_uri)
+            logger.debug(f"Connecting to MongoDB at {Config.MONGODB_URI}")
+            listeners = [pool_monitor]
+            if Config.MONGODB_COMMAND_MONITORING:
+                listeners.append(command_monitor)
+            if Config.TRACING_ENABLED:
+                listeners.append(tracing.command_listener)
+            connect(
+                db=Config.MONGODB_DB,
+                host=Config.MONGODB_URI,
+                alias='default',
+                maxPoolSize=Config.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=Config.MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=Config.MONGODB_MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=Config.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                event_listeners=listeners
+            )
+            client = get_connection('default')
             # Test connection
-            _client.admin.command('ping')
+            client.admin.command('ping')
+            _client = client
             logger.info("Successfully connected to MongoDB")
         except Exception as e:
             logger.error(f"Error connecting to MongoDB: {str(e)}")
+            disconnect(alias='default')
             raise
     return _client
 
+def get_db() -> Database:
+    """Get the application database (the one named in the URI, else MONGODB_DB)."""
+    return get_mongo_client().get_default_database(Config.MONGODB_DB)
+
 def close_mongo_client():
     """Close MongoDB client connection."""
     global _client
     if _client is not None:
         try:
-            _client.close()
+            disconnect(alias='default')
             logger.info("Closed MongoDB connection")
         except Exception as e:
             logger.error(f"Error closing MongoDB connection: {str(e)}")
         finally:
-            _client = None 
\ No newline at end of file
+            _client = None
@@ -0,0 +1,273 @@
+"""
+MongoDB command monitoring.
+
+CommandMonitor is a pymongo CommandListener registered on the shared client.
+Every command is attributed to the Flask route that issued it (or to
+"<background>" outside a request) and counted per route and per
+collection/operation with a latency histogram. It also records how many
+commands each request made, which is where N+1 patterns show up. Commands
+slower than MONGODB_SLOW_COMMAND_MS are logged with their filter shape so a
+missing index can be matched against the registry in indexes.py.
+"""
+import bisect
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from flask import g, has_request_context, request
+from pymongo import monitoring
+
+from ..config import Config
+from .indexes import filter_shape
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+# Upper bounds for commands issued by a single request
+COMMANDS_PER_REQUEST_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+BACKGROUND_ROUTE = "<background>"
+
+# Commands that are connection housekeeping rather than application queries
+_IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue",
+                     "endSessions", "buildInfo", "getLastError"}
+
+def current_route() -> str:
+    """The matched URL rule of the current request, e.g. 'POST /api/chat'."""
+    if not has_request_context():
+        return BACKGROUND_ROUTE
+    rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+    return f"{request.method} {rule}"
+
+class Histogram:
+    """Per-bucket (non-cumulative) counts plus sum and max; callers hold the lock."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+class _RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.commands = 0
+        self.failures = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.commands_per_request = Histogram(COMMANDS_PER_REQUEST_BUCKETS)
+        self.operations: Dict[str, Dict[str, Any]] = {}
+
+class CommandMonitor(monitoring.CommandListener):
+    """Per-route Mongo command counts, latency histograms and a slow-command log."""
+
+    def __init__(self, slow_ms: float = 100.0, enabled: bool = True):
+        self.slow_ms = slow_ms
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._routes: Dict[str, _RouteStats] = {}
+        # Commands in flight, keyed by connection and request id
+        self._pending: Dict[tuple, tuple] = {}
+
+    def init_app(self, app) -> None:
+        """Count the commands each request issues once the request ends."""
+
+        @app.before_request
+        def _start_mongo_count():
+            g._mongo_commands = 0
+
+        @app.teardown_request
+        def _record_mongo_count(exc=None):
+            if self.enabled and "_mongo_commands" in g:
+                self.record_request(current_route(), g.pop("_mongo_commands"))
+
+    def _route(self, route: str) -> _RouteStats:
+        stats = self._routes.get(route)
+        if stats is None:
+            stats = self._routes[route] = _RouteStats()
+        return stats
+
+    def started(self, event) -> None:
+        if not self.enabled or event.command_name in _IGNORED_COMMANDS:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = None
+        route = current_route()
+        if route != BACKGROUND_ROUTE and "_mongo_commands" in g:
+            g._mongo_commands += 1
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                route, event.database_name, collection, event.command_name, self._shape(command)
+            )
+
+    def succeeded(self, event) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool) -> None:
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        route, database, collection, operation, shape = pending
+        duration_ms = event.duration_micros / 1000.0
+        key = f"{collection}.{operation}" if collection else operation
+
+        with self._lock:
+            stats = self._route(route)
+            stats.commands += 1
+            stats.latency_ms.observe(duration_ms)
+            op = stats.operations.get(key)
+            if op is None:
+                op = stats.operations[key] = {"count": 0, "failures": 0,
+                                              "latency_ms": Histogram(LATENCY_BUCKETS_MS)}
+            op["count"] += 1
+            op["latency_ms"].observe(duration_ms)
+            if failed:
+                stats.failures += 1
+                op["failures"] += 1
+
+        if duration_ms >= self.slow_ms:
+            logger.warning(f"Slow MongoDB command: {operation} {database}.{collection} "
+                           f"took {duration_ms:.1f}ms on {route}; shape={shape}")
+        elif failed:
+            logger.warning(f"MongoDB command failed: {operation} {database}.{collection} "
+                           f"on {route}: {getattr(event, 'failure', None)}")
+
+    @staticmethod
+    def _shape(command) -> Optional[Dict[str, Any]]:
+        """The parts of a command that identify its query shape, with literals stripped."""
+        shape = {}
+        for field in ("filter", "sort", "projection"):
+            if field in command:
+                shape[field] = filter_shape(command[field]) if field == "filter" else dict(command[field])
+        if "updates" in command and command["updates"]:
+            shape["filter"] = filter_shape(command["updates"][0].get("q", {}))
+        if "deletes" in command and command["deletes"]:
+            shape["filter"] = filter_shape(command["deletes"][0].get("q", {}))
+        if "pipeline" in command:
+            shape["pipeline"] = [next(iter(stage), None) for stage in command["pipeline"]]
+        return shape or None
+
+    def record_request(self, route: str, commands: int) -> None:
+        with self._lock:
+            stats = self._route(route)
+            stats.requests += 1
+            stats.commands_per_request.observe(commands)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-route stats, busiest routes first."""
+        with self._lock:
+            routes = {
+                route: {
+                    "requests": stats.requests,
+                    "commands": stats.commands,
+                    "failures": stats.failures,
+                    "commandsPerRequest": stats.commands_per_request.to_dict(),
+                    "latencyMs": stats.latency_ms.to_dict(),
+                    "operations": {
+                        key: {"count": op["count"], "failures": op["failures"],
+                              "latencyMs": op["latency_ms"].to_dict()}
+                        for key, op in sorted(stats.operations.items(), key=lambda item: -item[1]["count"])
+                    },
+                }
+                for route, stats in self._routes.items()
+            }
+        return dict(sorted(routes.items(), key=lambda item: -item[1]["commands"]))
+
+    def operation_histograms(self):
+        """(route, operation, Histogram copy) for every series, for the /metrics endpoint."""
+        with self._lock:
+            series = []
+            for route, stats in self._routes.items():
+                for key, op in stats.operations.items():
+                    histogram = Histogram(LATENCY_BUCKETS_MS)
+                    histogram.counts = list(op["latency_ms"].counts)
+                    histogram.count = op["latency_ms"].count
+                    histogram.total = op["latency_ms"].total
+                    histogram.max = op["latency_ms"].max
+                    series.append((route, key, histogram))
+        return series
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._pending.clear()
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Open and checked-out connection counts per server, for pool gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open: Dict[str, int] = {}
+        self._checked_out: Dict[str, int] = {}
+
+    def _add(self, counts, event, delta):
+        address = "%s:%s" % event.address
+        with self._lock:
+            counts[address] = counts.get(address, 0) + delta
+
+    def connection_created(self, event):
+        self._add(self._open, event, 1)
+
+    def connection_closed(self, event):
+        self._add(self._open, event, -1)
+
+    def connection_checked_out(self, event):
+        self._add(self._checked_out, event, 1)
+
+    def connection_checked_in(self, event):
+        self._add(self._checked_out, event, -1)
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            address = "%s:%s" % event.address
+            self._open.pop(address, None)
+            self._checked_out.pop(address, None)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def samples(self):
+        """((address, state), count) pairs for the open and checked-out gauges."""
+        with self._lock:
+            return ([((address, "open"), count) for address, count in sorted(self._open.items())]
+                    + [((address, "checked_out"), count) for address, count in sorted(self._checked_out.items())])
+
+command_monitor = CommandMonitor(slow_ms=Config.MONGODB_SLOW_COMMAND_MS,
+                                 enabled=Config.MONGODB_COMMAND_MONITORING)
+pool_monitor = PoolMonitor()
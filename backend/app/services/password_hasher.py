@@ -0,0 +1,109 @@
+"""
+Password hashing on a bounded process pool.
+
+Hashing and verifying passwords is deliberately CPU-heavy. Running it on the
+request thread lets a burst of logins block the web workers, so the work is
+sent to a small process pool instead. Admission is bounded: once the pool
+and its queue are full, callers get HashingBusy right away instead of
+piling up, and the route answers 503 with Retry-After.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool and its queue are full, or a result is too slow."""
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_limit: int, timeout: float):
+        """
+        Args:
+            workers: Hashing processes; 0 hashes inline on the calling thread
+            queue_limit: Calls allowed to wait for a free process
+            timeout: Seconds to wait for a result before giving up
+        """
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.capacity = max(1, workers + queue_limit)
+        self.in_flight = 0
+        self._slots = threading.BoundedSemaphore(self.capacity)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking a threaded web worker can copy held locks into the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver"))
+            return self._executor
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy("Password hashing queue is full")
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            self._release()
+            self.reset()
+            raise
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The slot stays taken until the job really finishes
+            future.cancel()
+            raise HashingBusy(f"Password hashing took longer than {self.timeout}s")
+        except BrokenProcessPool:
+            self.reset()
+            raise
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def reset(self) -> None:
+        """Drop the pool; the next call starts a fresh one (e.g. after fork)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def after_fork(self) -> None:
+        """Forget a pool inherited from the parent process without touching its processes."""
+        self._lock = threading.Lock()
+        self._executor = None
+        self.in_flight = 0
+        self._slots = threading.BoundedSemaphore(self.capacity)
+
+    def shutdown(self) -> None:
+        self.reset()
+
+password_hasher = PasswordHasher(
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1))),
+    queue_limit=int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32")),
+    timeout=float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+)
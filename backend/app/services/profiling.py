@@ -0,0 +1,187 @@
+"""
+On-demand request profiling.
+
+When PROFILING_ENABLED is set, a request is profiled if an admin sends the
+X-Profile header or if it falls in the PROFILE_SAMPLE_RATE fraction. A
+sampler thread reads the request thread's stack every PROFILE_INTERVAL_MS,
+so the profile costs one stack walk per interval. It does not slow every
+function call the way a deterministic profiler would, and it captures time
+spent waiting on Jira, the AI providers and Mongo as well as CPU.
+
+Stacks are kept in the folded format flamegraph.pl and speedscope read
+("outer;inner;leaf count"), together with the route, status and timings.
+The last PROFILE_MAX_STORED profiles of each worker process are held in
+memory.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from flask import g, request
+
+from ..config import Config
+
+PROFILE_HEADER = "X-Profile"
+
+class StackSampler:
+    """Samples one thread's Python stack on an interval from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[fold_stack(frame)] += 1
+            self.samples += 1
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    # Shorten to the package-relative path where possible
+    for marker in (f"{os.sep}site-packages{os.sep}", f"{os.sep}backend{os.sep}"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    # Definition line rather than current line, so samples in one function merge
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+def fold_stack(frame) -> str:
+    """Root-first, semicolon-joined frame labels for one stack."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+class Profile:
+    def __init__(self, method: str, path: str, route: str, trigger: str, interval: float):
+        self.id = os.urandom(6).hex()
+        self.method = method
+        self.path = path
+        self.route = route
+        self.trigger = trigger
+        self.interval = interval
+        self.started_at = time.time()
+        self.status: Optional[int] = None
+        self.duration: Optional[float] = None
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "trigger": self.trigger,
+            "startedAt": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+            "durationMs": round((self.duration or 0) * 1000, 1),
+            "samples": self.samples,
+            "intervalMs": round(self.interval * 1000, 3),
+        }
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in
+                       sorted(self.stacks.items(), key=lambda item: item[1], reverse=True))
+
+class ProfileStore:
+    """The most recent profiles of this process, newest last."""
+
+    def __init__(self, maxlen: int = 50):
+        self._profiles: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[Profile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+profile_store = ProfileStore(maxlen=Config.PROFILE_MAX_STORED)
+
+def _admin_requested() -> bool:
+    """True when the profile header comes with an admin's bearer token."""
+    if not request.headers.get(PROFILE_HEADER):
+        return False
+    from ..utils.auth import AuthError, authenticate
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return False
+    try:
+        user = authenticate(auth_header.split(' ', 1)[1])
+    except AuthError:
+        return False
+    return getattr(user, 'role', None) == 'admin'
+
+def init_app(app) -> None:
+    """Profile admin-requested and sampled requests; a no-op unless PROFILING_ENABLED."""
+    if not Config.PROFILING_ENABLED:
+        return
+    interval = Config.PROFILE_INTERVAL_MS / 1000.0
+
+    @app.before_request
+    def _start_profile():
+        if _admin_requested():
+            trigger = "header"
+        elif Config.PROFILE_SAMPLE_RATE > 0 and random.random() < Config.PROFILE_SAMPLE_RATE:
+            trigger = "sampled"
+        else:
+            return
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        g._profile = Profile(request.method, request.path, rule, trigger, interval)
+        g._profile_sampler = StackSampler(threading.get_ident(), interval)
+        g._profile_start = time.perf_counter()
+        g._profile_sampler.start()
+
+    @app.after_request
+    def _tag_profile(response):
+        profile = g.get("_profile")
+        if profile is not None:
+            profile.status = response.status_code
+            response.headers["X-Profile-Id"] = profile.id
+        return response
+
+    @app.teardown_request
+    def _finish_profile(exc=None):
+        profile = g.pop("_profile", None)
+        sampler = g.pop("_profile_sampler", None)
+        if profile is None or sampler is None:
+            return
+        sampler.stop()
+        profile.duration = time.perf_counter() - g.pop("_profile_start")
+        profile.stacks = dict(sampler.stacks)
+        profile.samples = sampler.samples
+        if profile.status is None:
+            profile.status = 500
+        profile_store.add(profile)
@@ -0,0 +1,293 @@
+"""
+Rate limits and backpressure for /api/chat, enabled with RATE_LIMIT_ENABLED.
+
+Limits are sliding windows ("20/minute"): the count in the current fixed
+window plus the previous window's count, weighted by how much of it still
+overlaps the sliding window. Three scopes are checked:
+
+    user        CHAT_USER_LIMIT, per authenticated user
+    jira        CHAT_JIRA_DOMAIN_LIMIT, per Atlassian site, shared by its users
+    ai_engine   CHAT_AI_ENGINE_LIMIT, per AI engine, charged only for AI calls
+
+Counters live in this process by default. With RATE_LIMIT_BACKEND=mongo they
+go in the `rate_limits` collection, so the limits hold across workers and
+hosts. A key that has been denied is then also remembered locally until its
+Retry-After passes, so a client hammering the API does not turn every request
+into Mongo traffic. If Mongo itself is failing the limiter lets requests
+through rather than taking chat down with it.
+
+On top of the rates, each worker admits at most CHAT_MAX_CONCURRENT chat
+requests at once and CHAT_MAX_CONCURRENT_PER_USER per user. Requests over
+either limit are turned away immediately instead of queueing in front of
+Ollama. Those caps are checked first, and a request rejected by the Jira site
+limit gets its user hit back, so a rejection never spends a quota it did not
+use. Every rejection is a 429 with a Retry-After header.
+"""
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from flask import jsonify, request
+import pymongo
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from ..config import Config
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+rate_limited = registry.counter(
+    "rate_limited_total", "Requests rejected by a rate or concurrency limit", ("scope",))
+
+def parse_limit(spec: str) -> Optional[Tuple[int, float]]:
+    """(count, period seconds) from e.g. "20/minute" or "5/10second"; None when empty or 0."""
+    if not spec:
+        return None
+    count, _, unit = spec.strip().partition("/")
+    unit = unit.strip().lower().rstrip("s") or "minute"
+    multiplier = "".join(ch for ch in unit if ch.isdigit() or ch == ".")
+    unit = unit[len(multiplier):]
+    if unit not in PERIODS:
+        raise ValueError(f"Unknown rate limit period in {spec!r}")
+    if int(count) <= 0:
+        return None
+    return int(count), PERIODS[unit] * float(multiplier or 1)
+
+def _sliding_decision(current: int, previous: int, count: int, period: float, now: float):
+    """(allowed, retry_after) for a window holding `current` hits, this one included."""
+    elapsed = now % period
+    weight = 1 - elapsed / period
+    if previous * weight + current <= count:
+        return True, 0.0
+    if current > count or not previous:
+        # This window alone is full; wait for the next one
+        return False, period - elapsed
+    # Wait until the previous window's weight has decayed enough
+    needed = 1 - (count - current) / previous
+    return False, max(0.0, needed * period - elapsed)
+
+class MemoryStore:
+    """Sliding-window counters for this process."""
+
+    def __init__(self):
+        # key -> [window index, current count, previous count, period]
+        self._windows: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def hit(self, key: str, count: int, period: float, now: float):
+        window = int(now // period)
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or state[0] < window - 1:
+                state = self._windows[key] = [window, 0, 0, period]
+            elif state[0] == window - 1:
+                state[:] = [window, 0, state[1], period]
+            allowed, retry_after = _sliding_decision(state[1] + 1, state[2], count, period, now)
+            if allowed:
+                state[1] += 1
+            self._hits += 1
+            if self._hits % 1024 == 0:
+                self._prune(now)
+        return allowed, retry_after
+
+    def refund(self, key: str, period: float, now: float) -> None:
+        """Take back a hit allowed earlier in the current window."""
+        window = int(now // period)
+        with self._lock:
+            state = self._windows.get(key)
+            if state is not None and state[0] == window and state[1] > 0:
+                state[1] -= 1
+
+    def _prune(self, now: float):
+        # Keys untouched for two of their windows no longer affect any decision
+        for key in [k for k, state in self._windows.items() if state[0] < int(now // state[3]) - 1]:
+            del self._windows[key]
+
+class MongoStore:
+    """Sliding-window counters shared through MongoDB; one document per key and window."""
+
+    def __init__(self, collection_name: str = "rate_limits", timeout_ms: int = 200):
+        self.collection_name = collection_name
+        self.timeout_ms = timeout_ms
+        # key -> monotonic time until which the key is known to be over its limit
+        self._blocked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _collection(self):
+        from .mongo_client import get_db
+        return get_db()[self.collection_name]
+
+    def hit(self, key: str, count: int, period: float, now: float):
+        with self._lock:
+            blocked_until = self._blocked.get(key)
+        if blocked_until is not None:
+            remaining = blocked_until - time.monotonic()
+            if remaining > 0:
+                return False, remaining
+            with self._lock:
+                self._blocked.pop(key, None)
+
+        window = int(now // period)
+        expires_at = datetime.fromtimestamp((window + 2) * period, timezone.utc)
+        try:
+            collection = self._collection()
+            # Count the hit first, then undo it if it does not fit; this keeps the check atomic
+            current = collection.find_one_and_update(
+                {"_id": f"{key}:{window}"},
+                {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": expires_at}},
+                upsert=True, return_document=ReturnDocument.AFTER, maxTimeMS=self.timeout_ms
+            )["count"]
+            previous_doc = collection.find_one({"_id": f"{key}:{window - 1}"}, max_time_ms=self.timeout_ms)
+            previous = previous_doc["count"] if previous_doc else 0
+            allowed, retry_after = _sliding_decision(current, previous, count, period, now)
+            if not allowed:
+                # update_one takes no maxTimeMS; bound it (server selection included) the same way
+                with pymongo.timeout(self.timeout_ms / 1000):
+                    collection.update_one({"_id": f"{key}:{window}"}, {"$inc": {"count": -1}})
+        except PyMongoError as e:
+            logger.warning(f"Rate limit store unavailable, allowing request: {str(e)}")
+            return True, 0.0
+        if not allowed:
+            with self._lock:
+                now_monotonic = time.monotonic()
+                if len(self._blocked) > 10000:
+                    self._blocked = {k: until for k, until in self._blocked.items() if until > now_monotonic}
+                self._blocked[key] = now_monotonic + retry_after
+        return allowed, retry_after
+
+    def refund(self, key: str, period: float, now: float) -> None:
+        """Take back a hit allowed earlier in the current window."""
+        window = int(now // period)
+        try:
+            with pymongo.timeout(self.timeout_ms / 1000):
+                self._collection().update_one({"_id": f"{key}:{window}", "count": {"$gt": 0}},
+                                              {"$inc": {"count": -1}})
+        except PyMongoError as e:
+            logger.warning(f"Rate limit store unavailable, hit not refunded: {str(e)}")
+
+class RateLimiter:
+    def __init__(self, store, limits: Dict[str, Optional[Tuple[int, float]]], enabled: bool = True):
+        self.store = store
+        self.limits = limits
+        self.enabled = enabled
+
+    def check(self, scope: str, key) -> Tuple[bool, float]:
+        """Count one request against `scope` for `key`; (allowed, seconds until a retry may pass)."""
+        limit = self.limits.get(scope)
+        if not self.enabled or limit is None or key is None:
+            return True, 0.0
+        count, period = limit
+        allowed, retry_after = self.store.hit(f"{scope}:{str(key).lower()}", count, period, time.time())
+        if not allowed:
+            rate_limited.inc(scope)
+        return allowed, retry_after
+
+    def check_response(self, scope: str, key):
+        """None when allowed, else a 429 response to return from the view."""
+        allowed, retry_after = self.check(scope, key)
+        if allowed:
+            return None
+        return too_many_requests(scope, retry_after)
+
+    def refund(self, scope: str, key) -> None:
+        """Undo an allowed check() for a request that was rejected further on."""
+        limit = self.limits.get(scope)
+        if not self.enabled or limit is None or key is None:
+            return
+        self.store.refund(f"{scope}:{str(key).lower()}", limit[1], time.time())
+
+def too_many_requests(scope: str, retry_after: float):
+    seconds = max(1, math.ceil(retry_after))
+    response = jsonify({
+        'error': 'Too many requests',
+        'message': f'Rate limit exceeded ({scope}). Please retry in {seconds} seconds.',
+        'retryAfter': seconds
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(seconds)
+    return response
+
+class ConcurrencyLimiter:
+    """Caps requests in flight per worker and per user; never waits for a slot."""
+
+    def __init__(self, max_total: int, max_per_user: int):
+        self.max_total = max_total
+        self.max_per_user = max_per_user
+        self.in_flight = 0
+        self._per_user: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, user_key: str) -> Optional[str]:
+        """Take a slot; returns the scope that is full instead when there is none."""
+        with self._lock:
+            if self.max_total and self.in_flight >= self.max_total:
+                return "concurrency"
+            if self.max_per_user and self._per_user.get(user_key, 0) >= self.max_per_user:
+                return "user_concurrency"
+            self.in_flight += 1
+            self._per_user[user_key] = self._per_user.get(user_key, 0) + 1
+        return None
+
+    def release(self, user_key: str) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            remaining = self._per_user.get(user_key, 1) - 1
+            if remaining:
+                self._per_user[user_key] = remaining
+            else:
+                self._per_user.pop(user_key, None)
+
+def _build_store():
+    if Config.RATE_LIMIT_BACKEND == "mongo":
+        return MongoStore(timeout_ms=Config.RATE_LIMIT_STORE_TIMEOUT_MS)
+    return MemoryStore()
+
+rate_limiter = RateLimiter(_build_store(), {
+    "user": parse_limit(Config.CHAT_USER_LIMIT),
+    "jira": parse_limit(Config.CHAT_JIRA_DOMAIN_LIMIT),
+    "ai_engine": parse_limit(Config.CHAT_AI_ENGINE_LIMIT),
+}, enabled=Config.RATE_LIMIT_ENABLED)
+
+chat_concurrency = ConcurrencyLimiter(Config.CHAT_MAX_CONCURRENT, Config.CHAT_MAX_CONCURRENT_PER_USER)
+
+def limit_chat(f):
+    """Apply the concurrency caps and the user and Jira site limits; use below @token_required.
+
+    A request turned away by a later check does not count against the
+    earlier limits.
+    """
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        if not rate_limiter.enabled or request.method == 'OPTIONS':
+            return f(current_user, *args, **kwargs)
+        user_key = str(current_user.id)
+        # The caps cost nothing to check and charge no window, so they go first
+        full = chat_concurrency.acquire(user_key)
+        if full is not None:
+            rate_limited.inc(full)
+            return too_many_requests(full, 1)
+        try:
+            limited = rate_limiter.check_response("user", user_key)
+            if limited is not None:
+                return limited
+
+            from .config_cache import get_active_jira_config
+            jira_config = get_active_jira_config(current_user)
+            if jira_config is not None:
+                limited = rate_limiter.check_response("jira", jira_config.domain)
+                if limited is not None:
+                    rate_limiter.refund("user", user_key)
+                    return limited
+
+            return f(current_user, *args, **kwargs)
+        finally:
+            chat_concurrency.release(user_key)
+    return decorated
@@ -0,0 +1,117 @@
+"""
+Response serialization and compression.
+
+init_app() swaps Flask's JSON provider for one backed by orjson when the
+package is installed (JSON_PROVIDER=orjson). Output matches the default
+provider: keys stay sorted, and dates still use the HTTP date format. It
+also serializes ObjectIds as strings. Anything orjson refuses, such as
+integers wider than 64 bits, falls back to the standard library.
+
+Text and JSON responses of at least COMPRESS_MIN_BYTES are compressed
+according to Accept-Encoding: brotli when the `brotli` package is installed
+and the client accepts it, gzip otherwise.
+"""
+import gzip
+import logging
+
+from bson import ObjectId
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+from ..config import Config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = {"application/json", "application/javascript", "application/xml", "image/svg+xml"}
+
+def _default(o):
+    if isinstance(o, ObjectId):
+        return str(o)
+    return DefaultJSONProvider.default(o)
+
+class OrjsonProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def _options(self, indent: bool = False) -> int:
+        # Datetimes go through default() so they keep Flask's HTTP date format
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dump_bytes(self, obj, indent: bool = False) -> bytes:
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, indent=2 if indent else None,
+                                 separators=None if indent else (",", ":")).encode()
+
+    def dumps(self, obj, **kwargs) -> str:
+        if set(kwargs) - {"indent", "separators"}:
+            return super().dumps(obj, **kwargs)
+        return self.dump_bytes(obj, indent=bool(kwargs.get("indent"))).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dump_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
+
+def _compressible(response) -> bool:
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.direct_passthrough or response.is_streamed or "Content-Encoding" in response.headers:
+        return False
+    mimetype = response.mimetype or ""
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=Config.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=Config.COMPRESS_LEVEL, mtime=0)
+
+def init_app(app) -> None:
+    """Install the JSON provider and compress large responses."""
+    if Config.JSON_PROVIDER == "orjson":
+        if orjson is not None:
+            app.json = OrjsonProvider(app)
+        else:
+            logger.warning("JSON_PROVIDER is orjson but the orjson package is not installed; "
+                           "using the default provider")
+
+    if not Config.COMPRESS_ENABLED:
+        return
+    encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    @app.after_request
+    def _compress_response(response):
+        if not _compressible(response):
+            return response
+        response.vary.add("Accept-Encoding")
+        if response.content_length is not None and response.content_length < Config.COMPRESS_MIN_BYTES:
+            return response
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < Config.COMPRESS_MIN_BYTES:
+            return response
+        response.set_data(compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        return response
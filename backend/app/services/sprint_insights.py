@@ -0,0 +1,279 @@
+"""
+Precomputed sprint insights.
+
+Raw Jira issue JSON is reduced to a compact summary (counts, deltas against
+the previous version and outliers) before it goes anywhere near a prompt.
+Insights are generated in the background whenever a board's sprint data
+changes and cached per sprint version, so the dashboard and chat can serve
+them without waiting on the model.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from .tracing import propagate
+
+logger = logging.getLogger(__name__)
+
+DONE_STATUSES = {"done", "completed", "closed"}
+IN_PROGRESS_STATUSES = {"in progress", "inprogress", "in review"}
+URGENT_PRIORITIES = {"highest", "high"}
+TOP_ASSIGNEES = 8
+MAX_OUTLIER_KEYS = 5
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+def _status_bucket(status: str) -> str:
+    status = status.lower()
+    if status in DONE_STATUSES:
+        return "done"
+    if status in IN_PROGRESS_STATUSES:
+        return "inProgress"
+    return "toDo"
+
+def sprint_version(sprint_details: Dict[str, Any], issues: List[Dict[str, Any]]) -> str:
+    """Fingerprint of the sprint fields that affect insights."""
+    digest = hashlib.sha1()
+    digest.update(f"{sprint_details.get('id')}|{sprint_details.get('state')}|"
+                  f"{sprint_details.get('endDate')}|{sprint_details.get('goal')}".encode())
+    rows = []
+    for issue in issues:
+        fields = issue.get("fields", {})
+        rows.append(f"{issue.get('key')}|{(fields.get('status') or {}).get('name')}|"
+                    f"{(fields.get('assignee') or {}).get('displayName')}|{fields.get('customfield_10016')}")
+    for row in sorted(rows):
+        digest.update(row.encode())
+    return digest.hexdigest()
+
+def insights_key(jira_config, board_id) -> tuple:
+    """Cache key for a board as seen through one set of Jira credentials.
+
+    Domain and board id come from the user, so they alone would let anyone
+    who points a JiraConfig at another site read that site's cached insights.
+    """
+    credentials = hashlib.sha256(f"{jira_config.email}|{jira_config.api_token}".encode()).hexdigest()
+    return jira_config.domain, str(board_id), credentials
+
+def summarize_sprint(sprint_details: Dict[str, Any], issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reduce sprint data to counts, points and outliers."""
+    by_status = Counter()
+    by_type = Counter()
+    planned_points = completed_points = 0
+    assignees = defaultdict(lambda: {"open": 0, "done": 0, "openPoints": 0})
+    unassigned = unestimated = 0
+    urgent_not_started = []
+    open_bugs = []
+
+    for issue in issues:
+        fields = issue.get("fields", {})
+        bucket = _status_bucket((fields.get("status") or {}).get("name", ""))
+        issue_type = (fields.get("issuetype") or {}).get("name", "Unknown")
+        priority = (fields.get("priority") or {}).get("name", "")
+        assignee = (fields.get("assignee") or {}).get("displayName")
+        points = fields.get("customfield_10016") or 0
+
+        by_status[bucket] += 1
+        by_type[issue_type] += 1
+        planned_points += points
+        if fields.get("customfield_10016") is None:
+            unestimated += 1
+
+        if bucket == "done":
+            completed_points += points
+        elif issue_type.lower() == "bug":
+            open_bugs.append(issue.get("key"))
+        if bucket == "toDo" and priority.lower() in URGENT_PRIORITIES:
+            urgent_not_started.append(issue.get("key"))
+
+        if not assignee:
+            if bucket != "done":
+                unassigned += 1
+            continue
+        stats = assignees[assignee]
+        if bucket == "done":
+            stats["done"] += 1
+        else:
+            stats["open"] += 1
+            stats["openPoints"] += points
+
+    open_loads = [stats["openPoints"] for stats in assignees.values()]
+    mean_load = sum(open_loads) / len(open_loads) if open_loads else 0
+    overloaded = sorted(name for name, stats in assignees.items()
+                        if mean_load and stats["openPoints"] > 1.5 * mean_load)
+    busiest = sorted(assignees.items(), key=lambda item: -item[1]["openPoints"])[:TOP_ASSIGNEES]
+
+    now = datetime.now(timezone.utc)
+    start = _parse_date(sprint_details.get("startDate"))
+    end = _parse_date(sprint_details.get("endDate"))
+    days_total = (end - start).days if start and end else None
+    days_left = max(0, (end - now).days) if end else None
+
+    return {
+        "name": sprint_details.get("name"),
+        "state": sprint_details.get("state"),
+        "goal": sprint_details.get("goal"),
+        "daysTotal": days_total,
+        "daysLeft": days_left,
+        "issues": len(issues),
+        "status": {key: by_status.get(key, 0) for key in ("toDo", "inProgress", "done")},
+        "types": dict(by_type.most_common()),
+        "points": {"planned": planned_points, "completed": completed_points},
+        "assignees": {name: stats for name, stats in busiest},
+        "outliers": {
+            "unassignedOpen": unassigned,
+            "unestimated": unestimated,
+            "urgentNotStarted": len(urgent_not_started),
+            "urgentNotStartedKeys": urgent_not_started[:MAX_OUTLIER_KEYS],
+            "openBugs": len(open_bugs),
+            "openBugKeys": open_bugs[:MAX_OUTLIER_KEYS],
+            "overloaded": overloaded,
+        },
+    }
+
+def summary_deltas(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, int]:
+    """Changes in the headline counts since the previous summary."""
+    if not previous:
+        return {}
+    deltas = {
+        "toDo": current["status"]["toDo"] - previous["status"]["toDo"],
+        "inProgress": current["status"]["inProgress"] - previous["status"]["inProgress"],
+        "done": current["status"]["done"] - previous["status"]["done"],
+        "pointsDone": current["points"]["completed"] - previous["points"]["completed"],
+        "openBugs": current["outliers"]["openBugs"] - previous["outliers"]["openBugs"],
+        "issues": current["issues"] - previous["issues"],
+    }
+    return {key: value for key, value in deltas.items() if value}
+
+def encode_summary(summary: Dict[str, Any], deltas: Optional[Dict[str, int]] = None) -> str:
+    """Render a summary as terse key=value lines for a prompt."""
+    status = summary["status"]
+    points = summary["points"]
+    outliers = summary["outliers"]
+    lines = [
+        f"sprint={summary['name']} state={summary['state']} days_left={summary['daysLeft']}/{summary['daysTotal']}",
+        f"goal={summary['goal'] or '-'}",
+        f"issues={summary['issues']} todo={status['toDo']} doing={status['inProgress']} done={status['done']}",
+        f"points planned={points['planned']} done={points['completed']}",
+        "types " + " ".join(f"{name}={count}" for name, count in summary["types"].items()),
+        "load(open/done/open_pts) " + "; ".join(
+            f"{name}={stats['open']}/{stats['done']}/{stats['openPoints']}"
+            for name, stats in summary["assignees"].items()
+        ),
+        f"outliers unassigned_open={outliers['unassignedOpen']} unestimated={outliers['unestimated']} "
+        f"urgent_not_started={outliers['urgentNotStarted']}{_keys(outliers['urgentNotStartedKeys'])} "
+        f"open_bugs={outliers['openBugs']}{_keys(outliers['openBugKeys'])} "
+        f"overloaded={','.join(outliers['overloaded']) or '-'}",
+    ]
+    if deltas:
+        lines.append("since_last " + " ".join(f"{key}={value:+d}" for key, value in deltas.items()))
+    return "\n".join(lines)
+
+def _keys(keys):
+    return f"({','.join(keys)})" if keys else ""
+
+def build_insights_prompt(encoded_summary: str) -> str:
+    return (
+        "Sprint summary (key=value):\n"
+        f"{encoded_summary}\n"
+        "Give 1) key achievements 2) areas of concern 3) recommendations. "
+        "Be brief; use bullet points."
+    )
+
+class InsightsPipeline:
+    """Per-board cache of sprint summaries and background-generated insights."""
+
+    def __init__(self, max_entries: int = 512, workers: int = 2):
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sprint-insights")
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """Cached entry for a (domain, board id) key, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry else None
+
+    def observe(self, key: tuple, sprint_details: Dict[str, Any], issues: List[Dict[str, Any]],
+                generate: Optional[Callable[[str], str]] = None, force: bool = False) -> Dict[str, Any]:
+        """Record the latest sprint data for a board.
+
+        When the data differs from the cached version the summary is rebuilt
+        and insights are regenerated in the background. `force` regenerates
+        them for unchanged data too, unless a generation is already running.
+        Returns the entry.
+        """
+        version = sprint_version(sprint_details, issues)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["version"] == version and (not force or entry["status"] == "pending"):
+                self._entries.move_to_end(key)
+                return dict(entry)
+
+        if entry and entry["version"] == version:
+            # Same data: keep the summary and its deltas, only the insights are redone
+            summary, encoded = entry["summary"], entry["encoded"]
+        else:
+            summary = summarize_sprint(sprint_details, issues)
+            previous = entry["summary"] if entry and entry["sprintId"] == sprint_details.get("id") else None
+            encoded = encode_summary(summary, summary_deltas(previous, summary))
+        new_entry = {
+            "sprintId": sprint_details.get("id"),
+            "version": version,
+            "summary": summary,
+            "encoded": encoded,
+            # Keep serving the last insights while new ones are generated
+            "insights": entry["insights"] if entry else None,
+            "status": "pending",
+            "error": None,
+            "generatedAt": entry["generatedAt"] if entry else None,
+        }
+        with self._lock:
+            self._entries[key] = new_entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+        self._executor.submit(propagate(self._generate), key, version, encoded, generate or default_generator)
+        return dict(new_entry)
+
+    def _generate(self, key, version, encoded, generate):
+        try:
+            insights, error = generate(build_insights_prompt(encoded)), None
+        except Exception as e:
+            logger.error(f"Error generating sprint insights: {str(e)}")
+            insights, error = None, str(e)
+        with self._lock:
+            entry = self._entries.get(key)
+            # A newer version may have arrived while the model was running
+            if not entry or entry["version"] != version:
+                return
+            if error:
+                entry["status"] = "failed"
+                entry["error"] = error
+            else:
+                entry["status"] = "ready"
+                entry["insights"] = insights
+                entry["generatedAt"] = datetime.utcnow().isoformat()
+
+def default_generator(prompt: str) -> str:
+    """Generate insights with the Ollama server configured by OLLAMA_BASE_URL."""
+    from .integrations import OllamaService
+    service = OllamaService(os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"))
+    result = service.query(prompt, model=os.getenv("OLLAMA_INSIGHTS_MODEL", "llama3.2:latest"))
+    if "error" in result:
+        raise Exception(result["error"])
+    return result.get("response", "")
+
+insights_pipeline = InsightsPipeline()
@@ -0,0 +1,349 @@
+"""
+Lightweight request tracing.
+
+init_app() opens a root span for every request and continues an incoming
+W3C `traceparent` when one is sent. Child spans cover Jira calls (on sessions
+passed through trace_session()), AI provider calls (BaseAIClient.track_usage)
+and MongoDB commands (TracingCommandListener). The current span is kept in a
+contextvar. asyncio.to_thread and run_coroutine_threadsafe copy context on
+their own; work handed to a plain thread pool should be wrapped with
+propagate().
+
+Each response gets a Server-Timing header that sums span time per category
+(db, jira, ai). Finished traces are exported from a background thread, as
+JSON lines to TRACE_FILE or as OTLP/JSON to TRACE_OTLP_ENDPOINT, depending
+on TRACE_EXPORT.
+"""
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import requests
+from flask import g, request
+from pymongo import monitoring
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "intel-agent-backend"
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+class Trace:
+    """The spans of one request, collected until the root span ends."""
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+        self.exported = False
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span") -> None:
+        with self._lock:
+            if self.exported:
+                # Finished after the request (e.g. background work); ship it on its own
+                late = True
+            else:
+                late = False
+                self.spans.append(span)
+        if late and self.sampled:
+            exporter.submit([span])
+
+class Span:
+    def __init__(self, name: str, trace: Trace, parent: Optional["Span"] = None,
+                 parent_id: Optional[str] = None, kind: str = "internal",
+                 category: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else parent_id
+        self.kind = kind
+        self.category = category
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def end(self) -> None:
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+            self.trace.add(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "category": self.category,
+            "start": self.start,
+            "durationMs": round((self.duration or 0) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace.trace_id if span is not None else None
+
+@contextmanager
+def span(name: str, category: Optional[str] = None, kind: str = "internal", **attributes):
+    """Time a block as a child of the current span; a no-op outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, parent.trace, parent=parent, kind=kind, category=category, attributes=attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.error = str(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+def propagate(fn):
+    """Wrap a callable so it runs in the caller's context, e.g. before submitting it to a thread pool."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+    return run
+
+def trace_session(session, category: str = "jira"):
+    """Open a client span around every request a requests.Session sends."""
+    send = session.request
+
+    def request_with_span(method, url, *args, **kwargs):
+        with span(f"{category} {method}", category=category, kind="client",
+                  **{"http.method": method, "http.url": url.split("?", 1)[0]}) as current:
+            response = send(method, url, *args, **kwargs)
+            if current is not None:
+                current.attributes["http.status_code"] = response.status_code
+            return response
+    session.request = request_with_span
+    return session
+
+class TracingCommandListener(monitoring.CommandListener):
+    """A client span per MongoDB command issued while a trace is active."""
+
+    def __init__(self):
+        self._open: Dict[tuple, Span] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        collection = event.command.get(event.command_name)
+        child = Span(f"mongo {event.command_name}", parent.trace, parent=parent, kind="client",
+                     category="db", attributes={
+                         "db.operation": event.command_name,
+                         "db.collection": collection if isinstance(collection, str) else None,
+                     })
+        with self._lock:
+            self._open[(event.connection_id, event.request_id)] = child
+
+    def _finish(self, event, error=None):
+        with self._lock:
+            child = self._open.pop((event.connection_id, event.request_id), None)
+        if child is not None:
+            child.error = error
+            # Use the driver's own timing rather than ours
+            child.duration = event.duration_micros / 1e6
+            child.trace.add(child)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, error=str(event.failure))
+
+class Exporter:
+    """Ships finished traces from a background thread so requests never wait on I/O."""
+
+    def __init__(self, mode: str = "", path: str = "traces.jsonl", endpoint: str = ""):
+        self.mode = mode
+        self.path = path
+        self.endpoint = endpoint
+        self._queue: "queue.Queue" = queue.Queue(maxsize=10000)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, spans: List[Span]) -> None:
+        if not self.mode or not spans:
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait([s.to_dict() for s in spans])
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            try:
+                self._export(batch)
+            except Exception as e:
+                logger.error(f"Error exporting trace: {str(e)}")
+
+    def _export(self, spans: List[Dict[str, Any]]) -> None:
+        if self.mode == "file":
+            with open(self.path, "a") as f:
+                for item in spans:
+                    f.write(json.dumps(item, default=str) + "\n")
+        elif self.mode == "otlp":
+            requests.post(self.endpoint, json=to_otlp(spans), timeout=5)
+
+    def after_fork(self) -> None:
+        """Drop the parent's exporter thread and queue; the next submit() starts a new thread."""
+        self._queue = queue.Queue(maxsize=10000)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+def to_otlp(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of exported span dicts."""
+    otlp_spans = []
+    for item in spans:
+        start = int(item["start"] * 1e9)
+        attributes = dict(item["attributes"], **({"category": item["category"]} if item["category"] else {}))
+        otlp_span = {
+            "traceId": item["traceId"],
+            "spanId": item["spanId"],
+            "name": item["name"],
+            "kind": _OTLP_KINDS.get(item["kind"], 1),
+            "startTimeUnixNano": str(start),
+            "endTimeUnixNano": str(start + int(item["durationMs"] * 1e6)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None],
+            "status": {"code": 2, "message": item["error"]} if item["error"] else {"code": 1},
+        }
+        if item["parentId"]:
+            otlp_span["parentSpanId"] = item["parentId"]
+        otlp_spans.append(otlp_span)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": __name__}, "spans": otlp_spans}],
+    }]}
+
+def server_timing(trace: Trace, root: Span) -> str:
+    """Server-Timing header value: time per span category plus the request total."""
+    totals: Dict[str, List[float]] = {}
+    for item in trace.spans:
+        if item.category and item.duration is not None:
+            entry = totals.setdefault(item.category, [0.0, 0])
+            entry[0] += item.duration
+            entry[1] += 1
+    parts = [f'{category};dur={duration * 1000:.1f};desc="{count} calls"'
+             for category, (duration, count) in sorted(totals.items())]
+    parts.append(f"total;dur={root.duration * 1000:.1f}")
+    return ", ".join(parts)
+
+def _parse_traceparent(header: Optional[str]):
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header, or None."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2], parts[3] == "01"
+
+def init_app(app) -> None:
+    """Open a root span per request, add Server-Timing, and export the trace."""
+
+    @app.before_request
+    def _start_trace():
+        incoming = _parse_traceparent(request.headers.get("traceparent"))
+        if incoming:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+            sampled = random.random() < Config.TRACE_SAMPLE_RATE
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        root = Span(f"{request.method} {rule}", Trace(trace_id, sampled), parent_id=parent_id,
+                    kind="server", attributes={"http.method": request.method, "http.route": rule})
+        g._trace_root = root
+        g._trace_token = _current_span.set(root)
+
+    @app.after_request
+    def _finish_trace(response):
+        root = g.get("_trace_root")
+        if root is None:
+            return response
+        root.attributes["http.status_code"] = response.status_code
+        root.end()
+        response.headers["Server-Timing"] = server_timing(root.trace, root)
+        response.headers["traceparent"] = f"00-{root.trace.trace_id}-{root.span_id}-{'01' if root.trace.sampled else '00'}"
+        return response
+
+    @app.teardown_request
+    def _export_trace(exc=None):
+        root = g.pop("_trace_root", None)
+        token = g.pop("_trace_token", None)
+        if root is None:
+            return
+        if exc is not None:
+            root.error = str(exc)
+        root.end()
+        trace = root.trace
+        with trace._lock:
+            trace.exported = True
+            spans = list(trace.spans)
+        if trace.sampled:
+            exporter.submit(spans)
+        if token is not None:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Token from a different context (e.g. streamed response); just clear it
+                _current_span.set(None)
+
+exporter = Exporter(mode=Config.TRACE_EXPORT, path=Config.TRACE_FILE, endpoint=Config.TRACE_OTLP_ENDPOINT)
+atexit.register(exporter.shutdown)
+command_listener = TracingCommandListener()
@@ -1,48 +1,118 @@
 from functools import wraps
 from flask import request, jsonify, current_app
+from mongoengine import signals
 from ..models.user import User
+from .cache import TTLCache
 import jwt
 import logging
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
+# Verified token payloads, so repeat requests skip signature checks. A cached
+# payload still has its exp claim enforced on every hit.
+_token_cache = TTLCache(
+    maxsize=int(os.getenv('AUTH_TOKEN_CACHE_SIZE', '4096')),
+    ttl=float(os.getenv('AUTH_TOKEN_CACHE_TTL', '300')),
+    name='auth_tokens'
+)
+
+# Users by id, so authenticated requests skip the Mongo lookup. Saving,
+# updating or deleting a user invalidates its entry in this process; other
+# workers pick up the change within the TTL, which is kept short so a
+# deactivated or demoted user loses access within seconds everywhere.
+_user_cache = TTLCache(
+    maxsize=int(os.getenv('AUTH_USER_CACHE_SIZE', '2048')),
+    ttl=float(os.getenv('AUTH_USER_CACHE_TTL', '5')),
+    name='auth_users'
+)
+
+class AuthError(Exception):
+    def __init__(self, error, message):
+        super().__init__(message)
+        self.error = error
+        self.message = message
+
+def verify_token(token):
+    """Decode and verify a JWT, memoizing the payload per token."""
+    secret = current_app.config['JWT_SECRET_KEY']
+    key = (secret, token)
+    payload = _token_cache.get(key)
+    if payload is None:
+        payload = jwt.decode(token, secret, algorithms=['HS256'])
+        _token_cache.set(key, payload)
+    elif 'exp' in payload and payload['exp'] <= time.time():
+        _token_cache.invalidate(key)
+        raise jwt.ExpiredSignatureError('Signature has expired')
+    return payload
+
+def get_user(user_id):
+    """Load a user by id through the user cache."""
+    user = _user_cache.get(user_id)
+    if user is None:
+        user = User.objects(id=user_id).first()
+        if user is not None:
+            _user_cache.set(user_id, user)
+    return user
+
+def invalidate_user(user_id):
+    """Drop a user from the cache after it changes."""
+    _user_cache.invalidate(str(user_id))
+
+def _on_user_change(sender, document, **kwargs):
+    if document.id is not None:
+        invalidate_user(document.id)
+
+signals.post_save.connect(_on_user_change, sender=User)
+signals.post_delete.connect(_on_user_change, sender=User)
+
+def authenticate(token):
+    """Resolve a bearer token to an active user or raise AuthError."""
+    try:
+        data = verify_token(token)
+    except jwt.ExpiredSignatureError:
+        raise AuthError('Token has expired', 'Token has expired. Please login again.')
+    except jwt.InvalidTokenError as e:
+        logger.error(f"Invalid token: {str(e)}")
+        raise AuthError('Invalid token', 'Invalid token. Please login again.')
+
+    current_user = get_user(data.get('user_id'))
+    if not current_user or not current_user.is_active:
+        logger.error(f"User not found or inactive for token: {data.get('user_id')}")
+        raise AuthError('Invalid token', 'Invalid token. Please login again.')
+    return current_user
+
+def get_bearer_token():
+    """Extract the bearer token from the Authorization header."""
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        return auth_header.split(' ', 1)[1].strip() or None
+    return None
+
 def token_required(f):
+    """Authenticate the request and pass the user as `current_user`.
+
+    OPTIONS preflight requests are answered without authentication.
+    """
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-
-        # Get token from header
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
+        if request.method == 'OPTIONS':
+            return '', 200
 
+        token = get_bearer_token()
         if not token:
             logger.error("Token is missing")
-            return jsonify({'error': 'Token is missing'}), 401
+            return jsonify({'error': 'Token is missing', 'message': 'Token is missing'}), 401
 
         try:
-            # Decode JWT token
-            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-            
-            # Get user from database
-            current_user = User.objects(id=data['user_id']).first()
-            if not current_user:
-                logger.error(f"User not found for token: {data['user_id']}")
-                return jsonify({'error': 'Invalid token'}), 401
-
-            # Add user to kwargs
-            kwargs['current_user'] = current_user
-
-            return f(*args, **kwargs)
-        except jwt.ExpiredSignatureError:
-            logger.error("Token has expired")
-            return jsonify({'error': 'Token has expired. Please login again.'}), 401
-        except jwt.InvalidTokenError as e:
-            logger.error(f"Invalid token: {str(e)}")
-            return jsonify({'error': 'Invalid token. Please login again.'}), 401
+            kwargs['current_user'] = authenticate(token)
+        except AuthError as e:
+            return jsonify({'error': e.error, 'message': e.message}), 401
         except Exception as e:
             logger.error(f"Authentication error: {str(e)}")
-            return jsonify({'error': str(e)}), 401
+            return jsonify({'error': 'Authentication failed', 'message': str(e)}), 401
+
+        return f(*args, **kwargs)
 
-    return decorated 
\ No newline at end of file
+    return decorated
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the backend.
+
+Run each module from the backend directory, e.g.:
+    python -m benchmarks.bench_login
+"""
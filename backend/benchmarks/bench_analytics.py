@@ -0,0 +1,168 @@
+"""
+Sprint analytics and chat formatting microbenchmarks.
+
+Times the functions behind /api/sprint-details/status and the chat intents on
+generated sprints of 10 to 50,000 issues. It reports the best time per call
+and the peak memory one call allocates, the latter measured with tracemalloc
+in a separate, untimed call. Results can be saved as a baseline and later
+runs compared against it; the comparison exits non-zero when any case is
+slower than the threshold.
+
+    python -m benchmarks.bench_analytics --save benchmarks/baseline_analytics.json
+    python -m benchmarks.bench_analytics --compare benchmarks/baseline_analytics.json
+    python -m benchmarks.bench_analytics --only individual --sizes 1000 50000
+
+Baselines are only comparable on the same machine and Python version.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+
+from app.models.chat import Chat
+from app.routes.chat import _format_individual_status, _format_sprint_status, match_intent
+from app.routes.sprint_details import (calculate_sprint_metrics, get_bug_status, get_individual_status,
+                                       get_story_progress, parse_jira_date)
+from loadtest.fixtures import generate_issues, generate_sprints
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 50000]
+
+MESSAGES = [
+    "what is the sprint status",
+    "can you give me the status of john or priya",
+    "show me the team status for this board",
+    "any sprint insights for us?",
+    "who is doing what today",
+    "how is our velocity compared to last sprint",
+    "create sprint for next week please",
+    "summarize the burndown for the current sprint",
+    "what should we pick up after the release",
+]
+
+DATE_FORMATS = ["%Y-%m-%dT%H:%M:%S.000Z", "%Y-%m-%dT%H:%M:%S.%f+0000", "%Y-%m-%dT%H:%M:%S+00:00"]
+
+class Fixture:
+    """One active sprint with `size` issues, plus same-sized date and message inputs."""
+
+    def __init__(self, size, seed=0):
+        rng = random.Random(seed)
+        self.size = size
+        self.sprint = next(s for s in generate_sprints(1, 6) if s["state"] == "active")
+        self.issues = generate_issues(size, seed=seed)
+        start = parse_jira_date(self.sprint["startDate"])
+        self.dates = [(start.replace(microsecond=rng.randrange(1000) * 1000)).strftime(rng.choice(DATE_FORMATS))
+                      for _ in range(size)]
+        self.messages = [rng.choice(MESSAGES) for _ in range(size)]
+
+def _chat_model():
+    # detect_intent never touches the database
+    return Chat(SimpleNamespace(chats=None))
+
+def cases():
+    """name -> callable taking a Fixture; each call processes the whole fixture once."""
+    chat_model = _chat_model()
+    return {
+        "get_story_progress": lambda f: get_story_progress(f.issues),
+        "get_individual_status": lambda f: get_individual_status(f.issues),
+        "get_bug_status": lambda f: get_bug_status(f.issues),
+        "calculate_sprint_metrics": lambda f: calculate_sprint_metrics(f.sprint, f.issues),
+        "parse_jira_date": lambda f: [parse_jira_date(d) for d in f.dates],
+        "_format_sprint_status": lambda f: _format_sprint_status(f.sprint, f.issues),
+        "_format_individual_status": lambda f: _format_individual_status(f.issues),
+        "match_intent": lambda f: [match_intent(m) for m in f.messages],
+        "Chat.detect_intent": lambda f: [chat_model.detect_intent(m) for m in f.messages],
+    }
+
+def measure(fn, fixture, min_time):
+    """(best milliseconds per call, peak KiB allocated by one call)."""
+    call = lambda: fn(fixture)
+    # autorange picks a loop count that takes at least 0.2s per round
+    number, _ = timeit.Timer(call).autorange()
+    best = min(timeit.repeat(call, number=number, repeat=max(3, int(min_time / 0.2)))) / number
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best * 1000, peak / 1024
+
+def run(names, sizes, min_time):
+    selected = cases()
+    results = {}
+    for size in sizes:
+        fixture = Fixture(size)
+        for name in names:
+            ms, peak = measure(selected[name], fixture, min_time)
+            results.setdefault(name, {})[str(size)] = {"ms": ms, "peak_kib": peak}
+            print(f"  {name:<28} {size:>7}  {ms:10.4f}ms  {peak:10.1f}KiB")
+    return results
+
+def compare(results, baseline, threshold):
+    """Print the change per case against a baseline; returns the cases slower than `threshold`."""
+    regressions = []
+    print(f"\n{'case':<28} {'issues':>7}  {'baseline':>10}  {'now':>10}  {'change':>8}  {'memory':>8}")
+    for name, by_size in results.items():
+        for size, now in by_size.items():
+            before = baseline.get(name, {}).get(size)
+            if before is None:
+                continue
+            change = now["ms"] / before["ms"] - 1 if before["ms"] else 0.0
+            memory = now["peak_kib"] / before["peak_kib"] - 1 if before["peak_kib"] else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "  SLOWER"
+                regressions.append((name, size, change))
+            elif change < -threshold:
+                flag = "  faster"
+            print(f"{name:<28} {size:>7}  {before['ms']:9.4f}ms {now['ms']:9.4f}ms  "
+                  f"{change * 100:+7.1f}%  {memory * 100:+7.1f}%{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sprint analytics and chat formatting")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Issues per sprint")
+    parser.add_argument("--only", action="append", help="Run cases whose name contains this (repeatable)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds to spend timing each case")
+    parser.add_argument("--save", help="Write the results to this baseline file")
+    parser.add_argument("--compare", help="Compare against this baseline file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    names = [name for name in cases() if not args.only or any(part in name for part in args.only)]
+    if not names:
+        parser.error(f"No cases match {args.only}; available: {', '.join(cases())}")
+
+    print(f"Python {platform.python_version()} on {platform.machine()}, sizes {args.sizes}\n")
+    results = run(names, args.sizes, args.min_time)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "platform": platform.platform(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results
+            }, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("python") != platform.python_version():
+            print(f"\nNote: baseline was recorded on Python {baseline.get('python')}")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} cases are more than {args.threshold * 100:.0f}% slower than the baseline")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Login throughput benchmark.
+
+Measures password verifications per second per core, first inline on one
+thread (what every login cost before hashing moved off the request thread),
+then through PasswordHasher with a concurrent burst of callers. It also
+reports how many callers the bounded queue turned away, and exits non-zero
+if any call failed for another reason.
+
+    python -m benchmarks.bench_login --workers 4 --clients 32 --logins 200
+
+With --url, the same burst is sent to a running backend's /api/auth/login.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app.services.password_hasher import HashingBusy, PasswordHasher
+
+def bench_inline(password_hash, password, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        check_password_hash(password_hash, password)
+    return count / (time.perf_counter() - start)
+
+def run_burst(call, clients, count):
+    """Run `count` calls from `clients` threads; returns (elapsed, latencies, rejected, errors)."""
+    latencies = []
+    rejected = [0]
+    errors = []
+    lock = threading.Lock()
+
+    def one():
+        start = time.perf_counter()
+        try:
+            call()
+        except HashingBusy:
+            with lock:
+                rejected[0] += 1
+            return
+        except Exception as e:
+            # A broken pool fails fast; counting it as a login would inflate the throughput
+            with lock:
+                errors.append(e)
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        for _ in range(count):
+            executor.submit(one)
+    return time.perf_counter() - start, latencies, rejected[0], errors
+
+def http_login(url, email, password):
+    import requests
+    session = threading.local()
+
+    def call():
+        if not hasattr(session, "s"):
+            session.s = requests.Session()
+        response = session.s.post(f"{url}/api/auth/login", json={"email": email, "password": password})
+        if response.status_code == 503:
+            raise HashingBusy()
+        response.raise_for_status()
+    return call
+
+def report(label, elapsed, latencies, rejected, errors, cores):
+    done = len(latencies)
+    throughput = done / elapsed if elapsed else 0
+    print(f"{label}: {throughput:.1f} logins/s ({throughput / cores:.1f} per core), "
+          f"rejected={rejected} errors={len(errors)}")
+    if errors:
+        print(f"  first error: {type(errors[0]).__name__}: {errors[0]}")
+    if latencies:
+        ordered = sorted(latencies)
+        print(f"  latency p50={statistics.median(ordered) * 1000:.1f}ms "
+              f"p99={ordered[int(0.99 * (len(ordered) - 1))] * 1000:.1f}ms "
+              f"max={ordered[-1] * 1000:.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login password verification throughput")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Hashing processes")
+    parser.add_argument("--queue-limit", type=int, default=32)
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent login callers")
+    parser.add_argument("--logins", type=int, default=200, help="Logins in the burst")
+    parser.add_argument("--url", help="Benchmark a running backend instead of the hasher directly")
+    parser.add_argument("--email", default="test@example.com")
+    parser.add_argument("--password", default="test123")
+    args = parser.parse_args()
+
+    if args.url:
+        elapsed, latencies, rejected, errors = run_burst(http_login(args.url, args.email, args.password),
+                                                         args.clients, args.logins)
+        report(f"HTTP {args.url}", elapsed, latencies, rejected, errors, os.cpu_count() or 1)
+        sys.exit(1 if errors else 0)
+
+    password_hash = generate_password_hash(args.password)
+    inline_rate = bench_inline(password_hash, args.password, max(5, args.logins // 20))
+    print(f"inline, 1 thread: {inline_rate:.1f} verifications/s per core")
+
+    hasher = PasswordHasher(workers=args.workers, queue_limit=args.queue_limit, timeout=60)
+    hasher.verify(password_hash, args.password)  # start the pool outside the timing
+    elapsed, latencies, rejected, errors = run_burst(lambda: hasher.verify(password_hash, args.password),
+                                                     args.clients, args.logins)
+    report(f"pool, {args.workers} workers, {args.clients} clients", elapsed, latencies, rejected, errors,
+           args.workers)
+    hasher.shutdown()
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+JSON serialization and compression benchmark.
+
+Builds /api/sprint-details/status payloads from fixture sprints of several
+sizes, plus a full page of chat history, then compares Flask's default JSON
+provider with the orjson provider and measures what gzip and brotli save on
+the wire at the configured levels.
+
+    python -m benchmarks.bench_responses
+    python -m benchmarks.bench_responses --issues 100 1000 10000 --repeat 50
+
+Both providers are checked to produce the same JSON before anything is timed.
+"""
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.config import Config
+from app.routes.sprint_details import (calculate_sprint_metrics, get_bug_status,
+                                       get_individual_status, get_story_progress)
+from app.services import responses
+from loadtest.fixtures import generate_issues, generate_sprints
+
+def sprint_status_payload(issue_count, seed=0):
+    """The body get_sprint_status() returns for an active sprint of `issue_count` issues."""
+    sprint = next(s for s in generate_sprints(1, 6) if s["state"] == "active")
+    issues = generate_issues(issue_count, seed=seed)
+    return {
+        "sprint": {key: sprint.get(key) for key in ("id", "name", "state", "startDate", "endDate", "goal")},
+        "storyProgress": get_story_progress(issues),
+        "individualStatus": get_individual_status(issues),
+        "bugStatus": get_bug_status(issues),
+        "sprintMetrics": calculate_sprint_metrics(sprint, issues),
+        "insights": {"status": "ready", "insights": None}
+    }
+
+def chat_history_payload(count=200, seed=0):
+    """A full /api/chat/history page: ObjectIds and datetimes, as the default provider sees them."""
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1)
+    words = "sprint status blocked review velocity backlog please summarize the team board".split()
+    chats = []
+    for i in range(count):
+        chats.append({
+            "_id": str(ObjectId()),
+            "message": " ".join(rng.choice(words) for _ in range(12)),
+            "intent": rng.choice([None, "sprint_status", "team_velocity"]),
+            "response": " ".join(rng.choice(words) for _ in range(120)),
+            "created_at": now - timedelta(minutes=i)
+        })
+    return {"chats": chats, "nextCursor": "x" * 40}
+
+def time_call(fn, repeat):
+    """Best per-call time in milliseconds over `repeat` rounds."""
+    number = max(1, repeat // 5)
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1000
+
+def bench_payload(label, payload, default_provider, fast_provider, repeat):
+    default_bytes = default_provider.dumps(payload, separators=(",", ":")).encode()
+    if fast_provider is not None:
+        fast_bytes = fast_provider.dump_bytes(payload)
+        if json.loads(fast_bytes) != json.loads(default_bytes):
+            raise AssertionError(f"{label}: orjson output differs from the default provider")
+
+    default_ms = time_call(lambda: default_provider.dumps(payload, separators=(",", ":")), repeat)
+    line = f"{label:<28} {len(default_bytes) / 1024:9.1f}KiB  json {default_ms:7.2f}ms"
+    if fast_provider is not None:
+        fast_ms = time_call(lambda: fast_provider.dump_bytes(payload), repeat)
+        line += f"  orjson {fast_ms:6.2f}ms ({default_ms / fast_ms:4.1f}x)"
+    print(line)
+
+    for encoding in ["gzip"] + (["br"] if responses.brotli is not None else []):
+        compressed = responses.compress(default_bytes, encoding)
+        compress_ms = time_call(lambda: responses.compress(default_bytes, encoding), repeat)
+        print(f"  {encoding:<4} {len(compressed) / 1024:9.1f}KiB "
+              f"({100 * (1 - len(compressed) / len(default_bytes)):4.1f}% smaller) in {compress_ms:6.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialization and response compression")
+    parser.add_argument("--issues", type=int, nargs="+", default=[50, 500, 5000],
+                        help="Sprint sizes to build status payloads for")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = responses.OrjsonProvider(app) if responses.orjson is not None else None
+    if fast_provider is None:
+        print("orjson is not installed; timing the default provider only")
+    print(f"gzip level {Config.COMPRESS_LEVEL}"
+          + (f", brotli quality {Config.COMPRESS_BROTLI_QUALITY}" if responses.brotli is not None
+             else ", brotli not installed") + "\n")
+
+    with app.app_context():
+        for count in args.issues:
+            bench_payload(f"sprint status, {count} issues", sprint_status_payload(count),
+                          default_provider, fast_provider, args.repeat)
+        bench_payload("chat history, 200 chats", chat_history_payload(),
+                      default_provider, fast_provider, args.repeat)
+
+if __name__ == "__main__":
+    main()
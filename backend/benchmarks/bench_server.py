@@ -0,0 +1,123 @@
+"""
+Dev server vs. production server throughput.
+
+Starts the app under Flask's development server and under serve.py (gunicorn)
+on the same machine, one after the other, and drives each with the same
+concurrent keep-alive clients for a fixed time. Reports requests per second
+and latency percentiles for both.
+
+    python -m benchmarks.bench_server --clients 64 --duration 15
+    python -m benchmarks.bench_server --path /api/chat/history --token <jwt> --workers 4
+
+Both servers need the same MongoDB as the app (MONGODB_URI).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEV_SERVER = ("from app import create_app; "
+              "create_app().run(host='127.0.0.1', port={port}, threaded=True, debug=False)")
+
+def start_dev(port):
+    return subprocess.Popen([sys.executable, "-c", DEV_SERVER.format(port=port)], cwd=BACKEND_DIR)
+
+def start_gunicorn(port, workers, threads):
+    command = [sys.executable, "serve.py", "--bind", f"127.0.0.1:{port}", "--threads", str(threads)]
+    if workers:
+        command += ["--workers", str(workers)]
+    return subprocess.Popen(command, cwd=BACKEND_DIR)
+
+def wait_until_up(url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{url}/api/health", timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up within {timeout:.0f}s")
+
+def drive(url, clients, duration, headers):
+    """Hit `url` from `clients` threads for `duration` seconds; returns (elapsed, latencies, errors)."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def client():
+        session = requests.Session()
+        mine = []
+        failed = 0
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            try:
+                response = session.get(url, headers=headers, timeout=30)
+                ok = response.status_code < 500
+            except requests.RequestException:
+                ok = False
+            if ok:
+                mine.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, errors[0]
+
+def report(label, elapsed, latencies, errors):
+    throughput = len(latencies) / elapsed if elapsed else 0
+    print(f"{label}: {throughput:.0f} req/s, errors={errors}")
+    if latencies:
+        ordered = sorted(latencies)
+        print(f"  latency p50={statistics.median(ordered) * 1000:.1f}ms "
+              f"p99={ordered[int(0.99 * (len(ordered) - 1))] * 1000:.1f}ms "
+              f"max={ordered[-1] * 1000:.1f}ms")
+    return throughput
+
+def run(label, process, port, args, headers):
+    base = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base)
+        drive(base + args.path, args.clients, min(2.0, args.duration), headers)  # warm up
+        return report(label, *drive(base + args.path, args.clients, args.duration, headers))
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dev server and gunicorn throughput")
+    parser.add_argument("--path", default="/api/health")
+    parser.add_argument("--token", help="JWT sent as a Bearer token")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent keep-alive clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per server")
+    parser.add_argument("--workers", type=int, default=0, help="gunicorn workers (default from Config)")
+    parser.add_argument("--threads", type=int, default=8, help="Threads per gunicorn worker")
+    parser.add_argument("--port", type=int, default=6101)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    print(f"GET {args.path} with {args.clients} clients for {args.duration:.0f}s per server, "
+          f"{os.cpu_count()} CPUs\n")
+    dev = run("flask dev server", start_dev(args.port), args.port, args, headers)
+    prod = run("gunicorn (serve.py)", start_gunicorn(args.port + 1, args.workers, args.threads),
+               args.port + 1, args, headers)
+    if dev:
+        print(f"\ngunicorn / dev server: {prod / dev:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Startup import cost.
+
+Imports the app in a fresh interpreter under `python -X importtime` and
+reports the total time, peak RSS and the most expensive modules, both
+cumulative (a module plus everything it pulled in) and self. It then loads
+each AI provider in its own fresh interpreter to show what the first request
+for that engine adds.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --top 30 --runs 5 --json startup.json
+
+Only the modules a worker imports before serving show up in the first table;
+provider SDKs should only appear in the per-provider rows.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_IMPORT = ("from app import create_app; "
+              "import app.routes.auth, app.routes.chat, app.routes.ai_config, "
+              "app.routes.scrum_master, app.routes.sprint_details")
+
+PROVIDER_IMPORT = APP_IMPORT + "; from app.ai_clients.base import load_provider; load_provider({engine!r})"
+
+RSS_PROBE = "; import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+def import_profile(code):
+    """Run `code` under -X importtime; returns ({module: (self_us, cumulative_us)}, peak RSS in KiB)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code + RSS_PROBE],
+                            cwd=BACKEND_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules, int(result.stdout.strip().splitlines()[-1])
+
+def measure(code, runs):
+    """Median total import time (ms) and peak RSS (MiB) over `runs`, plus the last profile."""
+    totals, rss = [], []
+    modules = {}
+    for _ in range(runs):
+        modules, peak = import_profile(code)
+        # Self times add up to the whole import without double counting nested modules
+        totals.append(sum(self_us for self_us, _ in modules.values()) / 1000.0)
+        rss.append(peak / 1024.0)
+    return statistics.median(totals), statistics.median(rss), modules
+
+def print_top(modules, top, index, label):
+    print(f"\nTop {top} modules by {label}:")
+    for name, timings in sorted(modules.items(), key=lambda item: item[1][index], reverse=True)[:top]:
+        print(f"  {timings[index] / 1000.0:8.1f}ms  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app import time and memory")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.ai_clients.base import available_providers
+
+    elapsed, rss, modules = measure(APP_IMPORT, args.runs)
+    print(f"app import: {elapsed:.0f}ms, peak RSS {rss:.1f}MiB, {len(modules)} modules")
+    print_top(modules, args.top, 1, "cumulative time")
+    print_top(modules, args.top, 0, "self time")
+
+    results = {"app": {"ms": elapsed, "rss_mib": rss, "modules": len(modules)}, "providers": {}}
+    print("\nFirst use of each provider (on top of the app import):")
+    for engine in available_providers():
+        try:
+            provider_ms, provider_rss, provider_modules = measure(PROVIDER_IMPORT.format(engine=engine), args.runs)
+        except RuntimeError as e:
+            print(f"  {engine:<10} unavailable: {e}")
+            continue
+        added = len(set(provider_modules) - set(modules))
+        print(f"  {engine:<10} +{provider_ms - elapsed:7.0f}ms  +{provider_rss - rss:6.1f}MiB  "
+              f"+{added} modules")
+        results["providers"][engine] = {"ms": provider_ms - elapsed, "rss_mib": provider_rss - rss,
+                                        "modules": added}
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Offline load-test harness for the backend.
+
+Contains a fake Jira REST server, a fake OpenAI/Ollama-compatible LLM server
+and a load driver that reports throughput and latency percentiles per route.
+"""
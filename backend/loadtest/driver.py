@@ -0,0 +1,243 @@
+"""
+Load driver for the backend.
+
+Provisions a user wired to the fake Jira and fake LLM servers, then fires
+requests at a target rate per route and reports throughput and latency
+percentiles per route.
+
+Usage (from the backend directory, with the backend and both fakes running):
+    python -m loadtest.driver --duration 60 --rps chat=2,sprint_status=10,scrum_master=10
+
+Requests are scheduled open-loop: latency is measured from the moment a
+request was due, so a saturated backend shows up as queueing delay instead of
+silently lowering the offered load.
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+CHAT_MESSAGES = [
+    "What should the team focus on today?",
+    "What is the current sprint status?",
+    "Show me the individual status",
+    "Summarize the risks in this sprint",
+]
+
+class LoadDriver:
+    def __init__(self, base_url, jira_domain, llm_url, email, password,
+                 project_key, board_id, ai_engine="ollama", timeout=60):
+        self.base_url = base_url.rstrip("/")
+        self.jira_domain = jira_domain
+        self.llm_url = llm_url
+        self.email = email
+        self.password = password
+        self.project_key = project_key
+        self.board_id = board_id
+        self.ai_engine = ai_engine
+        self.timeout = timeout
+        self.token = None
+        self.results = defaultdict(list)
+        self.results_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self):
+        # One keep-alive session per worker thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["Authorization"] = f"Bearer {self.token}"
+            self._local.session = session
+        return session
+
+    def setup(self):
+        """Register (or log in) the load-test user and point it at the fakes."""
+        response = requests.post(f"{self.base_url}/api/auth/register", json={
+            "email": self.email,
+            "password": self.password,
+            "name": "Load Test"
+        }, timeout=self.timeout)
+        if response.status_code != 201:
+            response = requests.post(f"{self.base_url}/api/auth/login", json={
+                "email": self.email,
+                "password": self.password
+            }, timeout=self.timeout)
+        response.raise_for_status()
+        self.token = response.json()["token"]
+        headers = {"Authorization": f"Bearer {self.token}"}
+
+        response = requests.post(f"{self.base_url}/api/scrum-master/config", headers=headers, json={
+            "managementTool": "Jira",
+            "managementEmail": self.email,
+            "managementCredentials": "fake-token",
+            "managementDomain": self.jira_domain,
+            "aiEngine": self.ai_engine,
+            "aiCredentials": self.llm_url,
+            "selectedProject": self.project_key,
+            "selectedBoard": self.board_id
+        }, timeout=self.timeout)
+        response.raise_for_status()
+
+        response = requests.post(f"{self.base_url}/api/ai-config/connect", headers=headers, json={
+            "aiEngine": self.ai_engine,
+            "aiCredentials": self.llm_url
+        }, timeout=self.timeout)
+        response.raise_for_status()
+
+    def route_requests(self):
+        """Request factories per route name; each call returns (method, path, kwargs)."""
+        messages = itertools.cycle(CHAT_MESSAGES)
+        scrum_master = itertools.cycle([
+            ("GET", "/api/scrum-master/config", {}),
+            ("GET", "/api/scrum-master/jira/boards", {}),
+            ("GET", "/api/scrum-master/jira/sprints", {"params": {"boardId": self.board_id}}),
+            ("GET", f"/api/scrum-master/jira/board/{self.board_id}/active-sprint", {}),
+        ])
+        return {
+            "chat": lambda: ("POST", "/api/chat", {"json": {
+                "aiEngine": self.ai_engine,
+                "projectKey": self.project_key,
+                "boardId": self.board_id,
+                "userMessage": next(messages)
+            }}),
+            "sprint_status": lambda: ("GET", "/api/sprint-details/status", {"params": {
+                "projectKey": self.project_key,
+                "boardId": self.board_id
+            }}),
+            "scrum_master": lambda: next(scrum_master),
+        }
+
+    def _fire(self, route, method, path, kwargs, due):
+        try:
+            response = self._session().request(method, f"{self.base_url}{path}",
+                                               timeout=self.timeout, **kwargs)
+            status = response.status_code
+        except requests.exceptions.RequestException:
+            status = None
+        latency = time.perf_counter() - due
+        with self.results_lock:
+            self.results[route].append((latency, status))
+
+    def run(self, rates, duration, concurrency):
+        """Drive every route at its target rate for `duration` seconds."""
+        factories = self.route_requests()
+        unknown = set(rates) - set(factories)
+        if unknown:
+            raise ValueError(f"Unknown routes: {', '.join(sorted(unknown))}")
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        start = time.perf_counter()
+        deadline = start + duration
+
+        def schedule(route, rps):
+            factory = factories[route]
+            for i in itertools.count():
+                due = start + i / rps
+                if due >= deadline:
+                    return
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                method, path, kwargs = factory()
+                executor.submit(self._fire, route, method, path, kwargs, due)
+
+        schedulers = [
+            threading.Thread(target=schedule, args=(route, rps), daemon=True)
+            for route, rps in rates.items() if rps > 0
+        ]
+        for thread in schedulers:
+            thread.start()
+        for thread in schedulers:
+            thread.join()
+        executor.shutdown(wait=True)
+        return time.perf_counter() - start
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+def summarize(results, elapsed):
+    """Throughput, error rate and latency percentiles (ms) per route."""
+    summary = {}
+    for route, samples in sorted(results.items()):
+        latencies = sorted(latency * 1000.0 for latency, _ in samples)
+        errors = sum(1 for _, status in samples if status is None or status >= 400)
+        summary[route] = {
+            "requests": len(samples),
+            "throughput": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            "errors": errors,
+            "errorRate": round(errors / len(samples), 4) if samples else 0.0,
+            "p50": round(percentile(latencies, 50), 1),
+            "p90": round(percentile(latencies, 90), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "p99": round(percentile(latencies, 99), 1),
+            "max": round(latencies[-1], 1) if latencies else 0.0
+        }
+    return summary
+
+def print_summary(summary, elapsed):
+    print(f"\nDuration: {elapsed:.1f}s")
+    header = f"{'route':<16}{'reqs':>8}{'req/s':>9}{'err%':>8}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    print("-" * len(header))
+    for route, row in summary.items():
+        print(f"{route:<16}{row['requests']:>8}{row['throughput']:>9.2f}{row['errorRate'] * 100:>7.2f}%"
+              f"{row['p50']:>9.1f}{row['p90']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}{row['max']:>9.1f}")
+    print("Latencies in milliseconds.")
+
+def parse_rates(spec):
+    """Parse "chat=2,sprint_status=10" into {"chat": 2.0, "sprint_status": 10.0}."""
+    rates = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        route, _, value = part.partition("=")
+        rates[route.strip()] = float(value)
+    return rates
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive load against the backend")
+    parser.add_argument("--base-url", default="http://localhost:6001")
+    parser.add_argument("--jira-domain", default="localhost:5101",
+                        help="Fake Jira host:port (start the backend with JIRA_URL_SCHEME=http)")
+    parser.add_argument("--llm-url", default="http://localhost:5102", help="Fake LLM base URL")
+    parser.add_argument("--ai-engine", default="ollama")
+    parser.add_argument("--email", default="loadtest@example.com")
+    parser.add_argument("--password", default="loadtest123")
+    parser.add_argument("--project-key", default="P1")
+    parser.add_argument("--board-id", type=int, default=1)
+    parser.add_argument("--rps", default="chat=2,sprint_status=10,scrum_master=10",
+                        help="Target requests per second per route")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum in-flight requests")
+    parser.add_argument("--json", dest="json_path", help="Also write the summary to this file")
+    args = parser.parse_args()
+
+    driver = LoadDriver(
+        base_url=args.base_url,
+        jira_domain=args.jira_domain,
+        llm_url=args.llm_url,
+        email=args.email,
+        password=args.password,
+        project_key=args.project_key,
+        board_id=args.board_id,
+        ai_engine=args.ai_engine
+    )
+    driver.setup()
+    elapsed = driver.run(parse_rates(args.rps), args.duration, args.concurrency)
+    summary = summarize(driver.results, elapsed)
+    print_summary(summary, elapsed)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"duration": elapsed, "routes": summary}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
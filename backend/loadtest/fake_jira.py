@@ -0,0 +1,209 @@
+"""
+Fake Jira Cloud REST server for load testing.
+
+Serves the subset of the REST v3 and agile 1.0 APIs the backend calls, with
+configurable board, sprint and issue volumes and response latency.
+
+Usage (from the backend directory):
+    python -m loadtest.fake_jira --port 5101 --issues-per-sprint 500
+
+Point the backend at it by starting it with JIRA_URL_SCHEME=http and saving
+a Jira configuration whose domain is "localhost:5101".
+"""
+import argparse
+import random
+import threading
+import time
+from functools import lru_cache
+
+from flask import Flask, jsonify, request
+
+from .fixtures import (
+    generate_boards,
+    generate_issues,
+    generate_projects,
+    generate_sprints,
+    project_key,
+    reference_now,
+    team_members,
+)
+
+def create_fake_jira(projects=3, boards_per_project=2, sprints_per_board=6,
+                     issues_per_sprint=200, latency_ms=0.0, jitter_ms=0.0, seed=0, now=None):
+    """Create the fake Jira Flask app; sprint dates are relative to `now` (default: today, midnight UTC)."""
+    app = Flask(__name__)
+    lock = threading.Lock()
+    rng = random.Random(seed)
+
+    project_list = generate_projects(projects)
+    boards = {b["id"]: b for b in generate_boards(projects, boards_per_project)}
+    sprints = {}
+    for board_id in boards:
+        for sprint in generate_sprints(board_id, sprints_per_board, now=now or reference_now()):
+            sprints[sprint["id"]] = sprint
+    added_issues = {}
+    next_sprint_id = [max(sprints, default=0) + 1]
+
+    @lru_cache(maxsize=256)
+    def sprint_issues(sprint_id):
+        board = boards[sprints[sprint_id]["originBoardId"]]
+        key = board["location"]["projectKey"]
+        return generate_issues(
+            issues_per_sprint,
+            seed=seed + sprint_id,
+            key_prefix=key,
+            members=tuple(team_members(seed + board["id"]))
+        )
+
+    def not_found(message):
+        return jsonify({"errorMessages": [message]}), 404
+
+    @app.before_request
+    def simulate_latency():
+        if latency_ms or jitter_ms:
+            with lock:
+                delay = latency_ms + rng.uniform(0, jitter_ms)
+            time.sleep(delay / 1000.0)
+
+    @app.route("/rest/api/3/myself", methods=["GET"])
+    def myself():
+        return jsonify({
+            "accountId": "fake-account",
+            "emailAddress": request.authorization.username if request.authorization else None,
+            "displayName": "Load Test"
+        })
+
+    @app.route("/rest/api/3/project", methods=["GET"])
+    def get_projects():
+        return jsonify(project_list)
+
+    @app.route("/rest/agile/1.0/board", methods=["GET"])
+    def get_boards():
+        values = list(boards.values())
+        key = request.args.get("projectKeyOrId")
+        if key:
+            values = [b for b in values if b["location"]["projectKey"] == key]
+        return jsonify({"values": values, "total": len(values), "isLast": True})
+
+    @app.route("/rest/agile/1.0/board/<int:board_id>/sprint", methods=["GET"])
+    def get_board_sprints(board_id):
+        if board_id not in boards:
+            return not_found(f"Board {board_id} does not exist")
+        states = request.args.get("state")
+        with lock:
+            values = [s for s in sprints.values() if s["originBoardId"] == board_id]
+        if states:
+            wanted = set(states.split(","))
+            values = [s for s in values if s["state"] in wanted]
+        return jsonify({"values": values, "isLast": True})
+
+    @app.route("/rest/agile/1.0/sprint", methods=["POST"])
+    def create_sprint():
+        payload = request.get_json() or {}
+        board_id = int(payload.get("originBoardId", 0))
+        if board_id not in boards:
+            return jsonify({"errorMessages": ["originBoardId is invalid"]}), 400
+        with lock:
+            sprint_id = next_sprint_id[0]
+            next_sprint_id[0] += 1
+            sprint = {
+                "id": sprint_id,
+                "name": payload.get("name", f"Sprint {sprint_id}"),
+                "state": "future",
+                "startDate": payload.get("startDate"),
+                "endDate": payload.get("endDate"),
+                "goal": payload.get("goal", ""),
+                "originBoardId": board_id
+            }
+            sprints[sprint_id] = sprint
+        return jsonify(sprint), 201
+
+    @app.route("/rest/agile/1.0/sprint/<int:sprint_id>", methods=["GET"])
+    def get_sprint(sprint_id):
+        sprint = sprints.get(sprint_id)
+        if not sprint:
+            return not_found(f"Sprint {sprint_id} does not exist")
+        return jsonify(sprint)
+
+    @app.route("/rest/agile/1.0/sprint/<int:sprint_id>/issue", methods=["GET"])
+    def get_sprint_issues(sprint_id):
+        if sprint_id not in sprints:
+            return not_found(f"Sprint {sprint_id} does not exist")
+        issues = sprint_issues(sprint_id) + added_issues.get(sprint_id, [])
+        max_results = int(request.args.get("maxResults", 50))
+        start_at = int(request.args.get("startAt", 0))
+        page = issues[start_at:start_at + max_results]
+        return jsonify({
+            "startAt": start_at,
+            "maxResults": max_results,
+            "total": len(issues),
+            "issues": page
+        })
+
+    @app.route("/rest/agile/1.0/sprint/<int:sprint_id>/issue", methods=["POST"])
+    def add_issues(sprint_id):
+        if sprint_id not in sprints:
+            return not_found(f"Sprint {sprint_id} does not exist")
+        keys = (request.get_json() or {}).get("issues", [])
+        with lock:
+            added_issues.setdefault(sprint_id, []).extend(
+                {"id": key, "key": key, "fields": {
+                    "summary": key,
+                    "status": {"name": "To Do"},
+                    "issuetype": {"name": "Task"},
+                    "priority": {"name": "Medium"},
+                    "customfield_10016": None
+                }}
+                for key in keys
+            )
+        return "", 204
+
+    @app.route("/rest/agile/1.0/sprint/<int:sprint_id>/complete", methods=["POST"])
+    def complete_sprint(sprint_id):
+        with lock:
+            sprint = sprints.get(sprint_id)
+            if not sprint:
+                return not_found(f"Sprint {sprint_id} does not exist")
+            sprint["state"] = "closed"
+        return "", 204
+
+    @app.route("/rest/agile/1.0/backlog/<project>", methods=["GET"])
+    def backlog(project):
+        max_results = int(request.args.get("maxResults", 50))
+        index = next((i for i in range(projects) if project_key(i) == project), None)
+        if index is None:
+            return not_found(f"Project {project} does not exist")
+        issues = generate_issues(max_results, seed=seed + 7919 * (index + 1),
+                                 key_prefix=f"{project}-B")
+        return jsonify({"issues": issues, "total": len(issues)})
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Jira REST server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5101)
+    parser.add_argument("--projects", type=int, default=3)
+    parser.add_argument("--boards-per-project", type=int, default=2)
+    parser.add_argument("--sprints-per-board", type=int, default=6)
+    parser.add_argument("--issues-per-sprint", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay per response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra delay per response")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--now", help="Reference date YYYY-MM-DD (default: today)")
+    args = parser.parse_args()
+
+    app = create_fake_jira(
+        projects=args.projects,
+        boards_per_project=args.boards_per_project,
+        sprints_per_board=args.sprints_per_board,
+        issues_per_sprint=args.issues_per_sprint,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        seed=args.seed,
+        now=reference_now(args.now)
+    )
+    app.run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == "__main__":
+    main()
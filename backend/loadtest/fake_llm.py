@@ -0,0 +1,148 @@
+"""
+Fake OpenAI/Ollama-compatible LLM server for load testing.
+
+Serves /v1/chat/completions (OpenAI), /api/chat and /api/generate (Ollama)
+with tunable latency: a fixed time to first token plus a per-token cost.
+
+Usage (from the backend directory):
+    python -m loadtest.fake_llm --port 5102 --ttft-ms 300 --ms-per-token 20
+
+Use "http://localhost:5102" as the Ollama host URL, or start the backend with
+OPENAI_BASE_URL=http://localhost:5102/v1 to route OpenAI traffic here.
+"""
+import argparse
+import random
+import threading
+import time
+import uuid
+
+from flask import Flask, jsonify, request
+
+FILLER = ("The sprint is on track overall but two stories are blocked on review "
+          "and the bug count rose since yesterday so consider pairing on the "
+          "oldest items before pulling new work into the sprint").split()
+
+def _count_tokens(text):
+    # Roughly four characters per token, which is close enough for sizing
+    return max(1, len(text or "") // 4)
+
+def create_fake_llm(ttft_ms=200.0, ms_per_token=10.0, jitter_ms=0.0,
+                    completion_tokens=80, error_rate=0.0, seed=0):
+    """Create the fake LLM Flask app."""
+    app = Flask(__name__)
+    lock = threading.Lock()
+    rng = random.Random(seed)
+
+    def plan():
+        """Pick the completion length and delays for one request."""
+        with lock:
+            tokens = max(1, int(rng.gauss(completion_tokens, completion_tokens / 4)))
+            jitter = rng.uniform(0, jitter_ms)
+            fail = rng.random() < error_rate
+        return tokens, (ttft_ms + jitter) / 1000.0, tokens * ms_per_token / 1000.0, fail
+
+    def completion_text(tokens):
+        return " ".join(FILLER[i % len(FILLER)] for i in range(tokens))
+
+    def prompt_tokens(messages):
+        return sum(_count_tokens(m.get("content")) for m in messages if isinstance(m, dict))
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    def openai_chat():
+        payload = request.get_json() or {}
+        messages = payload.get("messages", [])
+        tokens, first, generation, fail = plan()
+        time.sleep(first + generation)
+        if fail:
+            return jsonify({"error": {"message": "simulated failure", "type": "server_error"}}), 500
+        return jsonify({
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": completion_text(tokens)},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens(messages),
+                "completion_tokens": tokens,
+                "total_tokens": prompt_tokens(messages) + tokens
+            }
+        })
+
+    def ollama_timings(prompt_count, tokens, first, generation):
+        # Ollama reports durations in nanoseconds
+        return {
+            "total_duration": int((first + generation) * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": prompt_count,
+            "prompt_eval_duration": int(first * 1e9),
+            "eval_count": tokens,
+            "eval_duration": int(generation * 1e9)
+        }
+
+    @app.route("/api/chat", methods=["POST"])
+    def ollama_chat():
+        payload = request.get_json() or {}
+        messages = payload.get("messages", [])
+        tokens, first, generation, fail = plan()
+        time.sleep(first + generation)
+        if fail:
+            return jsonify({"error": "simulated failure"}), 500
+        body = {
+            "model": payload.get("model", "fake-model"),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": completion_text(tokens)},
+            "done": True
+        }
+        body.update(ollama_timings(prompt_tokens(messages), tokens, first, generation))
+        return jsonify(body)
+
+    @app.route("/api/generate", methods=["POST"])
+    def ollama_generate():
+        payload = request.get_json() or {}
+        tokens, first, generation, fail = plan()
+        time.sleep(first + generation)
+        if fail:
+            return jsonify({"error": "simulated failure"}), 500
+        body = {
+            "model": payload.get("model", "fake-model"),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "response": completion_text(tokens),
+            "done": True
+        }
+        body.update(ollama_timings(_count_tokens(payload.get("prompt")), tokens, first, generation))
+        return jsonify(body)
+
+    @app.route("/api/tags", methods=["GET"])
+    def ollama_tags():
+        return jsonify({"models": [{"name": "llama3.2:latest"}]})
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI/Ollama-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5102)
+    parser.add_argument("--ttft-ms", type=float, default=200.0, help="Delay before the first token")
+    parser.add_argument("--ms-per-token", type=float, default=10.0, help="Generation cost per completion token")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra delay per request")
+    parser.add_argument("--completion-tokens", type=int, default=80, help="Mean completion length")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail with 500")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_fake_llm(
+        ttft_ms=args.ttft_ms,
+        ms_per_token=args.ms_per_token,
+        jitter_ms=args.jitter_ms,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        seed=args.seed
+    )
+    app.run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == "__main__":
+    main()
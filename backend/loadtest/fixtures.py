@@ -0,0 +1,118 @@
+"""
+Deterministic generators for Jira-shaped test data.
+
+Everything is derived from a seed so the fake Jira server, the dataset
+generator and the benchmarks all see the same boards, sprints and issues.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+STATUSES = ["To Do", "In Progress", "In Review", "Done", "Closed"]
+STATUS_WEIGHTS = [35, 25, 10, 25, 5]
+ISSUE_TYPES = ["Story", "Bug", "Task", "Sub-task"]
+ISSUE_TYPE_WEIGHTS = [50, 20, 25, 5]
+PRIORITIES = ["Highest", "High", "Medium", "Low", "Lowest"]
+STORY_POINTS = [None, 1, 2, 3, 5, 8, 13]
+
+FIRST_NAMES = ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank", "Grace", "Heidi",
+               "Ivan", "Judy", "Mallory", "Niaj", "Olivia", "Peggy", "Rupert", "Sybil"]
+LAST_NAMES = ["Smith", "Jones", "Brown", "Garcia", "Miller", "Davis", "Lopez", "Wilson"]
+SUMMARY_VERBS = ["Implement", "Fix", "Refactor", "Document", "Investigate", "Migrate", "Optimize"]
+SUMMARY_NOUNS = ["login flow", "sprint report", "board filter", "API client", "cache layer",
+                 "notification service", "search index", "dashboard widget", "export job"]
+
+def project_key(index: int) -> str:
+    """Project key for the index-th generated project."""
+    return f"P{index + 1}"
+
+def team_members(seed: int, size: int = 8) -> List[str]:
+    """Display names of a board's team."""
+    rng = random.Random(seed)
+    return [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(size)]
+
+def generate_projects(count: int) -> List[Dict[str, Any]]:
+    """Jira /project payload for the given number of projects."""
+    return [
+        {
+            "id": str(10000 + i),
+            "key": project_key(i),
+            "name": f"Project {i + 1}",
+            "projectTypeKey": "software"
+        }
+        for i in range(count)
+    ]
+
+def generate_boards(projects: int, boards_per_project: int) -> List[Dict[str, Any]]:
+    """Jira agile /board values; board ids start at 1."""
+    boards = []
+    for p in range(projects):
+        for b in range(boards_per_project):
+            board_id = p * boards_per_project + b + 1
+            boards.append({
+                "id": board_id,
+                "name": f"{project_key(p)} board {b + 1}",
+                "type": "scrum",
+                "location": {"projectKey": project_key(p)}
+            })
+    return boards
+
+def reference_now(date: str = None) -> datetime:
+    """Midnight UTC of `date` (YYYY-MM-DD) or of today; the clock every generator shares."""
+    if date:
+        return datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+def generate_sprints(board_id: int, count: int, now: datetime = None) -> List[Dict[str, Any]]:
+    """Sprints for a board: closed history, one active sprint and one future sprint."""
+    now = now or reference_now()
+    sprints = []
+    for i in range(count):
+        # The second-to-last sprint is the active one, the last is planned
+        offset = i - (count - 2)
+        start = now + timedelta(days=14 * offset - 5)
+        end = start + timedelta(days=14)
+        if offset < 0:
+            state = "closed"
+        elif offset == 0:
+            state = "active"
+        else:
+            state = "future"
+        sprints.append({
+            "id": board_id * 1000 + i + 1,
+            "name": f"Board {board_id} Sprint {i + 1}",
+            "state": state,
+            "startDate": start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "endDate": end.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "goal": f"Deliver increment {i + 1}",
+            "originBoardId": board_id
+        })
+    return sprints
+
+def generate_issues(count: int, seed: int = 0, key_prefix: str = "P1",
+                    members: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    Generate sprint issues in the shape returned by the Jira agile API.
+
+    Roughly one issue in ten is unassigned, which omits the assignee field
+    the same way the fields filter does for an empty value.
+    """
+    rng = random.Random(seed)
+    members = members or team_members(seed)
+    issues = []
+    for i in range(count):
+        fields = {
+            "summary": f"{rng.choice(SUMMARY_VERBS)} {rng.choice(SUMMARY_NOUNS)} #{i + 1}",
+            "status": {"name": rng.choices(STATUSES, STATUS_WEIGHTS)[0]},
+            "issuetype": {"name": rng.choices(ISSUE_TYPES, ISSUE_TYPE_WEIGHTS)[0]},
+            "priority": {"name": rng.choice(PRIORITIES)},
+            "customfield_10016": rng.choice(STORY_POINTS)
+        }
+        if rng.random() >= 0.1:
+            fields["assignee"] = {"displayName": rng.choice(members)}
+        issues.append({
+            "id": str(100000 + seed * 100000 + i),
+            "key": f"{key_prefix}-{i + 1}",
+            "fields": fields
+        })
+    return issues
@@ -0,0 +1,224 @@
+"""
+Generate a large, deterministic dataset for benchmarks.
+
+Creates users, Jira configs, AI configs, conversations, chats and, with
+--mirror, the sprints and issues the fake Jira server (loadtest/fake_jira.py)
+serves for the same seed. The same arguments always produce the same
+documents, _ids included, so runs can be compared.
+
+    python scripts/generate_dataset.py --users 10000 --messages 40 --drop
+    python scripts/generate_dataset.py --users 200 --mirror --jira-domain localhost:5101
+
+Every user's password is --password (hashed once), so the load driver can log
+in as any of them.
+"""
+import argparse
+import math
+import os
+import random
+import struct
+import sys
+import time
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.mongo_client import get_db
+from loadtest.fixtures import generate_boards, generate_issues, generate_sprints, reference_now, team_members
+from werkzeug.security import generate_password_hash
+
+load_dotenv()
+
+AI_ENGINES = ["ollama", "ChatGPT", "Gemini"]
+INTENTS = [None, "sprint_status", "team_velocity", "burndown", "jira_tasks", "create_sprint"]
+
+# Word soup the message bodies are sliced from; slicing is far cheaper than building text per message
+_WORDS = ("sprint story points blocked review assignee velocity backlog refinement standup "
+          "retro burndown estimate scope release deploy bug fix regression ticket epic "
+          "dependency risk capacity commitment carry over done in progress to do the a of "
+          "for with on team board project please summarize status update what who when").split()
+
+def _corpus(rng, size=1 << 20):
+    return " ".join(rng.choice(_WORDS) for _ in range(size // 6))[:size]
+
+def _object_id(rng, when):
+    """A reproducible ObjectId whose embedded timestamp is `when`."""
+    seconds = int((when - datetime(1970, 1, 1)).total_seconds())
+    return ObjectId(struct.pack(">I", seconds) + rng.getrandbits(64).to_bytes(8, "big"))
+
+class TextSource:
+    """Message bodies with log-normal lengths around a median, capped at `cap` characters."""
+
+    def __init__(self, rng, corpus):
+        self.rng = rng
+        self.corpus = corpus
+
+    def text(self, median, sigma=0.8, cap=8000):
+        length = min(cap, max(1, int(self.rng.lognormvariate(math.log(median), sigma))))
+        start = self.rng.randrange(0, len(self.corpus) - length)
+        return self.corpus[start:start + length]
+
+class BulkInserter:
+    """Buffers documents per collection and inserts them in unordered batches."""
+
+    def __init__(self, db, batch_size):
+        self.db = db
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, collection, document):
+        buffer = self.buffers.setdefault(collection, [])
+        buffer.append(document)
+        if len(buffer) >= self.batch_size:
+            self.flush(collection)
+
+    def flush(self, collection=None):
+        for name in [collection] if collection else list(self.buffers):
+            buffer = self.buffers.get(name)
+            if buffer:
+                self.db[name].insert_many(buffer, ordered=False, bypass_document_validation=True)
+                self.counts[name] = self.counts.get(name, 0) + len(buffer)
+                self.buffers[name] = []
+
+def generate_dataset(db, args):
+    rng = random.Random(args.seed)
+    # Same clock as the fake Jira server; Mongo documents get the naive UTC form
+    sprint_now = reference_now(args.now)
+    now = sprint_now.replace(tzinfo=None)
+    text = TextSource(rng, _corpus(rng))
+    boards = generate_boards(args.projects, args.boards_per_project)
+    password_hash = generate_password_hash(args.password)
+    inserter = BulkInserter(db, args.batch_size)
+    messages = 0
+
+    for i in range(args.users):
+        created = now - timedelta(days=rng.uniform(30, 720))
+        user_id = _object_id(rng, created)
+        inserter.add("users", {
+            "_id": user_id,
+            "email": f"user{i}@example.com",
+            "password": password_hash,
+            "name": f"Load User {i}",
+            "role": "admin" if i == 0 else "user",
+            "created_at": created,
+            "updated_at": created,
+            "is_active": True
+        })
+        inserter.add("jira_configs", {
+            "_id": _object_id(rng, created),
+            "user": user_id,
+            "email": f"user{i}@example.com",
+            "domain": args.jira_domain,
+            "api_token": f"token-{i}",
+            "last_used": now - timedelta(hours=rng.uniform(0, 24 * 30)),
+            "created_at": created,
+            "is_active": True
+        })
+        engine = AI_ENGINES[i % len(AI_ENGINES)]
+        inserter.add("user_configs", {
+            "_id": _object_id(rng, created),
+            "userId": str(user_id),
+            "aiEngine": engine,
+            "aiCredentials": f"{engine.lower()}-key-{i}",
+            "managementTool": "Jira",
+            "managementEmail": f"user{i}@example.com",
+            "managementDomain": args.jira_domain,
+            "updated_at": created
+        })
+
+        # Conversation sizes are heavy-tailed: most boards have a short history, a few a long one
+        for board in rng.sample(boards, min(args.conversations, len(boards))):
+            count = min(args.max_messages, max(2, int(rng.expovariate(1 / args.messages)) // 2 * 2))
+            started = now - timedelta(days=rng.uniform(0, 365))
+            step = (now - started) / count
+            history = []
+            for m in range(count):
+                user_turn = m % 2 == 0
+                history.append({
+                    "role": "user" if user_turn else "assistant",
+                    "content": text.text(60 if user_turn else 600),
+                    "timestamp": started + step * m
+                })
+            messages += count
+            inserter.add("conversations", {
+                "_id": _object_id(rng, started),
+                "userId": str(user_id),
+                "projectKey": board["location"]["projectKey"],
+                "boardId": board["id"],
+                "messages": history,
+                "created_at": started,
+                "updated_at": history[-1]["timestamp"]
+            })
+
+        for c in range(args.chats):
+            at = now - timedelta(days=rng.uniform(0, 365))
+            inserter.add("chats", {
+                "_id": _object_id(rng, at),
+                "user_id": str(user_id),
+                "message": text.text(60),
+                "intent": rng.choice(INTENTS),
+                "response": text.text(400),
+                "created_at": at
+            })
+
+        if (i + 1) % 1000 == 0:
+            print(f"  {i + 1}/{args.users} users, {messages} messages")
+
+    if args.mirror:
+        # Same seeds and reference date as create_fake_jira(), so the mirror matches what the
+        # fake server returns when both are given the same --now (or run on the same day)
+        for board in boards:
+            members = tuple(team_members(args.seed + board["id"]))
+            for sprint in generate_sprints(board["id"], args.sprints_per_board, now=sprint_now):
+                inserter.add("jira_sprints", dict(sprint, _id=sprint["id"], boardId=board["id"]))
+                for issue in generate_issues(args.issues_per_sprint, seed=args.seed + sprint["id"],
+                                             key_prefix=board["location"]["projectKey"], members=members):
+                    inserter.add("jira_issues", dict(issue, sprintId=sprint["id"], boardId=board["id"]))
+
+    inserter.flush()
+    return inserter.counts, messages
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic benchmark dataset")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--conversations", type=int, default=3, help="Conversations (boards) per user")
+    parser.add_argument("--messages", type=int, default=40, help="Mean messages per conversation")
+    parser.add_argument("--max-messages", type=int, default=2000, help="Cap per conversation document")
+    parser.add_argument("--chats", type=int, default=20, help="Chat history entries per user")
+    parser.add_argument("--projects", type=int, default=3)
+    parser.add_argument("--boards-per-project", type=int, default=2)
+    parser.add_argument("--sprints-per-board", type=int, default=6)
+    parser.add_argument("--issues-per-sprint", type=int, default=200)
+    parser.add_argument("--mirror", action="store_true", help="Also store the fake Jira sprints and issues")
+    parser.add_argument("--jira-domain", default="localhost:5101", help="Domain stored in the Jira configs")
+    parser.add_argument("--password", default="loadtest123")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--now", help="Reference date YYYY-MM-DD (default: today)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--drop", action="store_true", help="Drop the generated collections first")
+    args = parser.parse_args()
+
+    db = get_db()
+    if args.drop:
+        for name in ["users", "jira_configs", "user_configs", "conversations", "chats",
+                     "jira_sprints", "jira_issues"]:
+            db.drop_collection(name)
+            print(f"Dropped collection: {name}")
+
+    print(f"Generating dataset in {db.name} (seed {args.seed})...")
+    start = time.perf_counter()
+    counts, messages = generate_dataset(db, args)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    for name, count in counts.items():
+        print(f"  {name}: {count}")
+    print(f"\nInserted {total} documents ({messages} conversation messages) in {elapsed:.1f}s "
+          f"({total / elapsed:.0f} docs/s, {messages / elapsed:.0f} messages/s)")
+    print(f"Log in as user0@example.com (admin) .. user{args.users - 1}@example.com "
+          f"with password {args.password}")
+
+if __name__ == "__main__":
+    main()
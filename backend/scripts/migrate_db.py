@@ -1,56 +1,47 @@
-from pymongo import MongoClient
+"""
+Apply pending data migrations from app/migrations.
+
+    python scripts/migrate_db.py --status
+    python scripts/migrate_db.py --docs-per-sec 2000 --batch-size 1000
+    python scripts/migrate_db.py --only 3 --dry-run
+
+Runs resume from their last checkpoint; completed migrations are skipped.
+"""
+import argparse
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.config import Config
+from app.migrations import MIGRATIONS, MigrationRunner
+from app.services.mongo_client import get_db
+
 load_dotenv()
 
 def migrate_database():
-    # Connect to MongoDB
-    client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017'))
-    
-    # Get source and target databases
-    source_db = client.intel_agent
-    target_db = client.scrum_master_db
-    
-    # Collections to migrate
-    collections = ['users', 'user_configs']
-    
-    print("Starting database migration...")
-    
-    for collection_name in collections:
-        try:
-            # Get all documents from source collection
-            source_collection = source_db[collection_name]
-            target_collection = target_db[collection_name]
-            
-            # Count documents in source
-            count = source_collection.count_documents({})
-            print(f"\nMigrating {count} documents from {collection_name}...")
-            
-            if count > 0:
-                # Get all documents
-                documents = list(source_collection.find())
-                
-                # Insert into target collection
-                if documents:
-                    target_collection.insert_many(documents)
-                    print(f"Successfully migrated {len(documents)} documents to {collection_name}")
-                
-                # Drop source collection after successful migration
-                source_collection.drop()
-                print(f"Dropped source collection {collection_name}")
-            else:
-                print(f"No documents to migrate in {collection_name}")
-                
-        except Exception as e:
-            print(f"Error migrating {collection_name}: {str(e)}")
-    
+    parser = argparse.ArgumentParser(description="Apply pending data migrations")
+    parser.add_argument("--status", action="store_true", help="List migrations and their progress")
+    parser.add_argument("--only", type=int, action="append", help="Run only this version (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=Config.MIGRATION_BATCH_SIZE)
+    parser.add_argument("--docs-per-sec", "--ops-per-sec", type=float, default=Config.MIGRATION_DOCS_PER_SEC,
+                        help="Source documents per second to stay under; 0 for no limit")
+    parser.add_argument("--dry-run", action="store_true", help="Read and transform without writing")
+    args = parser.parse_args()
+
+    runner = MigrationRunner(get_db(), batch_size=args.batch_size, docs_per_sec=args.docs_per_sec,
+                             dry_run=args.dry_run)
+
+    if args.status:
+        for row in runner.status(MIGRATIONS):
+            print(f"{row['id']:<40} {row['status']:<10} {row['processed']}")
+        return
+
+    migrations = [m for m in MIGRATIONS if not args.only or m.version in args.only]
+    print(f"Running {len(migrations)} migrations (batch size {args.batch_size}, "
+          f"{args.docs_per_sec or 'unlimited'} docs/s)")
+    runner.run_all(migrations)
     print("\nMigration completed!")
-    
-    # Drop the source database if it's empty
-    if not any(source_db.list_collection_names()):
-        client.drop_database('intel_agent')
-        print("Dropped empty source database 'intel_agent'")
 
 if __name__ == "__main__":
-    migrate_database() 
\ No newline at end of file
+    migrate_database()
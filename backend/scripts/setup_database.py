@@ -2,8 +2,12 @@ from pymongo import MongoClient
 from datetime import datetime
 import bcrypt
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.indexes import ensure_indexes
+
 # Load environment variables
 load_dotenv()
 
@@ -19,6 +23,10 @@ def setup_database():
             db.create_collection(collection)
             print(f"Created collection: {collection}")
 
+    # Create indexes for the hot queries
+    for collection, names in ensure_indexes(db).items():
+        print(f"Ensured indexes on {collection}: {', '.join(names)}")
+
     # Create test user
     test_user = {
         'email': 'test@example.com',
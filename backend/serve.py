@@ -0,0 +1,113 @@
+"""
+Production entry point: serves create_app() with gunicorn.
+
+    python serve.py
+    python serve.py --workers 4 --threads 16 --bind 127.0.0.1:6001
+
+Workers are gthread workers, since requests mostly wait on Jira, the AI
+providers and MongoDB. Defaults come from the WEB_* settings in Config. With
+WEB_PRELOAD the app is imported once in the master and shared by the forked
+workers. Anything that holds sockets or threads is recreated in each worker
+after the fork: the Mongo client, the outbound HTTP sessions, the password
+hashing pool and the background flushers. run.py keeps the development server.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+
+from dotenv import load_dotenv
+from gunicorn.app.base import BaseApplication
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+load_dotenv()
+
+from app import create_app
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+def default_workers() -> int:
+    return Config.WEB_WORKERS or multiprocessing.cpu_count() * 2 + 1
+
+def when_ready(server):
+    """Close the master's Mongo connections once the app is preloaded; the master serves nothing."""
+    from app.services.mongo_client import close_mongo_client
+    close_mongo_client()
+
+def post_fork(server, worker):
+    """Give a new worker its own pools and threads instead of the ones copied from the master."""
+    from app.ai_clients import openai_client
+    from app.ai_clients.usage import usage_tracker
+    from app.logging_config import restart_logging
+    from app.services import tracing
+    from app.services.config_cache import jira_helper_cache
+    from app.services.conversation_writer import conversation_writer
+    from app.services.health import health_monitor
+    from app.services.mongo_client import get_db
+    from app.services.password_hasher import password_hasher
+
+    restart_logging()
+    password_hasher.after_fork()
+    usage_tracker.after_fork()
+    conversation_writer.after_fork()
+    tracing.exporter.after_fork()
+    health_monitor.after_fork()
+    openai_client.after_fork()
+    # Cached JiraHelpers hold requests sessions with pooled sockets
+    jira_helper_cache.clear()
+
+    app = server.app.callable
+    if app is not None:
+        # Connect now so the worker's pool is ready before its first request
+        app.db = get_db()
+    logger.info(f"Worker {worker.pid} ready")
+
+class ProductionServer(BaseApplication):
+    def __init__(self, options=None):
+        self.options = options or {}
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return create_app()
+
+def server_options(args) -> dict:
+    return {
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "gthread",
+        "threads": args.threads,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "keepalive": Config.WEB_KEEPALIVE,
+        "preload_app": args.preload,
+        "max_requests": Config.WEB_MAX_REQUESTS,
+        "max_requests_jitter": Config.WEB_MAX_REQUESTS_JITTER,
+        # The app logs through its own queue handler; keep gunicorn's access log off
+        "accesslog": None,
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend with gunicorn")
+    parser.add_argument("--bind", default=Config.WEB_BIND)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--threads", type=int, default=Config.WEB_THREADS, help="Threads per worker")
+    parser.add_argument("--timeout", type=int, default=Config.WEB_TIMEOUT,
+                        help="Seconds a worker may be silent before it is restarted")
+    parser.add_argument("--graceful-timeout", type=int, default=Config.WEB_GRACEFUL_TIMEOUT,
+                        help="Seconds workers get to finish in-flight requests on shutdown")
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=Config.WEB_PRELOAD)
+    args = parser.parse_args()
+
+    ProductionServer(server_options(args)).run()
+
+if __name__ == "__main__":
+    main()
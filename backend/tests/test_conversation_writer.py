@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from app.services.conversation_writer import ConversationWriter, _not_stored
+
+KEY = ("user-1", "PROJ", 1)
+
+def _exchange(text):
+    # Microseconds, as chat() stamps them; Mongo keeps only milliseconds
+    return [
+        {"role": "user", "content": text, "timestamp": datetime(2024, 1, 1, 12, 0, 0, 123456)},
+        {"role": "assistant", "content": f"re: {text}", "timestamp": datetime(2024, 1, 1, 12, 0, 0, 654321)},
+    ]
+
+class FlushingCollection:
+    """Flushes the writer between load()'s buffer snapshot and its read."""
+
+    def __init__(self, collection, writer):
+        self.collection = collection
+        self.writer = writer
+        self.database = collection.database
+
+    def find_one(self, *args, **kwargs):
+        self.writer.flush(self.collection)
+        return self.collection.find_one(*args, **kwargs)
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().db.conversations
+
+def test_load_during_flush_keeps_each_message_once(collection):
+    writer = ConversationWriter(write_behind=True, flush_interval=60)
+    writer.append(KEY, _exchange("first"), collection)
+    writer.flush(collection)
+    writer.append(KEY, _exchange("second"), collection)
+
+    convo = writer.load(KEY, FlushingCollection(collection, writer))
+
+    assert [m["content"] for m in convo["messages"]] == ["first", "re: first", "second", "re: second"]
+
+def test_load_merges_unflushed_messages(collection):
+    writer = ConversationWriter(write_behind=True, flush_interval=60)
+    writer.append(KEY, _exchange("first"), collection)
+    writer.flush(collection)
+    writer.append(KEY, _exchange("second"), collection)
+
+    convo = writer.load(KEY, collection)
+
+    assert [m["content"] for m in convo["messages"]] == ["first", "re: first", "second", "re: second"]
+
+def test_not_stored_returns_the_unwritten_suffix():
+    a, b, c, d = ({"role": "user", "content": text} for text in "abcd")
+    assert _not_stored([a, b, c], [b, c, d]) == [d]
+    assert _not_stored([a, b], [c, d]) == [c, d]
+    assert _not_stored([a, b, c, d], [b, c]) == []